@@ -1,20 +1,25 @@
+import time
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models.base import get_db
 from app.core.security import decode_access_token
+from app.core.auth_cache import principal_cache
 from app.models.user import User
+from app.schemas.auth import UserPrincipal
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Dependency to get the current authenticated user"""
+def _authenticate(token: str, db: Session) -> UserPrincipal:
+    # Tokens verified recently skip JWT decoding and the users query
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
     
-    token = credentials.credentials
     payload = decode_access_token(token)
     
     if payload is None:
@@ -37,4 +42,58 @@ def get_current_user(
             detail="User not found"
         )
     
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user"
+        )
+    
+    principal = UserPrincipal.model_validate(user)
+    
+    # Never cache past the token's own expiry
+    ttl = principal_cache.ttl
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        principal_cache.set(token, principal, ttl=ttl)
+    
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> UserPrincipal:
+    """Dependency to get the current authenticated user"""
+    return _authenticate(credentials.credentials, db)
+
+
+def get_current_superuser(user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
+    """Dependency for admin-only endpoints"""
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser privileges required"
+        )
     return user
+
+
+def get_profile_flag(
+    profile: bool = False,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> bool:
+    """
+    Whether the caller asked for a cProfile breakdown with `?profile=1`.
+    
+    Only superusers may, and only when PROFILING_ENABLED is set.
+    """
+    if not profile:
+        return False
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling is disabled")
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if not _authenticate(credentials.credentials, db).is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Superuser privileges required")
+    return True
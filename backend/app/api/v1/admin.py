@@ -0,0 +1,42 @@
+import threading
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.api.deps import get_current_superuser
+from app.config.settings import settings
+from app.core.profiling import SamplingProfiler
+from app.schemas.auth import UserPrincipal
+
+router = APIRouter()
+
+# One sampling run per worker at a time
+_profile_lock = threading.Lock()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def sample_profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1),
+    user: UserPrincipal = Depends(get_current_superuser)
+):
+    """
+    Sample every thread of this worker for `seconds` and return collapsed
+    stacks (one "frame;frame;... count" line per stack), ready for
+    flamegraph.pl or speedscope. Requires PROFILING_ENABLED.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"seconds must be at most {settings.PROFILING_MAX_SECONDS}"
+        )
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        stacks = profiler.run(seconds)
+    finally:
+        _profile_lock.release()
+
+    return PlainTextResponse(stacks, headers={"X-Profile-Samples": str(profiler.samples)})
@@ -1,40 +1,158 @@
-from fastapi import APIRouter, Depends
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, Request, Response
+from pydantic import TypeAdapter
+from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.api.deps import get_profile_flag
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.core.http_cache import CachedBody, cached_response, is_not_modified, make_etag, not_modified_response
+from app.core.profiling import profile_call
+from app.core.request_timing import request_timer, server_timing_headers
 from app.models.base import get_db
-from app.schemas.ai import AnalyzePromptRequest, AnalyzePromptResponse, ChatRequest, ChatResponse
+from app.schemas.ai import (
+    AIRequestLog,
+    AnalyzeDraftRequest,
+    AnalyzeDraftResponse,
+    AnalyzePromptRequest,
+    AnalyzePromptResponse,
+    ChatRequest,
+    ChatResponse,
+    MonitorContextRequest,
+    MonitorContextResponse
+)
+from app.core.admission import Priority
+from app.core.metrics import DRAFT_ANALYSES
 from app.services.ai_service import AIService
+from app.services.model_router import model_router
+from app.services.prompt_drafts import draft_tracker
 from app.repositories.ai_logs_repo import AILogsRepository
 import time
 
 router = APIRouter()
 
 
+def _analysis_metadata(result: dict) -> dict:
+    """Where an analysis came from, so local-answer rate can be measured from the log"""
+    keys = ("source", "category", "confidence", "classifier_version")
+    return {key: result[key] for key in keys if key in result}
+
+
+# Routes that call upstream providers are plain `def` so FastAPI runs them in
+# its threadpool; blocking provider calls and admission waits then never
+# stall the event loop.
+
 @router.post("/analyze-prompt", response_model=AnalyzePromptResponse)
-async def analyze_prompt(
+def analyze_prompt(
     request: AnalyzePromptRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    x_priority: Optional[str] = Header(None),
+    profile: bool = Depends(get_profile_flag)
 ):
     """
     Analyze a user prompt and recommend the best AI model.
     
     This endpoint:
-    1. Analyzes the prompt using keyword matching
+    1. Analyzes the prompt with the local classifier, or an upstream LLM
+       when the classifier is not confident
     2. Returns a model recommendation with reasoning
     3. Logs the request for analytics
+    
+    Batch and analytics clients should send `X-Priority: batch` so that
+    interactive traffic is admitted to upstream providers first. When the
+    providers are saturated, the local recommender answers instead.
+    
+    Superusers can add `?profile=1` (with PROFILING_ENABLED) to get a
+    cProfile breakdown of the analysis in `profile`.
+    
+    Per-phase timings (provider attempts, parsing, local classifier and
+    recommender, DB write, serialization) are returned in a Server-Timing
+    header. The phases up to the DB write are logged in
+    `request_metadata.timings_ms`.
+    """
+    
+    with request_timer() as timer:
+        start_time = time.time()
+        
+        # Get recommendation from AI service
+        priority = Priority.parse(x_priority, Priority.DEFAULT)
+        breakdown = None
+        if profile:
+            result, breakdown = profile_call(AIService.analyze_prompt, request.prompt, priority=priority)
+        else:
+            result = AIService.analyze_prompt(request.prompt, priority=priority)
+        recommendation = result['recommendation']
+        alternative = result['alternative']
+        
+        # Calculate response time
+        response_time_ms = (time.time() - start_time) * 1000
+        
+        # Log the request
+        with timer.phase("db"):
+            ai_request = AILogsRepository.create(
+                db=db,
+                prompt=request.prompt,
+                recommended_model=recommendation.name,
+                provider=recommendation.provider,
+                reasoning=recommendation.reasoning,
+                user_id=request.user_id,
+                client_id=request.client_id,
+                response_time_ms=response_time_ms,
+                estimated_cost=recommendation.input_price,
+                request_metadata={**_analysis_metadata(result), "timings_ms": timer.summary()}
+            )
+        
+        # Serialized here rather than by FastAPI so that it is timed too
+        with timer.phase("serialize"):
+            body = AnalyzePromptResponse(
+                recommendation=recommendation,
+                alternative=alternative,
+                request_id=ai_request.id,
+                profile=breakdown
+            ).model_dump_json()
+    
+    return Response(content=body, media_type="application/json", headers=server_timing_headers(timer))
+
+@router.post("/analyze-draft", response_model=AnalyzeDraftResponse, response_model_exclude_none=True)
+def analyze_draft(request: AnalyzeDraftRequest, db: Session = Depends(get_db)):
     """
+    Analyze a prompt while it is being typed.
+    
+    Send every (debounced) edit with the same `session_id` and an
+    increasing `revision`, and `final: true` when the prompt is submitted.
+    Partial revisions are answered from the local classifier and keyword
+    index, without upstream calls or logging. The final revision gets the
+    full analysis of /analyze-prompt and is logged.
     
+    A newer revision cancels the upstream analysis of an older one that is
+    still queued; answers that are outdated by the time they are ready come
+    back with `superseded: true` and are not logged.
+    """
     start_time = time.time()
+    key = f"{request.client_id}:{request.session_id}" if request.client_id else request.session_id
     
-    # Get recommendation from AI service
-    result = AIService.analyze_prompt(request.prompt)
-    recommendation = result['recommendation']
-    alternative = result['alternative']
+    state = draft_tracker.begin(key, request.revision)
+    if state is None:
+        DRAFT_ANALYSES.labels(outcome="superseded").inc()
+        return AnalyzeDraftResponse(revision=request.revision, superseded=True)
     
-    # Calculate response time
-    response_time_ms = (time.time() - start_time) * 1000
+    if not request.final:
+        DRAFT_ANALYSES.labels(outcome="local").inc()
+        result = AIService.classify_prompt(request.prompt) or AIService.get_ai_recommendation(request.prompt)
+        return AnalyzeDraftResponse(
+            revision=request.revision,
+            recommendation=result["recommendation"],
+            alternative=result["alternative"],
+            source=result["source"]
+        )
+    
+    result = AIService.analyze_prompt(request.prompt, priority=Priority.INTERACTIVE, cancel=state.cancel)
+    if not draft_tracker.is_current(key, state):
+        DRAFT_ANALYSES.labels(outcome="superseded").inc()
+        return AnalyzeDraftResponse(revision=request.revision, superseded=True)
+    draft_tracker.finish(key, state)
+    DRAFT_ANALYSES.labels(outcome="final").inc()
     
-    # Log the request
+    recommendation = result["recommendation"]
     ai_request = AILogsRepository.create(
         db=db,
         prompt=request.prompt,
@@ -43,58 +161,115 @@ async def analyze_prompt(
         reasoning=recommendation.reasoning,
         user_id=request.user_id,
         client_id=request.client_id,
-        response_time_ms=response_time_ms,
-        estimated_cost=recommendation.input_price
+        response_time_ms=(time.time() - start_time) * 1000,
+        estimated_cost=recommendation.input_price,
+        request_metadata={**_analysis_metadata(result), "draft_revisions": state.revisions}
     )
     
-    return AnalyzePromptResponse(
+    return AnalyzeDraftResponse(
+        revision=request.revision,
         recommendation=recommendation,
-        alternative=alternative,
+        alternative=result["alternative"],
+        source=result.get("source"),
         request_id=ai_request.id
     )
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(
+def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    profile: bool = Depends(get_profile_flag)
 ):
     """
     Chat with a specific AI model.
+    
+    Responds 503 with Retry-After when the chat provider is saturated.
+    Superusers can add `?profile=1` for a cProfile breakdown.
     """
-    response_text = AIService.chat_with_model(
-        message=request.message,
-        model_name=request.model_name,
-        history=request.history
-    )
+    start_time = time.time()
+    
+    chat_args = {"message": request.message, "model_name": request.model_name, "history": request.history}
+    breakdown = None
+    if profile:
+        result, breakdown = profile_call(AIService.chat_with_model, **chat_args)
+    else:
+        result = AIService.chat_with_model(**chat_args)
+    metadata = result["metadata"]
+    if metadata is None:
+        # Nothing was sent upstream
+        return ChatResponse(response=result["response"], profile=breakdown)
     
-    # Log usage (simplified for now)
-    # real impl would track tokens, etc.
+    response_time_ms = (time.time() - start_time) * 1000
+    routing = metadata["routing"]
+    
+    # Log the routing decision and token usage so routing can be evaluated offline
+    ai_request = AILogsRepository.create(
+        db=db,
+        prompt=request.message,
+        recommended_model=routing["model"],
+        provider="Groq",
+        reasoning=f"Routed to {routing['tier'] or routing['model']} model ({routing['reason']})",
+        user_id=request.user_id,
+        client_id=request.client_id,
+        response_time_ms=response_time_ms,
+        estimated_cost=model_router.cost(routing["model"], metadata.get("usage")),
+        request_metadata=metadata
+    )
     
-    return ChatResponse(response=response_text)
+    return ChatResponse(response=result["response"], request_id=ai_request.id, profile=breakdown)
 
-@router.get("/usage")
-async def get_usage_stats(
+# Serialized /usage pages by query, absorbing bursts of dashboard polls
+_usage_cache = TTLCache(maxsize=settings.USAGE_CACHE_MAX_ENTRIES, ttl=settings.USAGE_CACHE_TTL_SECONDS)
+_usage_adapter = TypeAdapter(List[AIRequestLog])
+
+
+@router.get("/usage", response_model=List[AIRequestLog])
+def get_usage_stats(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     client_id: Optional[str] = None,
+    include_archive: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     Get AI usage statistics and logs.
+    
+    Set `include_archive` to also page through requests that the retention
+    job has moved out of the database.
+    
+    Responses carry an ETag and Last-Modified derived from the newest
+    logged request; send them back (If-None-Match / If-Modified-Since) to
+    get 304 when nothing changed. Identical queries within
+    USAGE_CACHE_TTL_SECONDS are answered from memory, so a page can be up
+    to that much out of date. Large responses are gzip-encoded when the
+    client accepts it.
     """
-    logs = AILogsRepository.list(db=db, skip=skip, limit=limit, client_id=client_id)
-    return logs
+    key = (client_id, skip, limit, include_archive)
+    cached = _usage_cache.get(key)
+    if cached is None:
+        max_id, min_id, last_modified = AILogsRepository.high_water_mark(db, client_id)
+        etag = make_etag(max_id, min_id, *key)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        logs = AILogsRepository.list(
+            db=db, skip=skip, limit=limit, client_id=client_id, include_archive=include_archive
+        )
+        cached = CachedBody(etag, last_modified, _usage_adapter.dump_json(_usage_adapter.validate_python(logs)))
+        _usage_cache.set(key, cached)
+    
+    return cached_response(request, cached)
 
-@router.post("/monitor-context")
-async def monitor_context(request: dict):
+@router.post("/monitor-context", response_model=MonitorContextResponse, response_model_exclude_none=True)
+async def monitor_context(request: MonitorContextRequest):
     """
-    Gemini Observer: Monitor chat context and suggest model switches.
+    Context Observer: Monitor chat context and suggest model switches.
     
-    Request body:
-    {
-        "messages": [...],
-        "current_model": "GPT-4o"
-    }
+    Runs locally against the recommendation keyword index. Pass a
+    `conversation_id` (with the required `client_id` it is scoped to) so
+    only messages not seen before are processed; clients may then send
+    just the newest `message` instead of the full `messages` history.
     
     Returns:
     {
@@ -105,8 +280,14 @@ async def monitor_context(request: dict):
         "subtitle": "Role"
     }
     """
-    messages = request.get("messages", [])
-    current_model = request.get("current_model", "Unknown")
+    conversation_id = request.conversation_id
+    if conversation_id:
+        conversation_id = f"{request.client_id}:{conversation_id}"
     
-    result = AIService.monitor_chat_context(messages, current_model)
-    return result
+    return AIService.monitor_chat_context(
+        messages=[message.model_dump() for message in request.messages],
+        current_model=request.current_model,
+        conversation_id=conversation_id,
+        message=request.message,
+        messages_offset=request._messages_dropped
+    )
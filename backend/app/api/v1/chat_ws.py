@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from app.config.settings import settings
+from app.config.logging import logger
+from app.core.admission import AdmissionRejected
+from app.core.body_limit import ws_max_size
+from app.models.base import get_session_factory
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.services.ai_service import AIService
+from app.services.chat_sessions import ChatSession, chat_sessions
+from app.services.model_router import model_router
+
+router = APIRouter()
+
+
+def _log_turn(session_factory, message: str, event: dict, client_id: Optional[str]) -> Optional[int]:
+    metadata = event["metadata"]
+    routing = metadata["routing"]
+    db = session_factory()
+    try:
+        ai_request = AILogsRepository.create(
+            db=db,
+            prompt=message,
+            recommended_model=routing["model"],
+            provider="Groq",
+            reasoning=f"Routed to {routing['tier'] or routing['model']} model ({routing['reason']})",
+            client_id=client_id,
+            response_time_ms=metadata.get("latency_ms"),
+            estimated_cost=model_router.cost(routing["model"], metadata.get("usage")),
+            request_metadata=metadata
+        )
+        return ai_request.id
+    finally:
+        db.close()
+
+
+async def _generate(
+    websocket: WebSocket,
+    session: ChatSession,
+    message: str,
+    model_name: str,
+    cancel: threading.Event,
+    session_factory,
+    client_id: Optional[str]
+) -> None:
+    """Stream one reply, then store the turn in the session and the request log"""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    history = session.context()
+
+    def produce():
+        # Runs in the threadpool; the provider SDK stream is blocking
+        try:
+            for event in AIService.stream_chat(message, model_name, history, cancel):
+                loop.call_soon_threadsafe(events.put_nowait, event)
+        except AdmissionRejected as e:
+            loop.call_soon_threadsafe(events.put_nowait, {
+                "type": "error", "detail": str(e), "status": 503, "retry_after": e.retry_after
+            })
+        except Exception as e:
+            logger.error(f"Chat stream failed: {e}", exc_info=True)
+            loop.call_soon_threadsafe(events.put_nowait, {"type": "error", "detail": "Chat failed", "status": 500})
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    producer = asyncio.ensure_future(run_in_threadpool(produce))
+    try:
+        while (event := await events.get()) is not None:
+            if event["type"] != "done":
+                await websocket.send_json(event)
+                continue
+
+            metadata = event["metadata"]
+            request_id = None
+            if metadata is not None and "error" not in metadata:
+                session.append("user", message)
+                if event["response"]:
+                    session.append("assistant", event["response"])
+                await run_in_threadpool(chat_sessions.save, session)
+                request_id = await run_in_threadpool(_log_turn, session_factory, message, event, client_id)
+            elif metadata is not None:
+                # Upstream failure: tell the client, keep the session as it was
+                await websocket.send_json({"type": "error", "detail": event["response"], "status": 502})
+
+            await websocket.send_json({
+                "type": "done",
+                "request_id": request_id,
+                "cancelled": event["cancelled"],
+                "usage": (metadata or {}).get("usage")
+            })
+    finally:
+        # Stop the upstream stream if the client went away mid-generation
+        cancel.set()
+        await producer
+
+
+@router.websocket("/chat/ws")
+async def chat_ws(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    client_id: Optional[str] = None,
+    session_factory=Depends(get_session_factory)
+):
+    """
+    Streaming chat over a WebSocket with a server-side session.
+
+    Connect with an optional `session_id` (to resume) and `client_id`. The
+    server answers {"type": "session", "session_id": ...} and keeps the
+    conversation context, so clients send only new messages:
+
+    - {"type": "message", "content": "...", "model_name": "..."}: streams
+      {"type": "token", "content": ...} events, then {"type": "done",
+      "request_id": ..., "cancelled": ..., "usage": ...}
+    - {"type": "cancel"}: stops the running generation
+    - {"type": "reset"}: clears the session context
+
+    Failures are sent as {"type": "error", "detail": ..., "status": ...}
+    (503 with "retry_after" when the provider is saturated). Messages larger
+    than MAX_REQUEST_BODY_BYTES close the connection with 1009.
+    """
+    await websocket.accept()
+    # Session stores may block on network round trips (Redis)
+    session_id, session = await run_in_threadpool(chat_sessions.open, session_id, client_id)
+    await websocket.send_json({"type": "session", "session_id": session_id, "turns": len(session.turns)})
+
+    generation: Optional[asyncio.Task] = None
+    cancel = threading.Event()
+    try:
+        while True:
+            # The server already caps frames at ws_max_size(); this also holds
+            # when it runs without that setting, and before any JSON parsing
+            raw = await websocket.receive_text()
+            if len(raw.encode()) > ws_max_size():
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG)
+                break
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects", "status": 422})
+                continue
+            kind = data.get("type", "message")
+
+            if kind == "cancel":
+                cancel.set()
+            elif kind == "reset":
+                session.clear()
+                await run_in_threadpool(chat_sessions.save, session)
+            elif kind == "message":
+                content = data.get("content")
+                if not isinstance(content, str) or not content.strip():
+                    await websocket.send_json({"type": "error", "detail": "content is required", "status": 422})
+                elif len(content) > settings.MAX_PROMPT_CHARS:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": f"content is longer than {settings.MAX_PROMPT_CHARS} characters",
+                        "status": 413
+                    })
+                elif generation is not None and not generation.done():
+                    await websocket.send_json({"type": "error", "detail": "A reply is still streaming", "status": 409})
+                else:
+                    cancel = threading.Event()
+                    generation = asyncio.create_task(_generate(
+                        websocket, session, content, data.get("model_name") or "Oasis", cancel,
+                        session_factory, client_id
+                    ))
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}", "status": 422})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        cancel.set()
+        if generation is not None:
+            try:
+                await generation
+            except Exception:
+                # The socket is gone; the turn could not be delivered
+                pass
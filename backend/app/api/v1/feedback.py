@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models.base import get_db
-from app.schemas.feedback import FeedbackCreate, FeedbackResponse
+from app.schemas.feedback import (
+    FeedbackBatch,
+    FeedbackBatchResponse,
+    FeedbackCreate,
+    FeedbackRejection,
+    FeedbackResponse
+)
 from app.repositories.feedback_repo import FeedbackRepository
 from app.repositories.ai_logs_repo import AILogsRepository
+from app.services.feedback_ingest import feedback_ingestor
 
 router = APIRouter()
 
@@ -34,3 +42,46 @@ async def submit_feedback(
     )
     
     return created_feedback
+
+
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse)
+def submit_feedback_batch(
+    batch: FeedbackBatch,
+    response: Response,
+    background: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Submit feedback for many AI recommendations at once.
+    
+    All items are validated with one query and written with one INSERT.
+    Items for unknown AI requests are reported in `rejected`; the rest are
+    still created.
+    
+    With `?background=true` the items are queued and written in bulk by a
+    background thread instead (202, `queued`). Items for unknown AI requests
+    are then dropped and counted on /metrics. Responds 503 when the queue
+    is full.
+    """
+    if len(batch.items) > settings.FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.FEEDBACK_BATCH_MAX_ITEMS} feedback items per batch"
+        )
+    
+    items = [item.model_dump() for item in batch.items]
+    
+    if background:
+        if not feedback_ingestor.submit(items):
+            raise HTTPException(status_code=503, detail="Feedback queue is full", headers={"Retry-After": "1"})
+        response.status_code = 202
+        return FeedbackBatchResponse(queued=len(items))
+    
+    missing = FeedbackRepository.create_many(db, items)
+    return FeedbackBatchResponse(
+        created=len(items) - len(missing),
+        rejected=[
+            FeedbackRejection(index=i, ai_request_id=items[i]["ai_request_id"], detail="AI request not found")
+            for i in missing
+        ]
+    )
@@ -1,6 +1,7 @@
-from fastapi import APIRouter
-from app.schemas.common import HealthResponse
+from fastapi import APIRouter, Response
+from app.schemas.common import HealthResponse, ReadinessResponse
 from app.config.settings import settings
+from app.core.readiness import readiness
 
 router = APIRouter()
 
@@ -15,12 +16,20 @@ async def health_check():
     )
 
 
-@router.get("/ready", response_model=HealthResponse)
-async def readiness_check():
-    """Readiness check for Kubernetes/Docker"""
-    # TODO: Add database connectivity check
-    return HealthResponse(
-        status="ready",
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
+    """
+    Readiness check for Kubernetes/Docker.
+    
+    503 until the startup warm-up has finished, or while the database is
+    unreachable. Dependency results are cached by a background checker,
+    so probes never hit the database themselves.
+    """
+    state = readiness.status()
+    if state["status"] in ("warming_up", "unavailable"):
+        response.status_code = 503
+    return ReadinessResponse(
         version=settings.APP_VERSION,
-        environment=settings.ENVIRONMENT
+        environment=settings.ENVIRONMENT,
+        **state
     )
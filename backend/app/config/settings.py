@@ -9,13 +9,35 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     ENVIRONMENT: str = "development"
     
+    # Server (production mode of run_backend.py / gunicorn.conf.py)
+    WEB_CONCURRENCY: int = 0  # Worker processes; 0 means 2 * CPU quota + 1 (cgroup-aware)
+    WEB_CONCURRENCY_MAX: int = 8  # Cap for the derived default
+    WORKER_TIMEOUT_SECONDS: int = 60
+    
+    # Request size limits
+    MAX_REQUEST_BODY_BYTES: int = 1048576  # Larger bodies get 413 while they stream in, before parsing; 0 disables
+    MAX_PROMPT_CHARS: int = 32000  # Prompts and chat messages, history entries included; read at import time
+    MAX_CHAT_HISTORY_TURNS: int = 100  # Newest history entries kept per /ai/chat or /ai/monitor-context request
+    PROMPT_LOG_MAX_CHARS: int = 8000  # Longer prompts are truncated in ai_requests
+    
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-prod"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60  # Max staleness of a cached token -> user lookup
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
     
     # Database
     DATABASE_URL: str = "sqlite:///./oasis.db"
+    RUN_MIGRATIONS_ON_STARTUP: bool = True  # Launcher runs migrations once before serving
+    WARMUP_DB_CONNECTIONS: int = 5  # Pool connections opened by the startup warm-up
+    READINESS_CHECK_INTERVAL_SECONDS: int = 10  # Background DB check cached for /ready
+    PROVIDER_WARMUP_TIMEOUT_SECONDS: float = 5  # Per provider warm-up request, no retries; /ready waits for it
+    
+    # Request log retention (python -m app.services.request_archive)
+    REQUEST_RETENTION_DAYS: int = 90  # Older ai_requests rows move to the archive
+    ARCHIVE_DIR: str = "./archive"
+    ARCHIVE_CHUNK_SIZE: int = 5000  # Rows archived and deleted per transaction
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -31,9 +53,63 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = ""
     PERPLEXITY_API_KEY: str = ""
     
+    # Upstream admission control (per worker process)
+    UPSTREAM_MAX_CONCURRENCY: int = 8  # Concurrent calls per provider
+    UPSTREAM_MAX_QUEUE: int = 32  # Waiting calls per provider before shedding
+    UPSTREAM_LIMITS: str = ""  # JSON per-provider overrides, e.g. {"perplexity": {"max_concurrency": 4}}
+    THREADPOOL_HEADROOM: int = 40  # Threadpool threads beyond what admitted and queued upstream calls can hold
+    ANALYSIS_DEADLINE_MS: int = 10000  # Upstream analyses that cannot finish in time use the local recommender
+    
+    # Analyze-as-you-type sessions (/ai/analyze-draft)
+    DRAFT_SESSION_MAX_SESSIONS: int = 10000  # Per worker, least recently used evicted
+    DRAFT_SESSION_TTL_SECONDS: int = 600
+    
+    # Chat model routing
+    CHAT_MODELS: str = ""  # JSON list of upstream models; empty uses the built-in table
+    CHAT_LATENCY_SLA_MS: int = 8000
+    CHAT_ROUTING_COMPLEXITY_THRESHOLD: float = 0.35  # At or above, prefer larger models
+    CHAT_ROUTING_MAX_ERROR_RATE: float = 0.5  # Skip models failing more often than this
+    CHAT_ROUTING_PROBE_INTERVAL_SECONDS: float = 30  # Skipped models still get one request this often
+    
+    # WebSocket chat sessions (/ai/chat/ws)
+    CHAT_SESSION_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (REDIS_URL, shared)
+    CHAT_SESSION_MAX_SESSIONS: int = 10000  # In-memory sessions per worker, least recently used evicted
+    CHAT_SESSION_TTL_SECONDS: int = 1800
+    CHAT_SESSION_MAX_TOKENS: int = 4000  # Context kept per session, oldest turns dropped first
+    
+    # Usage endpoint caching
+    USAGE_CACHE_TTL_SECONDS: float = 5  # Identical /ai/usage queries within this are served from memory
+    USAGE_CACHE_MAX_ENTRIES: int = 256
+    GZIP_MIN_BYTES: int = 1024  # Smaller responses are sent uncompressed
+    
+    # Feedback ingestion
+    FEEDBACK_BATCH_MAX_ITEMS: int = 1000  # Per POST /feedback/feedback/batch
+    FEEDBACK_QUEUE_MAX: int = 10000  # Queued background feedback items per worker
+    FEEDBACK_FLUSH_BATCH_SIZE: int = 500  # Rows per background INSERT
+    
+    # Local prompt classifier (answers analyze-prompt without an LLM call)
+    LOCAL_CLASSIFIER_ENABLED: bool = True
+    LOCAL_CLASSIFIER_MIN_CONFIDENCE: float = 0.9  # Below this, ask an upstream LLM
+    PROMPT_CLASSIFIER_PATH: str = ""  # Empty means app/data/prompt_classifier.npz
+    
+    # Context-shift detection (/ai/monitor-context)
+    CONTEXT_SHIFT_DECAY: float = 0.6  # Weight kept from earlier messages per new message
+    CONTEXT_SHIFT_THRESHOLD: float = 0.5  # Topic weight needed to suggest a switch
+    CONTEXT_SHIFT_MAX_CONVERSATIONS: int = 10000
+    CONTEXT_SHIFT_TTL_SECONDS: int = 3600
+    
     # Observability
     ENABLE_METRICS: bool = True
     ENABLE_TRACING: bool = False
+    PROFILING_ENABLED: bool = False  # Superuser-only sampling profiler and ?profile=1
+    PROFILING_MAX_SECONDS: int = 60
+    PROFILING_TIMERS_ENABLED: bool = False  # Per-method latency histograms; read at import time
+    SERVER_TIMING_ENABLED: bool = True  # Per-phase Server-Timing header on /ai/analyze-prompt
+
+    # Provider record/replay
+    PROVIDER_MODE: str = "live"  # live, record (to cassettes) or replay (from cassettes, no network)
+    PROVIDER_CASSETTE_DIR: str = "./cassettes"
+    REPLAY_LATENCY_SCALE: float = 1.0  # 1 = recorded latency, 0 = none, else time-scaled
     
     class Config:
         case_sensitive = True
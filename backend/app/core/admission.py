@@ -0,0 +1,307 @@
+"""
+Admission control for upstream AI providers.
+
+Each provider gets a gate with a concurrency limit and a bounded wait
+queue, per worker process. Waiters are admitted by priority class, then
+arrival order. A request is shed instead of queued when:
+
+- its deadline leaves less time than a typical upstream call and other
+  calls are in flight (`deadline`); with none in flight it goes through as
+  a probe, so a service-time estimate inflated by slow calls can recover
+- the queue is full of requests of equal or higher priority (`queue_full`)
+- a higher-priority request needs its queue slot (`preempted`)
+- its deadline passes while waiting (`deadline`)
+- its caller no longer needs it, e.g. a superseded draft (`cancelled`)
+
+Shed requests raise AdmissionRejected with a Retry-After estimate; the API
+turns that into 503, or the caller degrades to a local answer.
+
+Gates block the calling thread, so sync routes wait in the threadpool.
+size_thread_limiter() makes that pool large enough for every admitted and
+queued call plus headroom, so overflow reaches a gate and is shed at once
+instead of waiting for a thread, and other routes are not starved.
+"""
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Iterable, Optional
+import anyio.to_thread
+from app.config.settings import settings
+from app.config.logging import logger
+from app.core.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_QUEUE_DEPTH, UPSTREAM_SHED
+
+# Weight of the newest call in the service-time average
+_EWMA_ALPHA = 0.2
+# How often a queued waiter with a cancel event checks it
+_CANCEL_POLL_SECONDS = 0.05
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first"""
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BATCH = 2
+
+    @classmethod
+    def parse(cls, value: Optional[str], default: "Priority") -> "Priority":
+        try:
+            return cls[value.strip().upper()] if value else default
+        except KeyError:
+            return default
+
+
+class AdmissionRejected(Exception):
+    """An upstream call was shed; retry after `retry_after` seconds"""
+
+    def __init__(self, provider: str, reason: str, retry_after: int):
+        super().__init__(f"{provider} is overloaded ({reason})")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "shed")
+
+    def __init__(self, priority: Priority, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.shed: Optional[str] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ProviderGate:
+    """Concurrency limit and priority wait queue for one provider"""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, initial_service_ms: float = 1000.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.service_ms = initial_service_ms
+        self._in_flight = 0
+        self._waiters = []  # Heap of _Waiter
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self) -> None:
+        UPSTREAM_IN_FLIGHT.labels(provider=self.name).set(self._in_flight)
+        UPSTREAM_QUEUE_DEPTH.labels(provider=self.name).set(len(self._waiters))
+
+    def _retry_after(self) -> int:
+        # Time for the current backlog to drain, in whole seconds
+        backlog = self._in_flight + len(self._waiters)
+        return max(1, math.ceil(backlog / max(self.max_concurrency, 1) * self.service_ms / 1000))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        UPSTREAM_SHED.labels(provider=self.name, reason=reason).inc()
+        logger.warning(f"Shedding {self.name} request ({reason}), queue depth {len(self._waiters)}")
+        return AdmissionRejected(self.name, reason, self._retry_after())
+
+    def _remove(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        heapq.heapify(self._waiters)
+        # The head may have changed
+        self._cond.notify_all()
+
+    def acquire(
+        self,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        `deadline` is a time.monotonic() timestamp by which the upstream call
+        must have finished. Setting `cancel` gives up the queue slot.
+        """
+        service_s = self.service_ms / 1000
+        with self._cond:
+            if cancel is not None and cancel.is_set():
+                raise self._reject("cancelled")
+            # Only while calls are in flight: they refresh service_ms when they
+            # finish. An idle gate admits the request as a probe, otherwise one
+            # slow spell would shed every later request and the estimate could
+            # never come down again.
+            if deadline is not None and self._in_flight and deadline - time.monotonic() < service_s:
+                raise self._reject("deadline")
+
+            if self._in_flight < self.max_concurrency and not self._waiters:
+                self._in_flight += 1
+                self._update_gauges()
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                worst = max(self._waiters) if self._waiters else None
+                if worst is None or worst.priority <= priority:
+                    raise self._reject("queue_full")
+                worst.shed = "preempted"
+                self._remove(worst)
+
+            waiter = _Waiter(priority, next(self._seq))
+            heapq.heappush(self._waiters, waiter)
+            self._update_gauges()
+            try:
+                while True:
+                    if waiter.shed:
+                        raise self._reject(waiter.shed)
+                    if cancel is not None and cancel.is_set():
+                        self._remove(waiter)
+                        raise self._reject("cancelled")
+                    if self._waiters[0] is waiter and self._in_flight < self.max_concurrency:
+                        heapq.heappop(self._waiters)
+                        self._in_flight += 1
+                        # Let the next waiter check whether a slot is still free
+                        self._cond.notify_all()
+                        return
+                    timeout = None
+                    if deadline is not None:
+                        # Leave enough time for the call itself
+                        timeout = deadline - time.monotonic() - service_s
+                        if timeout <= 0:
+                            self._remove(waiter)
+                            raise self._reject("deadline")
+                    if cancel is not None:
+                        timeout = min(timeout, _CANCEL_POLL_SECONDS) if timeout is not None else _CANCEL_POLL_SECONDS
+                    self._cond.wait(timeout)
+            finally:
+                self._update_gauges()
+
+    def release(self, elapsed_ms: Optional[float] = None) -> None:
+        """Free the slot; `elapsed_ms` (successful calls only) updates service_ms"""
+        with self._cond:
+            self._in_flight -= 1
+            if elapsed_ms is not None:
+                self.service_ms += _EWMA_ALPHA * (elapsed_ms - self.service_ms)
+            self._update_gauges()
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(
+        self,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ):
+        """
+        Hold a slot for the enclosed call. Calls that raise (timeouts and
+        other failures), or are marked failed(), don't count towards
+        service_ms unless they were already served().
+        """
+        self.acquire(priority, deadline, cancel)
+        slot = _Slot()
+        try:
+            yield slot
+        except BaseException:
+            self.release(slot.served_ms)
+            raise
+        self.release(slot.elapsed_ms())
+
+
+class _Slot:
+    """Timing of one admitted call"""
+
+    __slots__ = ("start", "served_ms", "_failed")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.served_ms: Optional[float] = None
+        self._failed = False
+
+    def served(self) -> None:
+        """
+        Mark the upstream work as done for service_ms, e.g. at the first token
+        of a stream; the rest of the slot's lifetime depends on the client.
+        """
+        if self.served_ms is None:
+            self.served_ms = (time.perf_counter() - self.start) * 1000
+
+    def failed(self) -> None:
+        """The call failed but the caller handles it inside the slot"""
+        self._failed = True
+
+    def elapsed_ms(self) -> Optional[float]:
+        if self.served_ms is not None:
+            return self.served_ms
+        return None if self._failed else (time.perf_counter() - self.start) * 1000
+
+
+class AdmissionController:
+    """Lazily created gates, one per provider"""
+
+    def __init__(self):
+        self._gates: Dict[str, ProviderGate] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _limits(name: str) -> dict:
+        limits = {
+            "max_concurrency": settings.UPSTREAM_MAX_CONCURRENCY,
+            "max_queue": settings.UPSTREAM_MAX_QUEUE
+        }
+        if settings.UPSTREAM_LIMITS:
+            try:
+                limits.update(json.loads(settings.UPSTREAM_LIMITS).get(name, {}))
+            except ValueError as e:
+                logger.error(f"Invalid UPSTREAM_LIMITS, using defaults: {e}")
+        return limits
+
+    def gate(self, name: str) -> ProviderGate:
+        gate = self._gates.get(name)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.get(name)
+                if gate is None:
+                    gate = ProviderGate(name, **self._limits(name))
+                    self._gates[name] = gate
+        return gate
+
+    def admit(
+        self,
+        name: str,
+        priority: Priority = Priority.DEFAULT,
+        deadline: Optional[float] = None,
+        cancel: Optional[threading.Event] = None
+    ):
+        return self.gate(name).admit(priority, deadline, cancel)
+
+    def thread_demand(self, names: Iterable[str]) -> int:
+        """Threads that admitted and queued calls to `names` can hold at once"""
+        return sum(limits["max_concurrency"] + limits["max_queue"] for limits in map(self._limits, names))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._gates.clear()
+
+
+def deadline_in(ms: float) -> float:
+    """Monotonic deadline `ms` milliseconds from now"""
+    return time.monotonic() + ms / 1000
+
+
+def size_thread_limiter(names: Iterable[str]) -> int:
+    """
+    Grow the running event loop's default threadpool to cover the gates of
+    `names` plus THREADPOOL_HEADROOM; returns the new size. Never shrinks it.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, admission.thread_demand(names) + settings.THREADPOOL_HEADROOM)
+    return limiter.total_tokens
+
+
+admission = AdmissionController()
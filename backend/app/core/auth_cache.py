@@ -0,0 +1,58 @@
+"""
+Cache of verified access token -> user principal.
+
+Lets get_current_user skip JWT decoding and the users query for tokens it
+has already verified. Entries live for AUTH_CACHE_TTL_SECONDS, never past
+the token's own expiry, and are dropped as soon as this process commits an
+update (e.g. deactivation) or deletion of the user. Dropping them at
+flush instead would let a concurrent request re-cache the old row before
+the commit. Other worker processes pick
+the change up when their entry expires, so AUTH_CACHE_TTL_SECONDS bounds
+the staleness.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.config.settings import settings
+from app.config.logging import logger
+from app.core.cache import TTLCache
+from app.models.user import User
+
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user(user_id: int) -> int:
+    """Drop every cached principal for `user_id`; returns the number removed"""
+    removed = principal_cache.invalidate_where(lambda _, principal: principal.id == user_id)
+    if removed:
+        logger.info(f"Invalidated {removed} cached token(s) for user {user_id}")
+    return removed
+
+
+def _mark_stale(target: User) -> None:
+    # Invalidated once the session commits (or forgotten if it rolls back)
+    object_session(target).info.setdefault("stale_user_ids", set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _mark_stale_on_update(mapper, connection, target):
+    # Principals carry is_active / is_superuser, so any change makes them stale
+    _mark_stale(target)
+
+
+@event.listens_for(User, "after_delete")
+def _mark_stale_on_delete(mapper, connection, target):
+    _mark_stale(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop("stale_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("stale_user_ids", None)
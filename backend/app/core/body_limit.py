@@ -0,0 +1,76 @@
+"""
+Request body size limit.
+
+Bodies larger than MAX_REQUEST_BODY_BYTES are refused before they are
+parsed. A declared Content-Length over the limit is answered with 413
+straight away, without reading the body. Chunked or under-declared bodies
+are counted as they stream in, and reading stops at the chunk that crosses
+the limit. A worker therefore never buffers more than the limit for one
+request, however large the upload.
+
+WebSocket messages are limited by the server instead (uvicorn's
+ws_max_size, set from ws_max_size() by the launchers), which closes the
+connection with 1009 once a frame grows past it.
+"""
+from typing import Optional
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.settings import settings
+
+# uvicorn's own default ws_max_size
+_DEFAULT_WS_MAX_SIZE = 16 * 1024 * 1024
+
+
+def ws_max_size() -> int:
+    """Largest WebSocket message to accept: MAX_REQUEST_BODY_BYTES, or uvicorn's default when that is 0"""
+    return settings.MAX_REQUEST_BODY_BYTES or _DEFAULT_WS_MAX_SIZE
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware refusing HTTP request bodies over `max_bytes` with 413
+    (default: MAX_REQUEST_BODY_BYTES, read per request)
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = self.max_bytes if self.max_bytes is not None else settings.MAX_REQUEST_BODY_BYTES
+        if scope["type"] != "http" or max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body larger than {max_bytes} bytes"
+        content_length = _content_length(scope)
+        if content_length is not None and content_length > max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside the route's body read, so FastAPI answers it
+                    # like any HTTPException; the rest of the body is never read
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,50 @@
+"""
+CPU quota of the current container.
+
+os.cpu_count() reports the host's cores, so a container limited to two
+CPUs on a 64-core node would start 64 workers. The quota comes from the
+cgroup instead: cpu.max (cgroup v2) or cpu.cfs_quota_us / cpu.cfs_period_us
+(cgroup v1). Without a quota, the CPUs this process may run on are used.
+"""
+import math
+import os
+from typing import Optional
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(root: str = "/sys/fs/cgroup") -> Optional[float]:
+    """CPUs granted by the cgroup quota, or None when unlimited or unknown"""
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us")) or _read(os.path.join(root, "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us")) or _read(os.path.join(root, "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus(root: str = "/sys/fs/cgroup") -> int:
+    """Whole CPUs this process can use: the cgroup quota rounded up, else its CPU affinity"""
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        return max(math.ceil(quota), 1)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers(cap: int, root: str = "/sys/fs/cgroup") -> int:
+    """2 * CPUs + 1 worker processes, at most `cap`"""
+    return max(min(2 * available_cpus(root) + 1, cap), 1)
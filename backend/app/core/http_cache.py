@@ -0,0 +1,106 @@
+"""
+Conditional GET, response caching and gzip for read-mostly JSON endpoints.
+
+An endpoint derives a cheap validator (ETag and Last-Modified) from a
+high-water mark of the data before loading it. When the client's
+If-None-Match / If-Modified-Since matches, the answer is 304 and nothing
+is loaded or serialized. Otherwise the serialized body is kept in a short-
+lived CachedBody, together with its gzip encoding once a client has asked
+for it, so burst polling is answered from memory.
+"""
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from app.config.settings import settings
+
+
+class CachedBody:
+    """A serialized JSON response and its validators"""
+
+    __slots__ = ("etag", "last_modified", "body", "_gzipped")
+
+    def __init__(self, etag: str, last_modified: Optional[datetime], body: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self._gzipped: Optional[bytes] = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            # Compressed once per cached body, not per request
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the validator parts (weak: the gzip and identity bodies share it)"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins; If-Modified-Since only without it"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison
+        return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().removeprefix("q=")
+            try:
+                return float(q) > 0 if q else True
+            except ValueError:
+                return True
+    return False
+
+
+def _validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {
+        "ETag": etag,
+        # Let browsers keep the body but revalidate on every use
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=_validator_headers(etag, last_modified))
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """304, or the cached body, gzip-encoded when it is large and the client accepts it"""
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return not_modified_response(cached.etag, cached.last_modified)
+
+    headers = _validator_headers(cached.etag, cached.last_modified)
+    body = cached.body
+    if len(body) >= settings.GZIP_MIN_BYTES and accepts_gzip(request):
+        body = cached.gzipped
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,76 @@
+"""
+Prometheus metrics.
+
+Exposed on GET /metrics when ENABLE_METRICS is set. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR so every worker's samples are aggregated into
+one scrape.
+"""
+import os
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+    multiprocess,
+)
+
+ANALYSIS_REQUESTS = Counter(
+    "oasis_analysis_requests_total",
+    "Prompt analyses by the path that produced the answer",
+    ["source"]
+)
+
+DRAFT_ANALYSES = Counter(
+    "oasis_draft_analyses_total",
+    "Analyze-as-you-type requests by outcome (local, final, superseded)",
+    ["outcome"]
+)
+
+FEEDBACK_INGESTED = Counter(
+    "oasis_feedback_ingested_total",
+    "Feedback items from background ingestion by outcome",
+    ["outcome"]
+)
+
+CLASSIFIER_LATENCY = Histogram(
+    "oasis_classifier_latency_seconds",
+    "Local prompt classifier inference latency",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+)
+
+UPSTREAM_IN_FLIGHT = Gauge(
+    "oasis_upstream_in_flight",
+    "Upstream provider calls in progress",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+
+UPSTREAM_QUEUE_DEPTH = Gauge(
+    "oasis_upstream_queue_depth",
+    "Requests waiting for an upstream provider slot",
+    ["provider"],
+    multiprocess_mode="livesum"
+)
+
+UPSTREAM_SHED = Counter(
+    "oasis_upstream_shed_total",
+    "Upstream calls rejected by admission control",
+    ["provider", "reason"]
+)
+
+FUNCTION_LATENCY = Histogram(
+    "oasis_function_latency_seconds",
+    "Latency of service and repository methods (PROFILING_TIMERS_ENABLED)",
+    ["function"]
+)
+
+
+def render_metrics() -> tuple:
+    """Return (payload, content_type) for the /metrics endpoint"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
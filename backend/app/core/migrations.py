@@ -0,0 +1,150 @@
+"""
+Versioned schema migrations.
+
+Migrations run once per deployment - from `python -m app.core.migrations`
+or from the launcher before any worker starts - never at import time in a
+worker. Concurrent runners on PostgreSQL are serialized with an advisory
+lock, so only the first replica applies DDL and the others find the schema
+already at head.
+
+Data backfills that would rewrite whole tables are not part of a revision.
+run_migrations() runs them after the schema transaction has committed,
+whenever rows are still pending (so an interrupted backfill resumes on the
+next run), in chunks that commit one at a time. After a plain
+`alembic upgrade`, run them with `python -m app.core.migrations backfill`.
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import bindparam, create_engine, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.config.settings import settings
+from app.config.logging import logger
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Arbitrary key shared by every replica that runs migrations
+MIGRATION_LOCK_ID = 4_027_001
+# Rows rewritten per transaction by backfills
+BACKFILL_CHUNK = 5000
+
+
+def get_alembic_config(database_url: Optional[str] = None) -> Config:
+    """Build the Alembic config independent of the current working directory"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    # configparser treats '%' as interpolation syntax (e.g. in passwords)
+    config.set_main_option("sqlalchemy.url", (database_url or settings.DATABASE_URL).replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _stamp_legacy_schema(connection, config: Config) -> None:
+    """Adopt databases created by the old import-time create_all"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables or "ai_requests" not in tables:
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("ai_requests")}
+    revision = "0002" if "client_id" in columns else "0001"
+    logger.info(f"Existing unversioned schema found, stamping revision {revision}")
+    command.stamp(config, revision)
+
+
+def _text_blobs_pending(engine: Engine) -> bool:
+    from app.models.ai_request import AIRequest
+
+    table = AIRequest.__table__
+    with engine.connect() as conn:
+        return conn.execute(
+            select(table.c.id).where(table.c.prompt_hash.is_(None), table.c.prompt.is_not(None)).limit(1)
+        ).first() is not None
+
+
+def backfill_text_blobs(engine: Engine, chunk_size: int = BACKFILL_CHUNK) -> int:
+    """
+    Move the inline prompt and reasoning of ai_requests rows without a
+    prompt_hash into text_blobs (revision 0005); returns the rows moved.
+
+    Each chunk is its own transaction, so locks on ai_requests are held for
+    one chunk at a time. Only rows without a digest are touched: an
+    interrupted or concurrent run just carries on.
+    """
+    from app.models.ai_request import AIRequest
+    from app.repositories.text_blob_repo import TextBlobRepository
+
+    table = AIRequest.__table__
+    update = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(prompt_hash=bindparam("p_hash"), reasoning_hash=bindparam("r_hash"), prompt=None, reasoning=None)
+    )
+    moved, last_id = 0, 0
+    while True:
+        with Session(engine) as db, db.begin():
+            chunk = db.execute(
+                select(table.c.id, table.c.prompt, table.c.reasoning)
+                .where(table.c.id > last_id, table.c.prompt_hash.is_(None), table.c.prompt.is_not(None))
+                .order_by(table.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not chunk:
+                return moved
+
+            digests = TextBlobRepository.intern(db, [value for row in chunk for value in (row.prompt, row.reasoning)])
+            db.execute(update, [
+                {"row_id": row.id, "p_hash": digests[2 * i], "r_hash": digests[2 * i + 1]}
+                for i, row in enumerate(chunk)
+            ])
+        moved += len(chunk)
+        last_id = chunk[-1].id
+        logger.info(f"Backfilled text blobs for {moved} ai_requests rows")
+
+
+def run_migrations(database_url: Optional[str] = None) -> float:
+    """Upgrade the database to the latest revision; returns elapsed milliseconds"""
+    url = database_url or settings.DATABASE_URL
+    engine = create_engine(url, poolclass=NullPool)
+    start = time.perf_counter()
+
+    try:
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                # Released automatically when the transaction ends
+                connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+            config = get_alembic_config(url)
+            config.attributes["connection"] = connection
+            _stamp_legacy_schema(connection, config)
+            command.upgrade(config, "head")
+
+        if _text_blobs_pending(engine):
+            backfill_text_blobs(engine)
+    finally:
+        engine.dispose()
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Database migrations completed in {elapsed_ms:.1f}ms")
+    return elapsed_ms
+
+
+def run_backfills(database_url: Optional[str] = None) -> int:
+    """Run the data backfills on a database already at head; returns the rows moved"""
+    engine = create_engine(database_url or settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        return backfill_text_blobs(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["backfill"]:
+        run_backfills()
+    else:
+        run_migrations()
@@ -0,0 +1,100 @@
+"""
+Opt-in profiling.
+
+- SamplingProfiler: samples every thread's stack at a fixed interval and
+  returns collapsed stacks ("thread;outer;...;inner count" per line), the
+  input format of flamegraph.pl and speedscope.
+- profile_call: cProfile breakdown of one call.
+- timed: decorator recording a function's latency in a Prometheus histogram.
+  When PROFILING_TIMERS_ENABLED is off at import time it returns the
+  function unchanged, so disabled timers cost nothing.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Tuple
+from app.config.settings import settings
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler over all threads of this process"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+
+    def run(self, seconds: float) -> str:
+        """Sample for `seconds` and return collapsed stacks, hottest first"""
+        stacks: Counter = Counter()
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+def profile_call(fn: Callable, *args, limit: int = 30, **kwargs) -> Tuple[Any, dict]:
+    """Run fn under cProfile; returns (result, breakdown of the top `limit` functions)"""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    result = profiler.runcall(fn, *args, **kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3)
+        })
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return result, {"total_ms": round(elapsed_ms, 3), "functions": rows[:limit]}
+
+
+def timed(name: str) -> Callable:
+    """Record the decorated function's latency as oasis_function_latency_seconds{function=name}"""
+
+    def decorator(fn: Callable) -> Callable:
+        if not settings.PROFILING_TIMERS_ENABLED:
+            return fn
+
+        from app.core.metrics import FUNCTION_LATENCY
+        histogram = FUNCTION_LATENCY.labels(function=name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
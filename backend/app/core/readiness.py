@@ -0,0 +1,164 @@
+"""
+Startup warm-up and readiness state.
+
+On startup each worker runs a warm-up in the background: it prefills the
+database pool, connects to the configured providers that have a live
+call path (see ProviderRegistry.warm), loads the catalog
+and classifier, and pushes a synthetic request through every local path
+(classifier, keyword recommender, model router, context monitor). /ready
+answers 503 until that has finished.
+
+Afterwards a background thread re-checks the database every
+READINESS_CHECK_INTERVAL_SECONDS; probes only read the cached results.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+from sqlalchemy import text
+from app.config.settings import settings
+from app.config.logging import logger
+
+SYNTHETIC_PROMPT = "write a python function that summarizes a long article"
+
+
+class ReadinessMonitor:
+    """Warm-up progress and cached dependency health of this worker"""
+
+    def __init__(self, engine=None):
+        self.engine = engine  # None means the application engine
+        self.ready = False
+        self.warmup_ms: Optional[float] = None
+        self.checks: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._warmed_up = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _engine(self):
+        if self.engine is None:
+            from app.models.base import engine
+            return engine
+        return self.engine
+
+    def _run_check(self, name: str, check: Callable[[], Optional[str]], required: bool = True) -> bool:
+        start = time.perf_counter()
+        try:
+            detail = check() or "ok"
+            ok = True
+        except Exception as e:
+            detail, ok = str(e), False
+            logger.error(f"Readiness check {name} failed: {e}")
+        with self._lock:
+            self.checks[name] = {
+                "ok": ok,
+                "required": required,
+                "detail": detail,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "checked_at": time.time()
+            }
+        return ok
+
+    def _check_database(self) -> str:
+        with self._engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return "ok"
+
+    def _prefill_pool(self) -> str:
+        engine = self._engine()
+        size = getattr(engine.pool, "size", None)
+        target = min(settings.WARMUP_DB_CONNECTIONS, size()) if callable(size) else 1
+        # Hold the connections at the same time so the pool really opens
+        # `target` of them, then return them all
+        connections = [engine.connect() for _ in range(target)]
+        try:
+            for conn in connections:
+                conn.execute(text("SELECT 1"))
+        finally:
+            for conn in connections:
+                conn.close()
+        return f"{target} connections"
+
+    def _warm_providers(self) -> str:
+        from app.services.providers import providers
+
+        warmed, failed = [], []
+        for name in providers.warmable():
+            if not providers.available(name):
+                continue
+            try:
+                providers.warm(name)
+                warmed.append(name)
+            except Exception as e:
+                logger.warning(f"Warming up provider {name} failed: {e}")
+                failed.append(name)
+        if failed:
+            # Reported as a failed (optional) check
+            raise RuntimeError(f"warmed {', '.join(warmed) or 'none'}; failed {', '.join(failed)}")
+        return ", ".join(warmed) or "no providers configured"
+
+    def _warm_local_paths(self) -> str:
+        from app.services.ai_service import AIService
+        from app.services.catalog import get_catalog
+        from app.services.context_monitor import ContextShiftDetector
+        from app.services.model_router import model_router
+        from app.services.prompt_classifier import get_prompt_classifier
+
+        get_catalog()
+        get_prompt_classifier()
+        AIService.classify_prompt(SYNTHETIC_PROMPT)
+        AIService.get_ai_recommendation(SYNTHETIC_PROMPT)
+        model_router.route(SYNTHETIC_PROMPT)
+        # A throwaway detector, so no conversation state is left behind
+        ContextShiftDetector(max_conversations=1).observe("warm-up", message=SYNTHETIC_PROMPT)
+        return "ok"
+
+    def warm_up(self) -> bool:
+        """Run every warm-up step; the worker is ready if the required ones passed"""
+        start = time.perf_counter()
+        ok = self._run_check("database", self._prefill_pool)
+        self._run_check("providers", self._warm_providers, required=False)
+        ok = self._run_check("local_paths", self._warm_local_paths) and ok
+
+        self.warmup_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.ready = True
+        self._warmed_up.set()
+        logger.info(f"Warm-up completed in {self.warmup_ms}ms ({'healthy' if ok else 'degraded'})")
+        return ok
+
+    def _refresh_loop(self) -> None:
+        self.warm_up()
+        while not self._stop.wait(settings.READINESS_CHECK_INTERVAL_SECONDS):
+            self._run_check("database", self._check_database)
+
+    def start(self) -> None:
+        """Warm up and keep checking dependencies in a background thread"""
+        self.ready = False
+        self._warmed_up.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="readiness", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warm-up has finished"""
+        return self._warmed_up.wait(timeout)
+
+    def status(self) -> dict:
+        """Cached readiness; never touches a dependency"""
+        with self._lock:
+            checks = {name: dict(check) for name, check in self.checks.items()}
+
+        if not self.ready:
+            status = "warming_up"
+        elif any(c["required"] and not c["ok"] for c in checks.values()):
+            status = "unavailable"
+        elif any(not c["ok"] for c in checks.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {"status": status, "warmup_ms": self.warmup_ms, "checks": checks}
+
+
+readiness = ReadinessMonitor()
@@ -0,0 +1,80 @@
+"""
+Per-request phase timings.
+
+A RequestTimer records the named phases of one request: each provider
+attempt (admission wait included), response parsing, the local
+classifier and recommender, the DB write and serialization. Code deeper in
+the call stack records into the current request's timer with
+`phase(name)`, which does nothing outside `request_timer()`. Endpoints
+report the phases in a Server-Timing header and store them in the request
+log, so slow phases can be aggregated with SQL.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.config.settings import settings
+
+_current: ContextVar[Optional["RequestTimer"]] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Ordered (phase, milliseconds) records of one request"""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self) -> Dict[str, float]:
+        """Milliseconds per phase name, repeated phases summed"""
+        totals: Dict[str, float] = {}
+        for name, ms in self.phases:
+            totals[name] = totals.get(name, 0.0) + ms
+        return {name: round(ms, 2) for name, ms in totals.items()}
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: every phase in order, then the total"""
+        entries = [f"{name};dur={ms:.2f}" for name, ms in self.phases]
+        entries.append(f"total;dur={self.elapsed_ms():.2f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def request_timer() -> Iterator[RequestTimer]:
+    """Make a new timer the current one for the enclosed code"""
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Record the enclosed code as `name` in the current request's timer, if any"""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+def server_timing_headers(timer: RequestTimer) -> dict:
+    if not settings.SERVER_TIMING_ENABLED:
+        return {}
+    return {"Server-Timing": timer.server_timing()}
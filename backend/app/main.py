@@ -1,27 +1,22 @@
-from fastapi import FastAPI
+import time
+
+_boot_started = time.perf_counter()
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config.settings import settings
 from app.config.logging import logger
+from app.core.admission import AdmissionRejected, size_thread_limiter
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.readiness import readiness
+from app.services.feedback_ingest import feedback_ingestor
+from app.services.providers import providers
 from app.api.v1.router import api_router
-from app.models.base import Base, engine
 from app.models import user, ai_request, feedback  # Import to register models
 
-from sqlalchemy import text
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Simple migration for client_id column
-try:
-    with engine.connect() as conn:
-        # Check if client_id exists
-        result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='ai_requests' AND column_name='client_id'"))
-        if not result.fetchone():
-            logger.info("Adding client_id column to ai_requests table...")
-            conn.execute(text("ALTER TABLE ai_requests ADD COLUMN client_id VARCHAR"))
-            conn.commit()
-            logger.info("Column added successfully.")
-except Exception as e:
-    logger.error(f"Migration error: {e}")
+# Schema changes are applied by versioned migrations (app.core.migrations),
+# run once by the launcher or `python -m app.core.migrations`, not here.
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -29,6 +24,10 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Refuse oversized bodies before they are buffered and parsed (added first so
+# that CORS, the outer middleware, still decorates the 413)
+app.add_middleware(BodySizeLimitMiddleware)
+
 # CORS middleware
 origins = settings.CORS_ORIGINS.split(",")
 if settings.ENVIRONMENT != "development":
@@ -46,15 +45,36 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    # Fail fast instead of queueing work that would time out anyway
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Upstream provider {exc.provider} is busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
+    
+    # Upstream calls wait for admission in threadpool threads
+    logger.info(f"Threadpool size: {size_thread_limiter(providers.names())}")
+    
+    # Warm the DB pool, provider clients, catalog and classifier in the
+    # background; /ready reports 503 until it is done
+    readiness.start()
+    
+    logger.info(f"Boot completed in {(time.perf_counter() - _boot_started) * 1000:.1f}ms")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application")
+    readiness.stop()
+    feedback_ingestor.stop()
 
 
 @app.get("/")
@@ -64,3 +84,11 @@ async def root():
         "version": settings.APP_VERSION,
         "docs": "/docs"
     }
+
+
+if settings.ENABLE_METRICS:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        from app.core.metrics import render_metrics
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
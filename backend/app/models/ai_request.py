@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, LargeBinary, Text, JSON, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship
 from app.models.base import Base
+from app.models.text_blob import TextBlob
 
 
 class AIRequest(Base):
@@ -9,11 +11,51 @@ class AIRequest(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     client_id = Column(String, index=True, nullable=True)
-    prompt = Column(Text, nullable=False)
+    # Text is stored once in text_blobs and referenced by digest; the inline
+    # columns only hold rows written before that (or inserted directly)
+    prompt_inline = Column("prompt", Text, nullable=True)
+    prompt_hash = Column(LargeBinary(32), ForeignKey("text_blobs.id"), nullable=True)
     recommended_model = Column(String, nullable=False)
     provider = Column(String, nullable=False)
-    reasoning = Column(Text)
+    reasoning_inline = Column("reasoning", Text, nullable=True)
+    reasoning_hash = Column(LargeBinary(32), ForeignKey("text_blobs.id"), nullable=True)
     response_time_ms = Column(Float)
     estimated_cost = Column(Float)
     request_metadata = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    prompt_blob = relationship(TextBlob, foreign_keys=[prompt_hash], lazy="joined")
+    reasoning_blob = relationship(TextBlob, foreign_keys=[reasoning_hash], lazy="joined")
+    
+    __table_args__ = (
+        # High-water mark per client for usage ETags
+        Index("ix_ai_requests_client_id_id", "client_id", "id"),
+    )
+    
+    @hybrid_property
+    def prompt(self):
+        return self.prompt_blob.content if self.prompt_blob is not None else self.prompt_inline
+    
+    @prompt.inplace.setter
+    def _prompt_setter(self, value):
+        self.prompt_inline = value
+    
+    @prompt.inplace.expression
+    @classmethod
+    def _prompt_expression(cls):
+        content = select(TextBlob.content).where(TextBlob.id == cls.prompt_hash).scalar_subquery()
+        return func.coalesce(content, cls.prompt_inline)
+    
+    @hybrid_property
+    def reasoning(self):
+        return self.reasoning_blob.content if self.reasoning_blob is not None else self.reasoning_inline
+    
+    @reasoning.inplace.setter
+    def _reasoning_setter(self, value):
+        self.reasoning_inline = value
+    
+    @reasoning.inplace.expression
+    @classmethod
+    def _reasoning_expression(cls):
+        content = select(TextBlob.content).where(TextBlob.id == cls.reasoning_hash).scalar_subquery()
+        return func.coalesce(content, cls.reasoning_inline)
@@ -17,6 +17,11 @@ class Base(DeclarativeBase):
     pass
 
 
+def get_session_factory():
+    """Dependency for handlers that open their own short-lived sessions (WebSockets)"""
+    return SessionLocal
+
+
 def get_db():
     """Dependency for database sessions"""
     db = SessionLocal()
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, LargeBinary, Text
+from app.models.base import Base
+
+
+class TextBlob(Base):
+    """Deduplicated text (prompts, reasonings), keyed by its SHA-256 digest"""
+    __tablename__ = "text_blobs"
+    
+    id = Column(LargeBinary(32), primary_key=True)
+    content = Column(Text, nullable=False)
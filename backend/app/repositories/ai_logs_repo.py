@@ -1,12 +1,20 @@
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models.ai_request import AIRequest
-from typing import Optional, List
+from app.models.feedback import Feedback
+from app.core.profiling import timed
+from app.repositories.text_blob_repo import TextBlobRepository
+from typing import Iterator, Optional, List
+import heapq
+import itertools
 
 
 class AILogsRepository:
     """Data access layer for AI request logs"""
     
     @staticmethod
+    @timed("AILogsRepository.create")
     def create(
         db: Session,
         prompt: str,
@@ -16,19 +24,29 @@ class AILogsRepository:
         user_id: Optional[int] = None,
         client_id: Optional[str] = None,
         response_time_ms: Optional[float] = None,
-        estimated_cost: Optional[float] = None
+        estimated_cost: Optional[float] = None,
+        request_metadata: Optional[dict] = None
     ) -> AIRequest:
-        """Log an AI recommendation request"""
+        """
+        Log an AI recommendation request; prompt and reasoning are stored
+        deduplicated. Prompts longer than PROMPT_LOG_MAX_CHARS are stored
+        truncated, with the original length in request_metadata.prompt_chars.
+        """
         
+        if len(prompt) > settings.PROMPT_LOG_MAX_CHARS:
+            request_metadata = {**(request_metadata or {}), "prompt_chars": len(prompt)}
+            prompt = prompt[:settings.PROMPT_LOG_MAX_CHARS]
+        prompt_hash, reasoning_hash = TextBlobRepository.intern(db, [prompt, reasoning])
         ai_request = AIRequest(
             user_id=user_id,
             client_id=client_id,
-            prompt=prompt,
+            prompt_hash=prompt_hash,
             recommended_model=recommended_model,
             provider=provider,
-            reasoning=reasoning,
+            reasoning_hash=reasoning_hash,
             response_time_ms=response_time_ms,
-            estimated_cost=estimated_cost
+            estimated_cost=estimated_cost,
+            request_metadata=request_metadata
         )
         
         db.add(ai_request)
@@ -38,21 +56,97 @@ class AILogsRepository:
         return ai_request
     
     @staticmethod
-    def list(db: Session, skip: int = 0, limit: int = 100, client_id: Optional[str] = None) -> List[AIRequest]:
-        """List AI requests with pagination"""
+    @timed("AILogsRepository.list")
+    def list(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        client_id: Optional[str] = None,
+        include_archive: bool = False
+    ) -> List:
+        """
+        List AI requests with pagination, newest first.
+        
+        With `include_archive`, rows moved to the archive by the retention
+        job are merged in and every row is returned as a dict.
+        """
         query = db.query(AIRequest)
         if client_id:
             query = query.filter(AIRequest.client_id == client_id)
-        return query.order_by(AIRequest.created_at.desc()).offset(skip).limit(limit).all()
+        query = query.order_by(AIRequest.created_at.desc())
+        if not include_archive:
+            return query.offset(skip).limit(limit).all()
+
+        from app.services.request_archive import COLUMNS, as_utc, scan
+
+        def hot_rows():
+            for row in query.limit(skip + limit):
+                values = {column: getattr(row, column) for column in COLUMNS}
+                values["created_at"] = as_utc(values["created_at"])
+                yield values
+
+        archived = scan(client_id=client_id, newest_first=True)
+        merged = heapq.merge(hot_rows(), archived, key=lambda row: row["created_at"], reverse=True)
+        return list(itertools.islice(merged, skip, skip + limit))
 
     @staticmethod
+    @timed("AILogsRepository.high_water_mark")
+    def high_water_mark(db: Session, client_id: Optional[str] = None) -> tuple:
+        """
+        (max id, min id, created_at of the max id) of the logged requests,
+        optionally for one client: changes whenever a request is logged or
+        archived. Each part is its own subquery so that it is one lookup in
+        the id or (client_id, id) index; max(created_at) per client would
+        visit all of the client's rows.
+        """
+        filters = [AIRequest.client_id == client_id] if client_id else []
+        max_id = select(func.max(AIRequest.id)).where(*filters).scalar_subquery()
+        min_id = select(func.min(AIRequest.id)).where(*filters).scalar_subquery()
+        last_modified = select(AIRequest.created_at).where(AIRequest.id == max_id).scalar_subquery()
+        return tuple(db.execute(select(max_id, min_id, last_modified)).one())
+
+    @staticmethod
+    @timed("AILogsRepository.get_by_id")
     def get_by_id(db: Session, request_id: int) -> Optional[AIRequest]:
         """Get a specific AI request log by ID"""
         return db.query(AIRequest).filter(AIRequest.id == request_id).first()
 
     @staticmethod
+    @timed("AILogsRepository.get_stats")
     def get_stats(db: Session):
         """Get summary stats for dashboard"""
         # This is a simple implementation, could be optimized with raw SQL or complex queries
         requests = db.query(AIRequest).all()
         return requests
+
+    @staticmethod
+    def iter_with_feedback(db: Session, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Stream (prompt, recommended_model, request_metadata, avg_rating,
+        helpful_votes, unhelpful_votes) for every logged request, with its
+        feedback aggregated in the same query.
+        """
+        feedback = (
+            db.query(
+                Feedback.ai_request_id.label("ai_request_id"),
+                func.avg(Feedback.rating).label("avg_rating"),
+                func.sum(case((Feedback.was_helpful.is_(True), 1), else_=0)).label("helpful"),
+                func.sum(case((Feedback.was_helpful.is_(False), 1), else_=0)).label("unhelpful")
+            )
+            .group_by(Feedback.ai_request_id)
+            .subquery()
+        )
+        query = (
+            db.query(
+                AIRequest.prompt,
+                AIRequest.recommended_model,
+                AIRequest.request_metadata,
+                feedback.c.avg_rating,
+                feedback.c.helpful,
+                feedback.c.unhelpful
+            )
+            .outerjoin(feedback, feedback.c.ai_request_id == AIRequest.id)
+            .order_by(AIRequest.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from query
@@ -1,12 +1,16 @@
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from app.models.ai_request import AIRequest
 from app.models.feedback import Feedback
-from typing import Optional
+from app.core.profiling import timed
+from typing import List, Optional
 
 
 class FeedbackRepository:
     """Data access layer for feedback"""
     
     @staticmethod
+    @timed("FeedbackRepository.create")
     def create(
         db: Session,
         ai_request_id: int,
@@ -30,3 +34,40 @@ class FeedbackRepository:
         db.refresh(feedback)
         
         return feedback
+    
+    @staticmethod
+    @timed("FeedbackRepository.create_many")
+    def create_many(db: Session, items: List[dict]) -> List[int]:
+        """
+        Create feedback for many AI requests in one transaction.
+        
+        `items` are dicts of create()'s keyword arguments. Existence of all
+        referenced AI requests is checked with one query and the valid rows
+        are written with one multi-row INSERT. Returns the indexes of the
+        items whose AI request does not exist; those are not created.
+        """
+        if not items:
+            return []
+        
+        requested = {item["ai_request_id"] for item in items}
+        existing = set(db.scalars(select(AIRequest.id).where(AIRequest.id.in_(requested))))
+        
+        missing = [i for i, item in enumerate(items) if item["ai_request_id"] not in existing]
+        rows = [
+            {
+                "ai_request_id": item["ai_request_id"],
+                "user_id": item.get("user_id"),
+                "rating": item.get("rating"),
+                "was_helpful": item.get("was_helpful"),
+                "comment": item.get("comment")
+            }
+            for item in items
+            if item["ai_request_id"] in existing
+        ]
+        if rows:
+            # Core insert: the ORM would split rows with different None
+            # columns into separate statements
+            db.execute(insert(Feedback.__table__), rows)
+        db.commit()
+        
+        return missing
@@ -0,0 +1,107 @@
+import hashlib
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config.logging import logger
+from app.models.ai_request import AIRequest
+from app.models.text_blob import TextBlob
+from typing import Iterable, List, Optional
+
+
+def digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _insert_ignoring_duplicates(db: Session, rows: List[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        existing = set(db.scalars(select(TextBlob.id).where(TextBlob.id.in_([row["id"] for row in rows]))))
+        rows = [row for row in rows if row["id"] not in existing]
+        if rows:
+            db.execute(TextBlob.__table__.insert(), rows)
+        return
+    db.execute(insert(TextBlob.__table__).on_conflict_do_nothing(index_elements=["id"]), rows)
+
+
+def _lock(db: Session, keys: List[bytes]) -> set:
+    """
+    Share-lock the blobs that exist among `keys` until the transaction ends,
+    so the retention job cannot delete them before the referencing
+    ai_requests row is committed. SQLite serializes writers; nothing to do.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return set(keys)
+    return set(db.scalars(select(TextBlob.id).where(TextBlob.id.in_(keys)).with_for_update(key_share=True)))
+
+
+def _unreferenced(key):
+    return ~exists().where(AIRequest.prompt_hash == key) & ~exists().where(AIRequest.reasoning_hash == key)
+
+
+class TextBlobRepository:
+    """Content-addressed storage for repeated text columns"""
+
+    @staticmethod
+    def intern(db: Session, texts: Iterable[Optional[str]]) -> List[Optional[bytes]]:
+        """
+        Store each text once and return its digest (None for None).
+
+        All texts are written with one INSERT that skips existing digests,
+        and the existing ones are locked against the retention job's
+        cleanup (one SELECT ... FOR KEY SHARE). Not caching which digests
+        exist keeps this correct when the job deletes blobs. Does not commit.
+        """
+        digests, new_rows = [], {}
+        for text in texts:
+            if text is None:
+                digests.append(None)
+                continue
+            key = digest(text)
+            digests.append(key)
+            new_rows[key] = {"id": key, "content": text}
+
+        rows = list(new_rows.values())
+        while rows:
+            _insert_ignoring_duplicates(db, rows)
+            locked = _lock(db, [row["id"] for row in rows])
+            # Deleted by the job between the two statements: insert again
+            rows = [row for row in rows if row["id"] not in locked]
+        return digests
+
+    @staticmethod
+    def delete_unreferenced(db: Session, candidates: Iterable[Optional[bytes]]) -> int:
+        """
+        Delete those of `candidates` no ai_requests row references any more
+        (after rows were archived). Does not commit.
+        
+        A request logged concurrently can reference a candidate without
+        being visible yet; the DELETE then fails its foreign key check. The
+        candidates are retried one by one and the referenced ones kept.
+        """
+        candidates = {key for key in candidates if key is not None}
+        if not candidates:
+            return 0
+
+        table = TextBlob.__table__
+        try:
+            with db.begin_nested():
+                return db.execute(
+                    table.delete().where(table.c.id.in_(candidates), _unreferenced(table.c.id))
+                ).rowcount
+        except IntegrityError:
+            logger.info(f"Text blobs referenced concurrently, deleting {len(candidates)} candidates one by one")
+
+        deleted = 0
+        for key in candidates:
+            try:
+                with db.begin_nested():
+                    deleted += db.execute(
+                        table.delete().where(table.c.id == key, _unreferenced(table.c.id))
+                    ).rowcount
+            except IntegrityError:
+                pass
+        return deleted
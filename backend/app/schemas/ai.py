@@ -1,21 +1,46 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, BeforeValidator, Field, PrivateAttr, field_validator, model_validator
+from typing import Annotated, List, Literal, Optional
+from app.config.settings import settings
+
+# Limits are read at import time
+Prompt = Annotated[str, Field(max_length=settings.MAX_PROMPT_CHARS)]
+
+class ChatMessage(BaseModel):
+    """One history entry; anything but role and content is dropped"""
+    role: Literal["user", "assistant", "system"] = "user"
+    content: Prompt = ""
+    
+    @field_validator("role", mode="before")
+    @classmethod
+    def _web_client_role(cls, value):
+        # The web client calls the other side "ai"
+        return "assistant" if value == "ai" else value
+
+def _newest_turns(value):
+    # Older entries are dropped before they are validated into ChatMessages
+    if isinstance(value, list) and len(value) > settings.MAX_CHAT_HISTORY_TURNS:
+        return value[-settings.MAX_CHAT_HISTORY_TURNS:]
+    return value
+
+History = Annotated[List[ChatMessage], BeforeValidator(_newest_turns)]
 
 class AnalyzePromptRequest(BaseModel):
-    prompt: str
+    prompt: Prompt
     user_id: Optional[int] = None
     client_id: Optional[str] = None
 
 class ChatRequest(BaseModel):
-    message: str
+    message: Prompt
     model_name: str
-    history: Optional[List[dict]] = []
+    history: History = []
     user_id: Optional[int] = None
     client_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
     request_id: Optional[int] = None
+    profile: Optional[dict] = None  # cProfile breakdown, with ?profile=1
 
 class ModelRecommendation(BaseModel):
     name: str
@@ -31,3 +56,71 @@ class AnalyzePromptResponse(BaseModel):
     recommendation: ModelRecommendation
     alternative: Optional[ModelRecommendation] = None
     request_id: int
+    profile: Optional[dict] = None  # cProfile breakdown, with ?profile=1
+
+class AnalyzeDraftRequest(BaseModel):
+    session_id: str  # One typing session, e.g. one prompt box
+    revision: int  # Increases with every edit
+    prompt: Prompt
+    final: bool = False  # True when the prompt is submitted
+    user_id: Optional[int] = None
+    client_id: Optional[str] = None
+
+class AnalyzeDraftResponse(BaseModel):
+    revision: int
+    superseded: bool = False  # A newer revision arrived; discard this answer
+    recommendation: Optional[ModelRecommendation] = None
+    alternative: Optional[ModelRecommendation] = None
+    source: Optional[str] = None
+    request_id: Optional[int] = None  # Final revisions only
+
+class MonitorContextRequest(BaseModel):
+    messages: List[ChatMessage] = []  # Newest MAX_CHAT_HISTORY_TURNS only
+    current_model: str = "Unknown"
+    conversation_id: Optional[str] = None
+    message: Optional[Prompt] = None  # Newest user message only, instead of the full history
+    client_id: Optional[str] = None
+    _messages_dropped: int = PrivateAttr(0)
+    
+    @model_validator(mode="wrap")
+    @classmethod
+    def _newest_messages(cls, data, handler):
+        # Like History, but the detector needs to know how many were dropped
+        # to tell which of the remaining messages it has already seen
+        dropped = 0
+        if isinstance(data, dict) and isinstance(data.get("messages"), list):
+            dropped = max(len(data["messages"]) - settings.MAX_CHAT_HISTORY_TURNS, 0)
+            if dropped:
+                data = {**data, "messages": data["messages"][dropped:]}
+        request = handler(data)
+        if request.conversation_id and not request.client_id:
+            # Conversation ids are chosen by clients; unscoped, two clients
+            # using the same id would share one detector state
+            raise ValueError("client_id is required with conversation_id")
+        request._messages_dropped = dropped
+        return request
+
+class MonitorContextResponse(BaseModel):
+    should_switch: bool
+    suggested_model: Optional[str] = None
+    provider: Optional[str] = None
+    reason: Optional[str] = None
+    subtitle: Optional[str] = None
+    category: Optional[str] = None
+    confidence: Optional[float] = None
+
+class AIRequestLog(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    client_id: Optional[str] = None
+    prompt: str
+    recommended_model: str
+    provider: str
+    reasoning: Optional[str] = None
+    response_time_ms: Optional[float] = None
+    estimated_cost: Optional[float] = None
+    request_metadata: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -25,3 +25,16 @@ class UserResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class UserPrincipal(BaseModel):
+    """Authenticated user as seen by request handlers (detached from the DB session)"""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_superuser: bool = False
+    
+    class Config:
+        from_attributes = True
+        frozen = True
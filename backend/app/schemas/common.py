@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 
 class HealthResponse(BaseModel):
@@ -8,6 +8,19 @@ class HealthResponse(BaseModel):
     environment: str
 
 
+class DependencyCheck(BaseModel):
+    ok: bool
+    required: bool
+    detail: str
+    latency_ms: float
+    checked_at: float
+
+
+class ReadinessResponse(HealthResponse):
+    warmup_ms: Optional[float] = None
+    checks: Dict[str, DependencyCheck] = {}
+
+
 class ErrorResponse(BaseModel):
     detail: str
     code: Optional[str] = None
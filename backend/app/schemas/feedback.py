@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class FeedbackCreate(BaseModel):
@@ -18,3 +18,19 @@ class FeedbackResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class FeedbackBatch(BaseModel):
+    items: List[FeedbackCreate]
+
+
+class FeedbackRejection(BaseModel):
+    index: int  # Position in `items`
+    ai_request_id: int
+    detail: str
+
+
+class FeedbackBatchResponse(BaseModel):
+    created: int = 0
+    rejected: List[FeedbackRejection] = []
+    queued: int = 0  # Items accepted for background ingestion
@@ -1,385 +1,443 @@
-from groq import Groq
-import google.generativeai as genai
 import json
+import threading
+import time
+from typing import Iterator, Optional
 from app.schemas.ai import ModelRecommendation
 from app.config.settings import settings
 from app.config.logging import logger
+from app.core.admission import AdmissionRejected, Priority, admission, deadline_in
+from app.core.metrics import ANALYSIS_REQUESTS, CLASSIFIER_LATENCY
+from app.core.profiling import timed
+from app.core.request_timing import phase
+from app.services.providers import providers
+from app.services.catalog import get_catalog, DEFAULT_RECOMMENDATION, DEFAULT_ALTERNATIVE
+from app.services.context_monitor import context_detector
+from app.services.model_router import model_router
+from app.services.prompts import (
+    CHAT_PERSONA,
+    PERPLEXITY_ANALYSIS_PROMPT,
+    GEMINI_ANALYSIS_PROMPT,
+    GROQ_ANALYSIS_PROMPT
+)
 
-class AIService:
-    """Smart AI service using Gemini for analysis and Groq for chat"""
-    
-    _groq_client = None
-    _gemini_initialized = False
+def _is_set(event: Optional[threading.Event]) -> bool:
+    return event is not None and event.is_set()
 
-    @classmethod
-    def _init_groq(cls):
-        if not cls._groq_client and settings.GROQ_API_KEY:
-            cls._groq_client = Groq(api_key=settings.GROQ_API_KEY)
 
-    @classmethod
-    def _init_gemini(cls):
-        if not cls._gemini_initialized and settings.GOOGLE_API_KEY:
-            genai.configure(api_key=settings.GOOGLE_API_KEY)
-            cls._gemini_initialized = True
+class AIService:
+    """Smart AI service using Gemini for analysis and Groq for chat"""
 
     @staticmethod
-    def chat_with_model(message: str, model_name: str, history: list = None) -> str:
-        """Chat using Groq (fast and conversational)"""
+    @timed("AIService.chat_with_model")
+    def chat_with_model(message: str, model_name: str, history: list = None) -> dict:
+        """
+        Chat using Groq (fast and conversational).
         
-        if settings.GROQ_API_KEY:
+        The upstream model and max_tokens are chosen per request by the
+        model router. Returns the reply text and metadata (routing
+        decision, token usage, latency) for the request log. Raises
+        AdmissionRejected when Groq is saturated.
+        """
+        
+        if providers.available("groq"):
+            decision = model_router.route(message, history)
+            deadline = deadline_in(decision["latency_sla_ms"])
+            start = time.perf_counter()
             try:
-                AIService._init_groq()
+                groq_client = providers.get("groq")
                 
                 # Define the Persona based on User Request
-                system_persona = """You are an AI assistant designed to embody three core archetypes:
-1. The Warm Coach: Supportive, encouraging, and calm. Give gentle accountability without being harsh.
-2. The Reliable Expert: Concise, accurate, and structured. But don't ask questions that are not relevant to the task. Ask one or two question, and try to make conversation easy.Do not hallucinate confidently.
-3. The Friendly Companion: Casual tone, remember context, and make conversation easy. Avoid excessive flattery.
-
-CRITICAL INSTRUCTION: Be SHORT and DIRECT. Avoid lengthy preambles. Get straight to the point."""
+                system_persona = CHAT_PERSONA
 
                 messages = [
                     {"role": "system", "content": f"You are {model_name}. {system_persona}"},
                     {"role": "user", "content": message}
                 ]
                 
-                response = AIService._groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1024
-                )
+                with admission.admit("groq", Priority.INTERACTIVE, deadline):
+                    start = time.perf_counter()
+                    response = groq_client.chat.completions.create(
+                        model=decision["model"],
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=decision["max_tokens"]
+                    )
+                latency_ms = (time.perf_counter() - start) * 1000
                 
-                return response.choices[0].message.content
+                usage = AIService._usage(getattr(response, "usage", None))
+                model_router.record(decision["model"], latency_ms, usage["completion_tokens"])
                 
+                return {
+                    "response": response.choices[0].message.content,
+                    "metadata": {
+                        "kind": "chat",
+                        "routing": decision,
+                        "usage": usage,
+                        "latency_ms": round(latency_ms, 1)
+                    }
+                }
+                
+            except AdmissionRejected:
+                raise
             except Exception as e:
+                model_router.record(decision["model"], (time.perf_counter() - start) * 1000, error=True)
                 logger.error(f"Groq Chat failed: {str(e)}", exc_info=True)
-                return f"Chat temporarily unavailable: {str(e)}"
+                return {
+                    "response": f"Chat temporarily unavailable: {str(e)}",
+                    "metadata": {"kind": "chat", "routing": decision, "error": str(e)}
+                }
+        
+        return {"response": f"[{model_name}] Chat unavailable - no API key configured.", "metadata": None}
+
+    @staticmethod
+    def _usage(usage) -> dict:
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "total_tokens": getattr(usage, "total_tokens", None)
+        }
+
+    @staticmethod
+    def stream_chat(
+        message: str,
+        model_name: str,
+        history: Optional[list] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[dict]:
+        """
+        Streaming chat for /ai/chat/ws.
         
-        return f"[{model_name}] Chat unavailable - no API key configured."
+        Unlike chat_with_model, `history` (provider-format turns kept by the
+        server-side session) is sent upstream. Yields {"type": "token",
+        "content": ...} events, then one {"type": "done", "response": ...,
+        "cancelled": ..., "metadata": ...}. Setting `cancel` stops the
+        generation at the next token and closes the upstream stream. Raises
+        AdmissionRejected before the first event when Groq is saturated.
+        """
+        if not providers.available("groq"):
+            text = f"[{model_name}] Chat unavailable - no API key configured."
+            yield {"type": "token", "content": text}
+            yield {"type": "done", "response": text, "cancelled": False, "metadata": None}
+            return
+        
+        decision = model_router.route(message, history)
+        deadline = deadline_in(decision["latency_sla_ms"])
+        parts, usage, cancelled = [], None, False
+        
+        # The slot is held until the stream ends, but only the time to the
+        # first token counts as Groq service time: the rest is paced by the
+        # client reading the reply
+        with admission.admit("groq", Priority.INTERACTIVE, deadline) as slot:
+            start = time.perf_counter()
+            try:
+                groq_client = providers.get("groq")
+                messages = [{"role": "system", "content": f"You are {model_name}. {CHAT_PERSONA}"}]
+                messages += history or []
+                messages.append({"role": "user", "content": message})
+                
+                stream = groq_client.chat.completions.create(
+                    model=decision["model"],
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=decision["max_tokens"],
+                    stream=True
+                )
+                try:
+                    for chunk in stream:
+                        slot.served()
+                        if cancel is not None and cancel.is_set():
+                            cancelled = True
+                            break
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            yield {"type": "token", "content": delta}
+                        # Groq reports usage on the final chunk
+                        chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                        if chunk_usage is not None:
+                            usage = chunk_usage
+                finally:
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+            except Exception as e:
+                slot.failed()
+                model_router.record(decision["model"], (time.perf_counter() - start) * 1000, error=True)
+                logger.error(f"Groq Chat stream failed: {str(e)}", exc_info=True)
+                yield {
+                    "type": "done",
+                    "response": "".join(parts) or f"Chat temporarily unavailable: {str(e)}",
+                    "cancelled": False,
+                    "metadata": {"kind": "chat", "routing": decision, "error": str(e)}
+                }
+                return
+            
+            latency_ms = (time.perf_counter() - start) * 1000
+        
+        usage = AIService._usage(usage)
+        if not cancelled:
+            model_router.record(decision["model"], latency_ms, usage["completion_tokens"])
+        yield {
+            "type": "done",
+            "response": "".join(parts),
+            "cancelled": cancelled,
+            "metadata": {
+                "kind": "chat",
+                "routing": decision,
+                "usage": usage,
+                "latency_ms": round(latency_ms, 1),
+                "cancelled": cancelled
+            }
+        }
 
     @staticmethod
-    def analyze_prompt(prompt: str) -> dict:
-        """Analyze using Perplexity (God Mode AI Expert with real-time knowledge)"""
+    @timed("AIService.analyze_prompt")
+    def analyze_prompt(
+        prompt: str,
+        priority: Priority = Priority.DEFAULT,
+        cancel: Optional[threading.Event] = None
+    ) -> dict:
+        """
+        Analyze locally when confident, else with Perplexity (God Mode AI Expert with real-time knowledge).
+        
+        Once `cancel` is set, no further upstream call is made (queued calls
+        give up their slot) and the local recommender answers.
+        """
+        
+        # Answer from the local classifier when it is confident enough
+        with phase("classifier"):
+            local_result = AIService.classify_prompt(prompt)
+        if local_result:
+            ANALYSIS_REQUESTS.labels(source="classifier").inc()
+            return local_result
+        
+        # Providers that are saturated or too slow for this deadline are
+        # skipped; the local knowledge base is the last resort
+        deadline = deadline_in(settings.ANALYSIS_DEADLINE_MS)
         
         # Try Perplexity first (has live knowledge of ALL AI models)
-        if settings.PERPLEXITY_API_KEY:
+        if providers.available("perplexity") and not _is_set(cancel):
             try:
-                import requests
+                session = providers.get("perplexity")
                 
                 logger.info("🔍 Using Perplexity for model analysis...")
                 
-                system_prompt = """You are the world's leading AI Model Expert with real-time knowledge of EVERY AI model and tool available.
-
-Your goal: Recommend the absolute perfect AI model for the user's specific request.
+                system_prompt = PERPLEXITY_ANALYSIS_PROMPT
 
-RULES:
-1. Analyze the prompt depth, required reasoning, creativity, and technical needs.
-2. Select the "Main" model that is the current STATE-OF-THE-ART for that specific task.
-3. Select an "Alternative" that offers a different strength (speed, privacy, cost).
-4. Use your REAL-TIME KNOWLEDGE. If o3 or Claude 3.7 just launched, recommend it!
-5. Be SPECIFIC about why each model excels.
-
-Return ONLY valid JSON (no markdown):
-{
-    "main": {
-        "name": "Model Name",
-        "provider": "Provider",
-        "reasoning": "Specific reason why this model excels (under 15 words)",
-        "subtitle": "Short 2-3 word role (e.g. 'Coding Expert')",
-        "input_price": 0.0,
-        "output_price": 0.0,
-        "speed": "Fast",
-        "categories": ["Cat1"]
-    },
-    "alternative": {
-        "name": "Model Name",
-        "provider": "Provider",
-        "reasoning": "Why this is a strong alternative (under 15 words)",
-        "subtitle": "Short 2-3 word role",
-        "input_price": 0.0,
-        "output_price": 0.0,
-        "speed": "Fast",
-        "categories": ["Cat1"]
-    }
-}"""
-
-                response = requests.post(
-                    "https://api.perplexity.ai/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.PERPLEXITY_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "sonar",
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": f"Task: {prompt}"}
-                        ],
-                        "temperature": 0.2,
-                        "max_tokens": 800
-                    },
-                    timeout=30
-                )
+                with phase("perplexity"), admission.admit("perplexity", priority, deadline, cancel):
+                    response = session.post(
+                        "https://api.perplexity.ai/chat/completions",
+                        json={
+                            "model": "sonar",
+                            "messages": [
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": f"Task: {prompt}"}
+                            ],
+                            "temperature": 0.2,
+                            "max_tokens": 800
+                        },
+                        timeout=max(deadline - time.monotonic(), 1)
+                    )
+                    response.raise_for_status()
                 
-                response.raise_for_status()
-                text = response.json()["choices"][0]["message"]["content"].strip()
-                
-                logger.info(f"Perplexity raw response: {text[:200]}...")
-                
-                # Clean markdown
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.startswith("```"):
-                    text = text[3:]
-                if text.endswith("```"):
-                    text = text[:-3]
+                with phase("parse"):
+                    text = response.json()["choices"][0]["message"]["content"].strip()
                     
-                data = json.loads(text.strip())
+                    logger.info(f"Perplexity raw response: {text[:200]}...")
+                    
+                    # Clean markdown
+                    if text.startswith("```json"):
+                        text = text[7:]
+                    if text.startswith("```"):
+                        text = text[3:]
+                    if text.endswith("```"):
+                        text = text[:-3]
+                        
+                    data = json.loads(text.strip())
+                    result = {
+                        "recommendation": ModelRecommendation(**data['main']),
+                        "alternative": ModelRecommendation(**data['alternative']),
+                        "source": "perplexity"
+                    }
                 
                 logger.info("✅ Perplexity successfully generated recommendations!")
+                ANALYSIS_REQUESTS.labels(source="perplexity").inc()
                 
-                return {
-                    "recommendation": ModelRecommendation(**data['main']),
-                    "alternative": ModelRecommendation(**data['alternative'])
-                }
+                return result
                 
+            except AdmissionRejected as e:
+                logger.warning(f"Perplexity Analysis skipped: {e}")
             except Exception as e:
                 logger.error(f"Perplexity Analysis failed: {str(e)}", exc_info=True)
                 # Fall through to Gemini backup
         
         # Gemini backup (paused by user)
-        if False and settings.GOOGLE_API_KEY:
+        if False and providers.available("gemini"):
             try:
-                AIService._init_gemini()
+                genai = providers.get("gemini")
                 model = genai.GenerativeModel('gemini-pro')
                 
-                system_prompt = """You are the world's leading AI Model Expert. You have deep knowledge of EVERY AI model available (OpenAI, Anthropic, Google, Meta, open-source, specialized models, etc.).
-
-Your goal is to recommend the absolute perfect tool for the user's specific request.
-
-RULES:
-1. Analyze the prompt depth, required reasoning, creativity, and technical needs.
-2. Select the "Main" model that is the current STATE-OF-THE-ART for that specific task.
-3. Select an "Alternative" that offers a different strength (e.g., speed, privacy, open-source, lower cost).
-4. Do NOT simply recommend GPT-4 every time. Consider Claude 3.5 Sonnet for coding, Midjourney v6 for art, Gemini 1.5 Pro for large context, etc.
+                system_prompt = GEMINI_ANALYSIS_PROMPT
 
-Return ONLY valid JSON (no markdown):
-{
-    "main": {
-        "name": "Model Name",
-        "provider": "Provider",
-        "reasoning": "Specific reason why this model excels at this exact task (under 15 words)",
-        "subtitle": "Short 2-3 word role (e.g. 'Coding Expert')",
-        "input_price": 0.0,
-        "output_price": 0.0,
-        "speed": "Fast",
-        "categories": ["Cat1"]
-    },
-    "alternative": {
-        "name": "Model Name",
-        "provider": "Provider",
-        "reasoning": "Why this is a strong alternative (under 15 words)",
-        "subtitle": "Short 2-3 word role",
-        "input_price": 0.0,
-        "output_price": 0.0,
-        "speed": "Fast",
-        "categories": ["Cat1"]
-    }
-}"""
-
-                response = model.generate_content(f"{system_prompt}\n\nTask: {prompt}")
-                text = response.text.strip()
-                
-                logger.info(f"Gemini raw response: {text[:200]}...")  # Log first 200 chars
+                with phase("gemini"), admission.admit("gemini", priority, deadline, cancel):
+                    response = model.generate_content(f"{system_prompt}\n\nTask: {prompt}")
                 
-                # Clean markdown
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.startswith("```"):
-                    text = text[3:]
-                if text.endswith("```"):
-                    text = text[:-3]
+                with phase("parse"):
+                    text = response.text.strip()
+                    
+                    logger.info(f"Gemini raw response: {text[:200]}...")  # Log first 200 chars
                     
-                data = json.loads(text.strip())
+                    # Clean markdown
+                    if text.startswith("```json"):
+                        text = text[7:]
+                    if text.startswith("```"):
+                        text = text[3:]
+                    if text.endswith("```"):
+                        text = text[:-3]
+                        
+                    data = json.loads(text.strip())
+                    result = {
+                        "recommendation": ModelRecommendation(**data['main']),
+                        "alternative": ModelRecommendation(**data['alternative']),
+                        "source": "gemini"
+                    }
                 
                 logger.info("✅ Gemini successfully generated recommendations!")
+                ANALYSIS_REQUESTS.labels(source="gemini").inc()
                 
-                return {
-                    "recommendation": ModelRecommendation(**data['main']),
-                    "alternative": ModelRecommendation(**data['alternative'])
-                }
+                return result
                 
                 
+            except AdmissionRejected as e:
+                logger.warning(f"Gemini Analysis skipped: {e}")
             except Exception as e:
                 logger.error(f"Gemini Analysis failed: {str(e)}", exc_info=True)
                 # Fall through to Groq backup
         
         # Groq backup if Gemini fails
         logger.warning("⚠️ Falling back to Groq for analysis (Gemini failed)")
-        if settings.GROQ_API_KEY:
+        if providers.available("groq") and not _is_set(cancel):
             try:
-                AIService._init_groq()
+                groq_client = providers.get("groq")
                 
-                system_prompt = """Recommend TWO models (Best and Alternative). Return ONLY JSON:
-{
-    "main": {"name": "M1", "provider": "P1", "reasoning": "R1", "input_price": 0, "output_price": 0, "speed": "Fast", "categories": ["C1"]},
-    "alternative": {"name": "M2", "provider": "P2", "reasoning": "R2", "input_price": 0, "output_price": 0, "speed": "Fast", "categories": ["C1"]}
-}"""
+                system_prompt = GROQ_ANALYSIS_PROMPT
                 
-                response = AIService._groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Task: {prompt}"}
-                    ],
-                    temperature=0.3,
-                    max_tokens=512
-                )
+                with phase("groq"), admission.admit("groq", priority, deadline, cancel):
+                    response = groq_client.chat.completions.create(
+                        model="llama-3.1-8b-instant",
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": f"Task: {prompt}"}
+                        ],
+                        temperature=0.3,
+                        max_tokens=512
+                    )
                 
-                text = response.choices[0].message.content.strip()
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.startswith("```"):
-                    text = text[3:]
-                if text.endswith("```"):
-                    text = text[:-3]
-                    
-                data = json.loads(text.strip())
+                with phase("parse"):
+                    text = response.choices[0].message.content.strip()
+                    if text.startswith("```json"):
+                        text = text[7:]
+                    if text.startswith("```"):
+                        text = text[3:]
+                    if text.endswith("```"):
+                        text = text[:-3]
+                        
+                    data = json.loads(text.strip())
+                    result = {
+                        "recommendation": ModelRecommendation(**data['main']),
+                        "alternative": ModelRecommendation(**data['alternative']),
+                        "source": "groq"
+                    }
                 logger.info("✅ Groq successfully generated recommendations!")
-                return {
-                    "recommendation": ModelRecommendation(**data['main']),
-                    "alternative": ModelRecommendation(**data['alternative'])
-                }
+                ANALYSIS_REQUESTS.labels(source="groq").inc()
+                return result
                 
+            except AdmissionRejected as e:
+                logger.warning(f"Groq Analysis skipped: {e}")
             except Exception as e:
                 logger.error(f"Groq Analysis failed: {str(e)}", exc_info=True)
         
         # Fallback to local expert knowledge base
         logger.warning("Using local expert knowledge base for recommendation")
-        return AIService.get_ai_recommendation(prompt)
+        ANALYSIS_REQUESTS.labels(source="keywords").inc()
+        with phase("keywords"):
+            return AIService.get_ai_recommendation(prompt)
     
     @staticmethod
+    @timed("AIService.classify_prompt")
+    def classify_prompt(prompt: str) -> Optional[dict]:
+        """
+        Local classifier recommendation; None when the classifier is disabled
+        or not confident enough, so the caller should ask an upstream LLM.
+        """
+        from app.services.prompt_classifier import get_prompt_classifier
+        
+        classifier = get_prompt_classifier()
+        if classifier is None:
+            return None
+        
+        start = time.perf_counter()
+        category_id, confidence = classifier.predict([prompt])[0]
+        CLASSIFIER_LATENCY.observe(time.perf_counter() - start)
+        
+        if confidence < settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE:
+            return None
+        
+        category = get_catalog().by_id.get(category_id)
+        if category is None or category.main_rec is None:
+            return None
+        
+        return {
+            "recommendation": category.main_rec,
+            "alternative": category.alt_rec,
+            "source": "classifier",
+            "category": category_id,
+            "confidence": confidence,
+            "classifier_version": classifier.version
+        }
+    
+    @staticmethod
+    @timed("AIService.get_ai_recommendation")
     def get_ai_recommendation(prompt: str) -> dict:
         """
         AI model recommendation system based on keywords from a data file.
         """
-        import json
-        import os
-        import re
-        from app.schemas.ai import ModelRecommendation
-
-        prompt_lower = prompt.lower()
-        
-        # Load recommendations from JSON
-        data_path = os.path.join(os.path.dirname(__file__), "..", "data", "recommendations.json")
-        try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                rec_data = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load recommendations: {e}")
-            rec_data = []
-
         main_rec = None
         alt_rec = None
         
-        # Keyword matching loop
-        for category in rec_data:
-            keywords = category.get("keywords", [])
-            if any(re.search(r'\b' + re.escape(w.lower()) + r'\b', prompt_lower) for w in keywords):
-                if "main_rec" in category:
-                    main_rec = ModelRecommendation(**category["main_rec"])
-                if "alt_rec" in category:
-                    alt_rec = ModelRecommendation(**category["alt_rec"])
-                break
+        # Category with the most keyword hits in the pre-compiled catalog
+        category = get_catalog().best_match(prompt)
+        if category:
+            main_rec = category.main_rec
+            alt_rec = category.alt_rec
 
         # Fallback if no match found
         if not main_rec:
-            main_rec = ModelRecommendation(
-                name="GPT-4o", provider="OpenAI",
-                reasoning="Most versatile AI for any task.",
-                subtitle="General purpose AI",
-                input_price=2.50, output_price=10.00, speed="Fast",
-                categories=["Auto", "General"]
-            )
-            alt_rec = ModelRecommendation(
-                name="Claude 3.5 Sonnet", provider="Anthropic",
-                reasoning="Slightly better reasoning for nuanced chat.",
-                subtitle="Conversational Expert",
-                input_price=3.00, output_price=15.00, speed="Fast",
-                categories=["General", "Logic"]
-            )
+            main_rec = DEFAULT_RECOMMENDATION
+            alt_rec = DEFAULT_ALTERNATIVE
 
         return {
             "recommendation": main_rec,
-            "alternative": alt_rec
+            "alternative": alt_rec,
+            "source": "keywords"
         }
     
     @staticmethod
-    def monitor_chat_context(messages: list, current_model: str) -> dict:
+    @timed("AIService.monitor_chat_context")
+    def monitor_chat_context(
+        messages: list,
+        current_model: str,
+        conversation_id: str = None,
+        message: str = None,
+        messages_offset: int = 0
+    ) -> dict:
         """
-        Gemini Observer: Monitors chat history for context shifts and suggests model switches.
+        Context Observer: Detects topic shifts locally and suggests model switches.
         """
-        # Gemini Observer paused by user request
-        return {"should_switch": False}
-        
-        if not settings.GOOGLE_API_KEY:
-            return {"should_switch": False}
-            
-        try:
-            AIService._init_gemini()
-            model = genai.GenerativeModel('gemini-pro')
-            
-            # Build conversation context
-            conversation_summary = "\n".join([
-                f"{'User' if msg.get('role') == 'user' else 'AI'}: {msg.get('content', '')[:150]}"
-                for msg in messages[-6:]  # Last 6 messages
-            ])
-            
-            observer_prompt = f"""You are a silent AI observer monitoring a chat conversation.
-
-Current Active Model: {current_model}
-
-Recent Conversation:
-{conversation_summary}
-
-TASK: Determine if the user's intent has SHIFTED to a different domain that would benefit from a DIFFERENT AI model.
-
-Examples of shifts:
-- Started with coding, now asking about travel → Recommend general model
-- Started with general chat, now asking for image generation → Recommend Midjourney
-- Started with writing, now asking complex math → Recommend o1
-
-Return ONLY JSON:
-{{
-    "should_switch": true/false,
-    "suggested_model": "Model Name" (only if should_switch is true),
-    "provider": "Provider" (only if should_switch is true),
-    "reason": "Brief explanation why" (only if should_switch is true),
-    "subtitle": "Role" (only if should_switch is true)
-}}
-
-If NO switch needed, return: {{"should_switch": false}}
-"""
-            
-            response = model.generate_content(observer_prompt)
-            text = response.text.strip()
-            
-            # Clean markdown
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-                
-            result = json.loads(text.strip())
-            
-            if result.get("should_switch"):
-                logger.info(f"🔄 Gemini Observer detected context shift: {result.get('reason')}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Gemini Observer failed: {str(e)}", exc_info=True)
-            return {"should_switch": False}
+        return context_detector.observe(
+            current_model=current_model,
+            messages=messages,
+            message=message,
+            conversation_id=conversation_id,
+            messages_offset=messages_offset
+        )
@@ -0,0 +1,250 @@
+"""
+Record/replay transport for upstream providers.
+
+With PROVIDER_MODE=record, the Groq and Perplexity clients are wrapped so
+every call is forwarded to the provider and the request, response and
+timing are appended to {PROVIDER_CASSETTE_DIR}/{provider}.jsonl. For
+streams, each chunk is stored with its offset.
+
+With PROVIDER_MODE=replay, no SDK or network is used. Calls are answered
+from the cassettes, keyed on the normalized request: the JSON is
+canonicalized, whitespace collapsed and transport-only arguments such as
+timeouts dropped. Recorded latency is reproduced times
+REPLAY_LATENCY_SCALE: 1 is faithful, 0 answers immediately, anything else
+is time-scaled. Repeated identical requests cycle through their recordings.
+A request with no recording raises CassetteMiss, which callers handle like
+any provider failure.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from app.config.settings import settings
+from app.config.logging import logger
+
+# Arguments that do not change what the provider answers
+_TRANSPORT_ARGS = {"timeout", "extra_headers", "extra_query"}
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class CassetteMiss(Exception):
+    """No recording for this request"""
+
+
+def normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items() if k not in _TRANSPORT_ARGS and v is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def request_key(request: dict) -> str:
+    canonical = json.dumps(normalize(request), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def to_namespace(value: Any) -> Any:
+    """Recorded JSON back into attribute-access objects, like SDK responses"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def _dump(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return obj
+
+
+class Cassette:
+    """Append-only JSONL recordings of one provider"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[dict]]] = None
+        self._cursor: Dict[str, int] = {}
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, request: dict, entry: dict) -> None:
+        entry = {"key": request_key(request), "request": normalize(request), **entry}
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _load(self) -> Dict[str, List[dict]]:
+        entries: Dict[str, List[dict]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries.setdefault(entry["key"], []).append(entry)
+        logger.info(f"Loaded {sum(map(len, entries.values()))} recordings from {self.path}")
+        return entries
+
+    def lookup(self, request: dict) -> dict:
+        key = request_key(request)
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            recordings = self._entries.get(key)
+            if not recordings:
+                raise CassetteMiss(f"No recording in {self.path} for request {key[:12]}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return recordings[index % len(recordings)]
+
+
+def _replay_sleep(ms: float) -> None:
+    if ms > 0 and settings.REPLAY_LATENCY_SCALE > 0:
+        time.sleep(ms * settings.REPLAY_LATENCY_SCALE / 1000)
+
+
+class _RecordingStream:
+    """Passes a provider stream through, recording chunk offsets"""
+
+    def __init__(self, stream, cassette: Cassette, request: dict, start: float):
+        self._stream = stream
+        self._cassette = cassette
+        self._request = request
+        self._start = start
+        self._chunks = []
+        self._saved = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._chunks.append({"offset_ms": (time.perf_counter() - self._start) * 1000, "data": _dump(chunk)})
+            yield chunk
+        self._save(complete=True)
+
+    def _save(self, complete: bool) -> None:
+        # Only complete streams are replayable as recorded
+        if not self._saved and complete:
+            self._cassette.append(self._request, {
+                "stream": True,
+                "latency_ms": (time.perf_counter() - self._start) * 1000,
+                "chunks": self._chunks
+            })
+        self._saved = True
+
+    def close(self) -> None:
+        self._save(complete=False)
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+
+
+class _ReplayStream:
+    def __init__(self, chunks: List[dict]):
+        self._chunks = chunks
+        self._closed = False
+
+    def __iter__(self):
+        previous = 0.0
+        for chunk in self._chunks:
+            if self._closed:
+                return
+            _replay_sleep(chunk["offset_ms"] - previous)
+            previous = chunk["offset_ms"]
+            yield to_namespace(chunk["data"])
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class _GroqCompletions:
+    def __init__(self, cassette: Cassette, client=None):
+        self._cassette = cassette
+        self._client = client
+
+    def create(self, **kwargs):
+        if self._client is None:
+            entry = self._cassette.lookup(kwargs)
+            if entry.get("stream"):
+                return _ReplayStream(entry["chunks"])
+            _replay_sleep(entry["latency_ms"])
+            return to_namespace(entry["response"])
+
+        start = time.perf_counter()
+        response = self._client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return _RecordingStream(response, self._cassette, kwargs, start)
+        self._cassette.append(kwargs, {
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "response": _dump(response)
+        })
+        return response
+
+
+class CassetteGroq:
+    """Groq client stand-in: records through `client`, or replays when it is None"""
+
+    def __init__(self, cassette: Cassette, client=None):
+        self.chat = SimpleNamespace(completions=_GroqCompletions(cassette, client))
+
+
+class ReplayHTTPError(Exception):
+    pass
+
+
+class _ReplayResponse:
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self) -> Any:
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise ReplayHTTPError(f"Recorded HTTP {self.status_code}")
+
+
+class CassetteSession:
+    """requests.Session stand-in for JSON POST APIs (Perplexity)"""
+
+    def __init__(self, cassette: Cassette, session=None):
+        self._cassette = cassette
+        self._session = session
+
+    def post(self, url: str, json: Any = None, **kwargs):
+        request = {"url": url, "json": json}
+        if self._session is None:
+            entry = self._cassette.lookup(request)
+            _replay_sleep(entry["latency_ms"])
+            return _ReplayResponse(entry["status_code"], entry["response"])
+
+        start = time.perf_counter()
+        response = self._session.post(url, json=json, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        self._cassette.append(request, {
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "status_code": response.status_code,
+            "response": body
+        })
+        return response
+
+
+# Providers with a record/replay adapter
+ADAPTERS = {"groq": CassetteGroq, "perplexity": CassetteSession}
+
+
+def cassette_for(name: str) -> Cassette:
+    return Cassette(os.path.join(settings.PROVIDER_CASSETTE_DIR, f"{name}.jsonl"))
@@ -0,0 +1,113 @@
+import json
+import os
+import re
+from functools import lru_cache
+from collections import Counter
+from typing import Dict, List, Optional
+from app.schemas.ai import ModelRecommendation
+from app.config.logging import logger
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "recommendations.json")
+
+DEFAULT_RECOMMENDATION = ModelRecommendation(
+    name="GPT-4o", provider="OpenAI",
+    reasoning="Most versatile AI for any task.",
+    subtitle="General purpose AI",
+    input_price=2.50, output_price=10.00, speed="Fast",
+    categories=["Auto", "General"]
+)
+
+DEFAULT_ALTERNATIVE = ModelRecommendation(
+    name="Claude 3.5 Sonnet", provider="Anthropic",
+    reasoning="Slightly better reasoning for nuanced chat.",
+    subtitle="Conversational Expert",
+    input_price=3.00, output_price=15.00, speed="Fast",
+    categories=["General", "Logic"]
+)
+
+
+class CatalogCategory:
+    """One recommendation category from the data file"""
+
+    def __init__(self, data: dict):
+        self.id: str = data.get("id", "")
+        self.keywords: List[str] = [w.lower() for w in data.get("keywords", [])]
+        self.main_rec: Optional[ModelRecommendation] = (
+            ModelRecommendation(**data["main_rec"]) if "main_rec" in data else None
+        )
+        self.alt_rec: Optional[ModelRecommendation] = (
+            ModelRecommendation(**data["alt_rec"]) if "alt_rec" in data else None
+        )
+
+
+class RecommendationCatalog:
+    """
+    Immutable, pre-compiled view of app/data/recommendations.json.
+
+    Built once per process (in the gunicorn master when preloading, so
+    workers share it copy-on-write) instead of re-reading the JSON file
+    on every recommendation.
+    """
+
+    def __init__(self, categories: List[CatalogCategory]):
+        self.categories = categories
+        self.by_id: Dict[str, CatalogCategory] = {c.id: c for c in categories}
+
+        # Inverted keyword index: one pass over a text finds every keyword
+        # hit across all categories (longest keywords first, so a phrase
+        # like "video generation" wins over "video")
+        self.keyword_categories: Dict[str, List[str]] = {}
+        for category in categories:
+            for keyword in category.keywords:
+                self.keyword_categories.setdefault(keyword, []).append(category.id)
+        keywords = sorted(self.keyword_categories, key=len, reverse=True)
+        self.keyword_pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(w) for w in keywords) + r')\b'
+        ) if keywords else None
+
+        # Category a recommended model belongs to (first category wins)
+        self.model_categories: Dict[str, str] = {}
+        for category in categories:
+            for rec in (category.main_rec, category.alt_rec):
+                if rec is not None:
+                    self.model_categories.setdefault(rec.name.lower(), category.id)
+
+    @classmethod
+    def load(cls, path: str = DATA_PATH) -> "RecommendationCatalog":
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rec_data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load recommendations: {e}")
+            rec_data = []
+        return cls([CatalogCategory(category) for category in rec_data])
+
+    def best_match(self, prompt: str) -> Optional[CatalogCategory]:
+        """
+        Return the category with the most keyword hits in the prompt.
+
+        Unlike a first-match scan this does not depend on the order of the
+        data file; only exact ties fall back to file order.
+        """
+        hits = self.keyword_hits(prompt)
+        best, best_hits = None, 0
+        for category in self.categories:
+            if category.main_rec is not None and hits.get(category.id, 0) > best_hits:
+                best, best_hits = category, hits[category.id]
+        return best
+
+    def keyword_hits(self, text: str) -> Dict[str, int]:
+        """Count keyword hits per category id in a single scan of `text`"""
+        if self.keyword_pattern is None:
+            return {}
+        hits = Counter()
+        for match in self.keyword_pattern.finditer(text.lower()):
+            for category_id in self.keyword_categories[match.group(0)]:
+                hits[category_id] += 1
+        return dict(hits)
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> RecommendationCatalog:
+    """Process-wide recommendation catalog, loaded on first use"""
+    return RecommendationCatalog.load()
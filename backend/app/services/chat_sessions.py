@@ -0,0 +1,161 @@
+"""
+Server-side conversation sessions for /ai/chat/ws.
+
+A session keeps the recent turns of one conversation, trimmed oldest-first
+to CHAT_SESSION_MAX_TOKENS, so clients send only their new message and an
+idle session never holds more than that much text. Sessions live in a
+bounded in-process LRU with expiry (CHAT_SESSION_BACKEND=memory) or in
+Redis (CHAT_SESSION_BACKEND=redis), where any worker can resume them.
+"""
+import json
+import threading
+import uuid
+from collections import deque
+from typing import List, Optional, Tuple
+from app.config.settings import settings
+from app.config.logging import logger
+from app.core.cache import TTLCache
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class ChatSession:
+    """Token-bounded turn history of one conversation"""
+
+    __slots__ = ("session_id", "turns", "tokens", "max_tokens", "lock")
+
+    def __init__(self, session_id: str, max_tokens: int = settings.CHAT_SESSION_MAX_TOKENS):
+        self.session_id = session_id
+        self.turns = deque()  # (role, content, tokens)
+        self.tokens = 0
+        self.max_tokens = max_tokens
+        self.lock = threading.Lock()
+
+    def append(self, role: str, content: str) -> None:
+        tokens = estimate_tokens(content)
+        if tokens > self.max_tokens:
+            # Keep the end of an oversized turn, cut so that it estimates to
+            # exactly max_tokens and evicts the older turns but not itself
+            keep = (self.max_tokens - 1) * 4
+            content = content[-keep:] if keep > 0 else ""
+            tokens = estimate_tokens(content)
+        with self.lock:
+            self.turns.append((role, content, tokens))
+            self.tokens += tokens
+            while self.tokens > self.max_tokens:
+                _, _, dropped = self.turns.popleft()
+                self.tokens -= dropped
+
+    def context(self) -> List[dict]:
+        """Turns in provider message format, oldest first"""
+        with self.lock:
+            return [{"role": role, "content": content} for role, content, _ in self.turns]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.turns.clear()
+            self.tokens = 0
+
+    def to_json(self) -> str:
+        with self.lock:
+            return json.dumps([[role, content] for role, content, _ in self.turns])
+
+    @classmethod
+    def from_json(cls, session_id: str, payload: str) -> "ChatSession":
+        session = cls(session_id)
+        for role, content in json.loads(payload):
+            session.append(role, content)
+        return session
+
+
+class InMemorySessionStore:
+    """Sessions of this worker, evicted least-recently-used and after a TTL"""
+
+    def __init__(
+        self,
+        max_sessions: int = settings.CHAT_SESSION_MAX_SESSIONS,
+        ttl_seconds: float = settings.CHAT_SESSION_TTL_SECONDS
+    ):
+        self._sessions = TTLCache(maxsize=max_sessions, ttl=ttl_seconds)
+
+    def load(self, session_id: str) -> Optional[ChatSession]:
+        return self._sessions.get(session_id)
+
+    def save(self, session: ChatSession) -> None:
+        # Re-setting refreshes the TTL of active sessions
+        self._sessions.set(session.session_id, session)
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class RedisSessionStore:
+    """
+    Sessions shared by all workers, expired by Redis. Calls block on the
+    network; async callers run them in the threadpool.
+    """
+
+    def __init__(self, url: str = settings.REDIS_URL, ttl_seconds: int = settings.CHAT_SESSION_TTL_SECONDS):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"chat_session:{session_id}"
+
+    def load(self, session_id: str) -> Optional[ChatSession]:
+        payload = self._redis.get(self._key(session_id))
+        return ChatSession.from_json(session_id, payload) if payload is not None else None
+
+    def save(self, session: ChatSession) -> None:
+        self._redis.set(self._key(session.session_id), session.to_json(), ex=self.ttl_seconds)
+
+    def delete(self, session_id: str) -> None:
+        self._redis.delete(self._key(session_id))
+
+
+class SessionManager:
+    """Resolves session ids to sessions in the configured store"""
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            if settings.CHAT_SESSION_BACKEND == "redis":
+                self._store = RedisSessionStore()
+            else:
+                if settings.CHAT_SESSION_BACKEND != "memory":
+                    logger.error(f"Unknown CHAT_SESSION_BACKEND {settings.CHAT_SESSION_BACKEND}, using memory")
+                self._store = InMemorySessionStore()
+        return self._store
+
+    def open(self, session_id: Optional[str] = None, client_id: Optional[str] = None) -> Tuple[str, ChatSession]:
+        """
+        Resume `session_id` if it still exists, else start a new session.
+
+        Returns (session_id, session). Ids are scoped to the client, so one
+        client cannot resume another's session.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        key = f"{client_id}:{session_id}" if client_id else session_id
+        session = self.store.load(key)
+        if session is None:
+            session = ChatSession(key)
+            self.store.save(session)
+        return session_id, session
+
+    def save(self, session: ChatSession) -> None:
+        self.store.save(session)
+
+
+chat_sessions = SessionManager()
@@ -0,0 +1,170 @@
+"""
+Offline training for the local prompt classifier.
+
+Builds a labelled set from the catalog keywords plus logged ai_requests,
+archived ones included (label = catalog category of the recommended
+model) weighted by user feedback, reports held-out accuracy, local-answer
+rate and inference latency, then fits on everything and writes a
+versioned artifact.
+
+    python -m app.services.classifier_training --out app/data/prompt_classifier.npz
+"""
+import argparse
+import itertools
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config.settings import settings
+from app.config.logging import logger
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.services.catalog import get_catalog
+from app.services.prompt_classifier import DEFAULT_ARTIFACT_PATH, PromptClassifier, catalog_seed_examples
+from app.services.request_archive import scan
+
+# Answers produced locally only teach the classifier what it already
+# believes, so they are used only when users confirmed them
+LOCAL_SOURCES = {"classifier", "keywords"}
+
+
+def example_weight(source: Optional[str], avg_rating, helpful, unhelpful) -> float:
+    """Training weight of one logged request; 0 drops it"""
+    helpful, unhelpful = helpful or 0, unhelpful or 0
+    positive = (avg_rating is not None and avg_rating >= 4) or helpful > unhelpful
+    negative = (avg_rating is not None and avg_rating <= 2) or unhelpful > helpful
+
+    if negative:
+        return 0.0
+    if positive:
+        return 2.0
+    if source in LOCAL_SOURCES:
+        return 0.0
+    return 1.0
+
+
+def load_history(db, include_archive: bool = True) -> Tuple[List[str], List[str], List[float]]:
+    """Labelled examples from the request log, joined with feedback"""
+    model_categories = get_catalog().model_categories
+    texts, labels, weights = [], [], []
+
+    rows = AILogsRepository.iter_with_feedback(db)
+    if include_archive:
+        # Archived requests never have feedback; they stay in the hot table
+        archived = scan(columns=["prompt", "recommended_model", "request_metadata"])
+        rows = itertools.chain(rows, (
+            (row["prompt"], row["recommended_model"], row["request_metadata"], None, None, None)
+            for row in archived
+        ))
+
+    for prompt, model, metadata, avg_rating, helpful, unhelpful in rows:
+        if (metadata or {}).get("kind") == "chat":
+            # Chat turns log the routed model, not a recommendation
+            continue
+        category_id = model_categories.get((model or "").lower())
+        if not prompt or category_id is None:
+            continue
+        weight = example_weight((metadata or {}).get("source"), avg_rating, helpful, unhelpful)
+        if weight > 0:
+            texts.append(prompt)
+            labels.append(category_id)
+            weights.append(weight)
+    return texts, labels, weights
+
+
+def evaluate(classifier: PromptClassifier, texts: List[str], labels: List[str], min_confidence: float) -> dict:
+    """Held-out accuracy, local-answer rate at `min_confidence`, and batch latency"""
+    start = time.perf_counter()
+    predictions = classifier.predict(texts)
+    elapsed = time.perf_counter() - start
+
+    correct = np.array([predicted == label for (predicted, _), label in zip(predictions, labels)])
+    confident = np.array([confidence >= min_confidence for _, confidence in predictions])
+    return {
+        "examples": len(texts),
+        "accuracy": float(correct.mean()) if len(texts) else 0.0,
+        "local_answer_rate": float(confident.mean()) if len(texts) else 0.0,
+        "local_answer_accuracy": float(correct[confident].mean()) if confident.any() else 0.0,
+        "batch_latency_us_per_prompt": elapsed / max(len(texts), 1) * 1e6,
+    }
+
+
+def train(
+    db=None,
+    out: str = DEFAULT_ARTIFACT_PATH,
+    holdout: float = 0.2,
+    n_features: int = 2 ** 16,
+    alpha: float = 1.0,
+    min_confidence: float = settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE,
+    seed: int = 0
+) -> dict:
+    seed_texts, seed_labels = catalog_seed_examples()
+    history_texts, history_labels, history_weights = load_history(db) if db is not None else ([], [], [])
+    logger.info(f"Training on {len(seed_texts)} catalog keywords and {len(history_texts)} logged prompts")
+
+    report = {"catalog_examples": len(seed_texts), "history_examples": len(history_texts)}
+
+    # Hold out part of the history; keywords always stay in training
+    if history_texts and holdout > 0:
+        order = np.random.default_rng(seed).permutation(len(history_texts))
+        n_test = max(1, int(len(order) * holdout))
+        test, train_rows = order[:n_test], order[n_test:]
+        classifier = PromptClassifier.fit(
+            seed_texts + [history_texts[i] for i in train_rows],
+            seed_labels + [history_labels[i] for i in train_rows],
+            weights=[1.0] * len(seed_texts) + [history_weights[i] for i in train_rows],
+            n_features=n_features,
+            alpha=alpha
+        )
+        report["holdout"] = evaluate(
+            classifier, [history_texts[i] for i in test], [history_labels[i] for i in test], min_confidence
+        )
+
+    classifier = PromptClassifier.fit(
+        seed_texts + history_texts,
+        seed_labels + history_labels,
+        weights=[1.0] * len(seed_texts) + history_weights,
+        n_features=n_features,
+        alpha=alpha,
+        metadata={"history_examples": len(history_texts), "min_confidence": min_confidence}
+    )
+    classifier.save(out)
+    report["version"] = classifier.version
+    report["artifact"] = out
+    logger.info(f"Saved prompt classifier {classifier.version} to {out}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local prompt classifier")
+    parser.add_argument("--out", default=settings.PROMPT_CLASSIFIER_PATH or DEFAULT_ARTIFACT_PATH)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of logged prompts held out for the report")
+    parser.add_argument("--n-features", type=int, default=2 ** 16)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--min-confidence", type=float, default=settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE)
+    parser.add_argument("--no-history", action="store_true", help="Train on catalog keywords only")
+    args = parser.parse_args()
+
+    from app.models.base import SessionLocal
+
+    db = None if args.no_history else SessionLocal()
+    try:
+        report = train(
+            db=db,
+            out=args.out,
+            holdout=args.holdout,
+            n_features=args.n_features,
+            alpha=args.alpha,
+            min_confidence=args.min_confidence
+        )
+    finally:
+        if db is not None:
+            db.close()
+
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, metric in value.items():
+                print(f"  {name}: {metric:.4f}" if isinstance(metric, float) else f"  {name}: {metric}")
+        else:
+            print(f"{key}: {value}")
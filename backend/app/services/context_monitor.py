@@ -0,0 +1,156 @@
+"""
+Local, incremental context-shift detection for /ai/monitor-context.
+
+Each user message is classified against the recommendation catalog with
+one scan of the keyword index, and folded into a per-conversation topic
+distribution with exponential decay:
+
+    topics = decay * topics + (1 - decay) * normalize(keyword_hits(message))
+
+A call therefore costs O(new messages), not O(history). A switch is
+suggested only when one category's share of the running distribution
+crosses the threshold and that category recommends a different model
+than the one in use.
+"""
+import threading
+from typing import Dict, List, Optional
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.services.catalog import get_catalog
+
+
+class ConversationTopics:
+    """Running topic distribution of one conversation"""
+
+    __slots__ = ("weights", "seen", "last_suggested", "lock")
+
+    def __init__(self):
+        self.weights: Dict[str, float] = {}
+        self.seen = 0  # Messages already folded in
+        self.last_suggested: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def observe(self, text: str, decay: float, min_weight: float) -> None:
+        hits = get_catalog().keyword_hits(text)
+        total = sum(hits.values())
+
+        # Decay every category, dropping the ones that have faded out so the
+        # state stays bounded by the number of recently mentioned categories
+        for category_id in list(self.weights):
+            weight = self.weights[category_id] * decay
+            if weight < min_weight:
+                del self.weights[category_id]
+            else:
+                self.weights[category_id] = weight
+
+        for category_id, count in hits.items():
+            self.weights[category_id] = self.weights.get(category_id, 0.0) + (1 - decay) * count / total
+
+    def dominant(self):
+        if not self.weights:
+            return None, 0.0
+        category_id = max(self.weights, key=self.weights.get)
+        return category_id, self.weights[category_id]
+
+
+class ContextShiftDetector:
+    """Tracks conversations and suggests model switches on topic shifts"""
+
+    def __init__(
+        self,
+        decay: float = settings.CONTEXT_SHIFT_DECAY,
+        threshold: float = settings.CONTEXT_SHIFT_THRESHOLD,
+        max_conversations: int = settings.CONTEXT_SHIFT_MAX_CONVERSATIONS,
+        ttl_seconds: float = settings.CONTEXT_SHIFT_TTL_SECONDS
+    ):
+        self.decay = decay
+        self.threshold = threshold
+        self.min_weight = threshold * 0.05
+        self._conversations = TTLCache(maxsize=max_conversations, ttl=ttl_seconds)
+
+    def _state(self, conversation_id: Optional[str]) -> ConversationTopics:
+        if conversation_id is None:
+            # Stateless call: the whole history is folded in every time
+            return ConversationTopics()
+        state = self._conversations.get(conversation_id)
+        if state is None:
+            state = ConversationTopics()
+        # Re-setting refreshes the TTL of active conversations
+        self._conversations.set(conversation_id, state)
+        return state
+
+    def observe(
+        self,
+        current_model: str,
+        messages: Optional[List[dict]] = None,
+        message: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        messages_offset: int = 0
+    ) -> dict:
+        """
+        Fold new user messages into the conversation and decide on a switch.
+
+        Either pass `message` (just the newest user message) or `messages`
+        (the full history; only entries beyond those already seen for this
+        conversation are processed). `messages_offset` is the number of
+        older entries left out of `messages`.
+        """
+        state = self._state(conversation_id)
+
+        with state.lock:
+            if message is not None:
+                new_texts = [message]
+                state.seen += 1
+            else:
+                messages = messages or []
+                total = messages_offset + len(messages)
+                if total < state.seen:
+                    # History was edited or restarted client-side
+                    state.weights.clear()
+                    state.seen = 0
+                new_texts = [
+                    m.get("content", "") for m in messages[max(state.seen - messages_offset, 0):]
+                    if m.get("role", "user") == "user"
+                ]
+                state.seen = total
+
+            for text in new_texts:
+                if text:
+                    state.observe(text, self.decay, self.min_weight)
+
+            return self._decide(state, current_model)
+
+    def _decide(self, state: ConversationTopics, current_model: str) -> dict:
+        catalog = get_catalog()
+        category_id, share = state.dominant()
+        if category_id is None or share < self.threshold:
+            return {"should_switch": False}
+
+        current_category = catalog.model_categories.get((current_model or "").lower())
+        category = catalog.by_id.get(category_id)
+        if (
+            category is None
+            or category.main_rec is None
+            or category_id == current_category
+            or category.main_rec.name.lower() == (current_model or "").lower()
+            or category_id == state.last_suggested
+        ):
+            return {"should_switch": False}
+
+        state.last_suggested = category_id
+        recommendation = category.main_rec
+        return {
+            "should_switch": True,
+            "suggested_model": recommendation.name,
+            "provider": recommendation.provider,
+            "reason": f"The conversation has shifted towards {category_id.replace('_', ' ')}. {recommendation.reasoning}",
+            "subtitle": recommendation.subtitle,
+            "category": category_id,
+            "confidence": round(share, 3)
+        }
+
+    def forget(self, conversation_id: str) -> None:
+        self._conversations.pop(conversation_id)
+
+
+context_detector = ContextShiftDetector()
@@ -0,0 +1,114 @@
+"""
+Fire-and-forget feedback ingestion.
+
+Submitted feedback is queued in memory and written by one background
+thread per worker, which coalesces whatever has queued up (across
+requests) into FeedbackRepository.create_many batches of up to
+FEEDBACK_FLUSH_BATCH_SIZE. Items referencing unknown AI requests are
+dropped and counted. The queue is bounded by FEEDBACK_QUEUE_MAX; when full,
+submit() refuses the items so the caller can retry or use the
+synchronous path. Queued items are flushed on shutdown, but are lost if
+the worker is killed.
+"""
+import queue
+import threading
+from typing import List, Optional
+from app.config.settings import settings
+from app.config.logging import logger
+from app.core.metrics import FEEDBACK_INGESTED
+from app.repositories.feedback_repo import FeedbackRepository
+
+
+class FeedbackIngestor:
+    """Bounded queue of feedback items and the thread that writes them"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        max_queue: int = settings.FEEDBACK_QUEUE_MAX,
+        batch_size: int = settings.FEEDBACK_FLUSH_BATCH_SIZE
+    ):
+        self._session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.models.base import get_session_factory
+            self._session_factory = get_session_factory()
+        return self._session_factory
+
+    def submit(self, items: List[dict]) -> bool:
+        """Queue `items` (create_many dicts); False when there is no room for all of them"""
+        self._ensure_started()
+        with self._lock:
+            # Checked under the lock so a batch is queued whole or not at all
+            if self._queue.maxsize - self._queue.qsize() < len(items):
+                FEEDBACK_INGESTED.labels(outcome="refused").inc(len(items))
+                return False
+            for item in items:
+                self._queue.put_nowait(item)
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="feedback-ingest", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[dict]) -> None:
+        db = self.session_factory()
+        try:
+            missing = FeedbackRepository.create_many(db, batch)
+            FEEDBACK_INGESTED.labels(outcome="written").inc(len(batch) - len(missing))
+            if missing:
+                FEEDBACK_INGESTED.labels(outcome="unknown_request").inc(len(missing))
+                logger.warning(f"Dropped {len(missing)} queued feedback items for unknown AI requests")
+        except Exception as e:
+            FEEDBACK_INGESTED.labels(outcome="failed").inc(len(batch))
+            logger.error(f"Failed to write {len(batch)} queued feedback items: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    def flush(self) -> None:
+        """Block until everything queued so far is written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Write what is queued and stop the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+feedback_ingestor = FeedbackIngestor()
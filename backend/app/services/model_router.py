@@ -0,0 +1,230 @@
+"""
+Latency- and cost-aware routing of chat requests to upstream models.
+
+Each request is scored with cheap prompt features (length, code, reasoning
+cues, conversation depth). Simple messages go to the smallest model that
+can serve them, complex ones to a larger model, as long as the live
+latency estimate of that model fits the per-request SLA and its recent
+error rate is acceptable. `max_tokens` is sized to the expected answer.
+A model skipped for its latency or error rate gets no new samples, so
+once per CHAT_ROUTING_PROBE_INTERVAL_SECONDS one request that would have
+preferred it is sent to it anyway (reason `probe`), letting it recover.
+
+The decision and the provider's real token usage are stored in
+AIRequest.request_metadata, so routing can be evaluated offline.
+"""
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from app.config.settings import settings
+from app.config.logging import logger
+
+DEFAULT_CHAT_MODELS = [
+    {
+        "name": "llama-3.1-8b-instant",
+        "tier": "small",
+        "max_tokens": 1024,
+        "base_latency_ms": 300,
+        "ms_per_token": 2.0,
+        "cost_per_1k_tokens": 0.00008
+    },
+    {
+        "name": "llama-3.3-70b-versatile",
+        "tier": "large",
+        "max_tokens": 2048,
+        "base_latency_ms": 600,
+        "ms_per_token": 4.0,
+        "cost_per_1k_tokens": 0.0008
+    },
+]
+
+_CODE_RE = re.compile(r"```|\bdef |\bclass |\bfunction\b|\bimport |[{};]\s*$|=>", re.MULTILINE)
+_REASONING_RE = re.compile(
+    r"\b(why|explain|step by step|prove|derive|compare|analy[sz]e|trade-?offs?|design|architecture|debug|optimi[sz]e)\b"
+)
+_LONG_ANSWER_RE = re.compile(r"\b(essay|article|detailed|in depth|full code|complete|comprehensive|write a|draft)\b")
+
+# Weight of the newest observation in the moving averages
+_EWMA_ALPHA = 0.2
+
+# Answers rarely use the whole max_tokens budget; latency is estimated for
+# this fraction of it
+_EXPECTED_BUDGET_USE = 0.5
+
+
+class ModelStats:
+    """Exponentially weighted latency and error rate of one upstream model"""
+
+    __slots__ = ("base_latency_ms", "ms_per_token", "error_rate", "samples", "last_used")
+
+    def __init__(self, base_latency_ms: float, ms_per_token: float):
+        self.base_latency_ms = base_latency_ms
+        self.ms_per_token = ms_per_token
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_used = time.monotonic()  # Last routed to (probes included)
+
+    def estimate_ms(self, max_tokens: int) -> float:
+        return self.base_latency_ms + self.ms_per_token * max_tokens
+
+    def record(self, latency_ms: float, completion_tokens: Optional[int], error: bool) -> None:
+        self.samples += 1
+        self.error_rate += _EWMA_ALPHA * ((1.0 if error else 0.0) - self.error_rate)
+        if error:
+            return
+        # Spread the prediction error over the fixed and per-token parts in
+        # proportion to how much each contributed to the prediction
+        tokens = completion_tokens or 0
+        predicted = self.estimate_ms(tokens)
+        residual = latency_ms - predicted
+        token_share = self.ms_per_token * tokens / predicted if predicted > 0 else 0.0
+        self.base_latency_ms = max(self.base_latency_ms + _EWMA_ALPHA * residual * (1 - token_share), 0.0)
+        if tokens:
+            self.ms_per_token = max(self.ms_per_token + _EWMA_ALPHA * residual * token_share / tokens, 0.0)
+
+
+def prompt_features(message: str, history: Optional[list] = None) -> Dict[str, float]:
+    """Cheap features of a chat request"""
+    text = message.lower()
+    return {
+        "chars": len(message),
+        "history_turns": len(history or []),
+        "code": 1.0 if _CODE_RE.search(message) else 0.0,
+        "reasoning_cues": float(len(_REASONING_RE.findall(text))),
+        "long_answer": 1.0 if _LONG_ANSWER_RE.search(text) else 0.0,
+        "questions": float(message.count("?")),
+    }
+
+
+def complexity_score(features: Dict[str, float]) -> float:
+    """0 (small talk) .. 1 (long, technical, multi-step)"""
+    score = 0.0
+    score += min(features["chars"] / 1500, 1.0) * 0.35
+    score += 0.25 * features["code"]
+    score += min(features["reasoning_cues"], 2) * 0.125
+    score += 0.1 * features["long_answer"]
+    score += min(features["history_turns"] / 20, 1.0) * 0.05
+    return round(min(score, 1.0), 3)
+
+
+class ModelRouter:
+    """Chooses an upstream model and max_tokens for each chat request"""
+
+    def __init__(
+        self,
+        models: Optional[List[dict]] = None,
+        latency_sla_ms: float = settings.CHAT_LATENCY_SLA_MS,
+        complexity_threshold: float = settings.CHAT_ROUTING_COMPLEXITY_THRESHOLD,
+        max_error_rate: float = settings.CHAT_ROUTING_MAX_ERROR_RATE,
+        probe_interval_s: float = settings.CHAT_ROUTING_PROBE_INTERVAL_SECONDS
+    ):
+        self.models = models or DEFAULT_CHAT_MODELS
+        self.latency_sla_ms = latency_sla_ms
+        self.complexity_threshold = complexity_threshold
+        self.max_error_rate = max_error_rate
+        self.probe_interval_s = probe_interval_s
+        self._stats = {m["name"]: ModelStats(m["base_latency_ms"], m["ms_per_token"]) for m in self.models}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        models = None
+        if settings.CHAT_MODELS:
+            try:
+                models = json.loads(settings.CHAT_MODELS)
+            except ValueError as e:
+                logger.error(f"Invalid CHAT_MODELS, using defaults: {e}")
+        return cls(models=models)
+
+    def _max_tokens(self, model: dict, features: Dict[str, float], complexity: float) -> int:
+        if features["long_answer"] or features["code"]:
+            budget = model["max_tokens"]
+        elif complexity >= self.complexity_threshold:
+            budget = 768
+        elif features["chars"] < 200:
+            budget = 256
+        else:
+            budget = 512
+        return min(budget, model["max_tokens"])
+
+    def route(self, message: str, history: Optional[list] = None) -> dict:
+        """Pick a model and max_tokens; the returned dict is JSON-serializable"""
+        features = prompt_features(message, history)
+        complexity = complexity_score(features)
+
+        # Smallest first for simple requests, largest first for complex ones
+        preference = sorted(self.models, key=lambda m: m["cost_per_1k_tokens"])
+        if complexity >= self.complexity_threshold:
+            preference.reverse()
+
+        candidates = []
+        chosen, reason = None, None
+        with self._lock:
+            now = time.monotonic()
+            for model in preference:
+                stats = self._stats[model["name"]]
+                max_tokens = self._max_tokens(model, features, complexity)
+                estimate = stats.estimate_ms(int(max_tokens * _EXPECTED_BUDGET_USE))
+                candidates.append((model, max_tokens, estimate, stats.error_rate))
+
+            for model, max_tokens, estimate, error_rate in candidates:
+                if error_rate <= self.max_error_rate and estimate <= self.latency_sla_ms:
+                    chosen = (model, max_tokens, estimate)
+                    reason = "preferred" if model is candidates[0][0] else "fallback_within_sla"
+                    break
+                if now - self._stats[model["name"]].last_used >= self.probe_interval_s:
+                    # Skipped for a while: one request refreshes its estimates
+                    chosen, reason = (model, max_tokens, estimate), "probe"
+                    break
+
+            if chosen is None:
+                # Nothing fits the SLA: take the fastest, preferring healthy models
+                model, max_tokens, estimate, _ = min(candidates, key=lambda c: (c[3] > self.max_error_rate, c[2]))
+                chosen, reason = (model, max_tokens, estimate), "fastest_over_sla"
+
+            self._stats[chosen[0]["name"]].last_used = now
+
+        model, max_tokens, estimate = chosen
+        return {
+            "model": model["name"],
+            "tier": model.get("tier"),
+            "max_tokens": max_tokens,
+            "complexity": complexity,
+            "reason": reason,
+            "estimated_latency_ms": round(estimate, 1),
+            "latency_sla_ms": self.latency_sla_ms,
+            "features": features,
+        }
+
+    def record(self, model: str, latency_ms: float, completion_tokens: Optional[int] = None, error: bool = False) -> None:
+        """Feed back the outcome of an upstream call"""
+        stats = self._stats.get(model)
+        if stats is None:
+            return
+        with self._lock:
+            stats.record(latency_ms, completion_tokens, error)
+
+    def cost(self, model_name: str, usage: Optional[dict]) -> Optional[float]:
+        """Cost of a completion from the table's per-1k-token price"""
+        total_tokens = (usage or {}).get("total_tokens")
+        model = next((m for m in self.models if m["name"] == model_name), None)
+        if total_tokens is None or model is None:
+            return None
+        return model["cost_per_1k_tokens"] * total_tokens / 1000
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "base_latency_ms": round(s.base_latency_ms, 1),
+                    "ms_per_token": round(s.ms_per_token, 3),
+                    "error_rate": round(s.error_rate, 3),
+                    "samples": s.samples,
+                }
+                for name, s in self._stats.items()
+            }
+
+
+model_router = ModelRouter.from_settings()
@@ -0,0 +1,231 @@
+"""
+Local prompt classifier over the recommendation catalog categories.
+
+Multinomial naive Bayes on hashed word uni/bi-grams and character
+trigrams, in NumPy. Feature hashing uses CRC32, which is stable across
+processes, so an artifact trained offline scores identically in every
+worker. Trained with `python -m app.services.classifier_training`.
+"""
+import json
+import os
+import re
+import tempfile
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config.settings import settings
+from app.config.logging import logger
+
+# Bump when the feature extraction or artifact layout changes
+FORMAT_VERSION = 1
+
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "prompt_classifier.npz")
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_MAX_TOKENS = 256
+
+
+def extract_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed feature indices and counts for one text"""
+    tokens = _TOKEN_RE.findall(text.lower())[:_MAX_TOKENS]
+    features = [f"w:{t}" for t in tokens]
+    features += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f"<{token}>"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    if not features:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    mask = n_features - 1
+    hashed = np.fromiter((zlib.crc32(f.encode()) & mask for f in features), dtype=np.int64, count=len(features))
+    indices, counts = np.unique(hashed, return_counts=True)
+    return indices, counts.astype(np.float32)
+
+
+def vectorize(texts: Sequence[str], n_features: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR-style (indptr, indices, values) batch of hashed features"""
+    rows = [extract_features(text, n_features) for text in texts]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(indices) for indices, _ in rows])
+    if indptr[-1] == 0:
+        return indptr, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    indices = np.concatenate([indices for indices, _ in rows])
+    values = np.concatenate([values for _, values in rows])
+    return indptr, indices, values
+
+
+class PromptClassifier:
+    """Multinomial naive Bayes over hashed n-gram features"""
+
+    def __init__(
+        self,
+        classes: Sequence[str],
+        feature_log_prob: np.ndarray,
+        class_log_prior: np.ndarray,
+        feature_seen: np.ndarray,
+        metadata: Optional[dict] = None
+    ):
+        self.classes = list(classes)
+        self.feature_log_prob = feature_log_prob.astype(np.float32)
+        self.class_log_prior = class_log_prior.astype(np.float32)
+        # Features never seen in training would only add the smoothing
+        # term, which favours small classes; they are ignored at inference
+        self.feature_seen = feature_seen.astype(bool)
+        self.n_features = feature_log_prob.shape[1]
+        self.metadata = metadata or {}
+
+    @property
+    def version(self) -> str:
+        return self.metadata.get("version", "unversioned")
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        weights: Optional[Sequence[float]] = None,
+        n_features: int = 2 ** 16,
+        alpha: float = 1.0,
+        metadata: Optional[dict] = None
+    ) -> "PromptClassifier":
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+
+        classes = sorted(set(labels))
+        class_index = {c: i for i, c in enumerate(classes)}
+        weights = np.ones(len(texts)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        indptr, indices, values = vectorize(texts, n_features)
+        row_classes = np.array([class_index[label] for label in labels], dtype=np.int64)
+        row_of_value = np.repeat(np.arange(len(texts)), np.diff(indptr))
+
+        feature_counts = np.zeros((len(classes), n_features), dtype=np.float64)
+        np.add.at(
+            feature_counts,
+            (row_classes[row_of_value], indices),
+            values * weights[row_of_value]
+        )
+        class_counts = np.bincount(row_classes, weights=weights, minlength=len(classes))
+
+        smoothed = feature_counts + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        class_log_prior = np.log(class_counts) - np.log(class_counts.sum())
+
+        metadata = dict(metadata or {})
+        metadata.setdefault("version", datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"))
+        metadata.update({"format_version": FORMAT_VERSION, "n_examples": len(texts), "alpha": alpha})
+        feature_seen = feature_counts.sum(axis=0) > 0
+        return cls(classes, feature_log_prob, class_log_prior, feature_seen, metadata)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Class probabilities for a batch of texts, shape (len(texts), n_classes)"""
+        indptr, indices, values = vectorize(texts, self.n_features)
+        scores = np.tile(self.class_log_prior, (len(texts), 1))
+
+        seen = self.feature_seen[indices]
+        if not seen.all():
+            row_of_value = np.repeat(np.arange(len(texts)), np.diff(indptr))
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(row_of_value[seen], minlength=len(texts)))))
+            indices, values = indices[seen], values[seen]
+
+        if len(indices):
+            # Per-value contributions, summed per row with one reduceat
+            contributions = self.feature_log_prob[:, indices].T * values[:, None]
+            nonempty = np.diff(indptr) > 0
+            scores[nonempty] += np.add.reduceat(contributions, indptr[:-1][nonempty], axis=0)
+
+        scores -= scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """(category, confidence) for each text"""
+        probs = self.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        return [(self.classes[i], float(probs[row, i])) for row, i in enumerate(best)]
+
+    def save(self, path: str) -> None:
+        """Write the artifact atomically so loading workers never see a partial file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    classes=np.array(self.classes),
+                    feature_log_prob=self.feature_log_prob,
+                    class_log_prior=self.class_log_prior,
+                    feature_seen=self.feature_seen,
+                    metadata=np.array(json.dumps(self.metadata))
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "PromptClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            if metadata.get("format_version") != FORMAT_VERSION:
+                raise ValueError(
+                    f"Classifier artifact format {metadata.get('format_version')} "
+                    f"is not supported (expected {FORMAT_VERSION})"
+                )
+            return cls(
+                classes=[str(c) for c in data["classes"]],
+                feature_log_prob=data["feature_log_prob"],
+                class_log_prior=data["class_log_prior"],
+                feature_seen=data["feature_seen"],
+                metadata=metadata
+            )
+
+
+def catalog_seed_examples() -> Tuple[List[str], List[str]]:
+    """One training example per catalog keyword, labelled with its category"""
+    from app.services.catalog import get_catalog
+
+    texts, labels = [], []
+    for category in get_catalog().categories:
+        if category.main_rec is None:
+            continue
+        for keyword in category.keywords:
+            texts.append(keyword)
+            labels.append(category.id)
+    return texts, labels
+
+
+@lru_cache(maxsize=None)
+def get_prompt_classifier() -> Optional[PromptClassifier]:
+    """
+    Process-wide classifier, loaded once at startup.
+
+    Loads the artifact at PROMPT_CLASSIFIER_PATH (default
+    app/data/prompt_classifier.npz); without one, a model is bootstrapped
+    from the catalog keywords so the local path still works.
+    """
+    if not settings.LOCAL_CLASSIFIER_ENABLED:
+        return None
+
+    path = settings.PROMPT_CLASSIFIER_PATH or DEFAULT_ARTIFACT_PATH
+    if os.path.exists(path):
+        try:
+            classifier = PromptClassifier.load(path)
+            logger.info(f"Loaded prompt classifier {classifier.version} from {path}")
+            return classifier
+        except Exception as e:
+            logger.error(f"Failed to load prompt classifier from {path}: {e}")
+
+    texts, labels = catalog_seed_examples()
+    if not texts:
+        return None
+    classifier = PromptClassifier.fit(texts, labels, metadata={"version": "catalog-seed"})
+    logger.info("No prompt classifier artifact found, bootstrapped one from catalog keywords")
+    return classifier
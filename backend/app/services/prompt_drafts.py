@@ -0,0 +1,69 @@
+"""
+Revision tracking for analyze-as-you-type (/ai/analyze-draft).
+
+Each typing session keeps only its newest revision. Starting a newer
+revision sets the cancel event of the one before it, so an upstream
+analysis still queued or not yet sent for an outdated prompt is dropped,
+and a result that arrives after it was superseded is discarded instead of
+logged. State is per worker; revisions of one session should reach the
+same worker for cancellation to apply (they do with a single worker or
+sticky sessions).
+"""
+import threading
+from typing import Optional
+from app.config.settings import settings
+from app.core.cache import TTLCache
+
+
+class DraftState:
+    __slots__ = ("revision", "cancel", "revisions")
+
+    def __init__(self, revision: int, revisions: int):
+        self.revision = revision
+        self.cancel = threading.Event()
+        self.revisions = revisions  # Revisions seen in this session
+
+
+class DraftTracker:
+    """Newest revision and its cancel event per typing session"""
+
+    def __init__(
+        self,
+        max_sessions: int = settings.DRAFT_SESSION_MAX_SESSIONS,
+        ttl_seconds: float = settings.DRAFT_SESSION_TTL_SECONDS
+    ):
+        self._drafts = TTLCache(maxsize=max_sessions, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, revision: int) -> Optional[DraftState]:
+        """
+        Make `revision` the current one and cancel the previous revision.
+
+        Returns None when a newer revision of this session has already
+        arrived, i.e. this request is outdated.
+        """
+        with self._lock:
+            previous = self._drafts.get(key)
+            if previous is not None:
+                if revision < previous.revision:
+                    return None
+                previous.cancel.set()
+            state = DraftState(revision, (previous.revisions if previous else 0) + 1)
+            self._drafts.set(key, state)
+            return state
+
+    def is_current(self, key: str, state: DraftState) -> bool:
+        with self._lock:
+            return self._drafts.get(key) is state
+
+    def finish(self, key: str, state: DraftState) -> None:
+        """Forget the session after its final prompt, if nothing newer arrived"""
+        with self._lock:
+            if self._drafts.get(key) is state:
+                self._drafts.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+
+draft_tracker = DraftTracker()
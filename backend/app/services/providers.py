@@ -0,0 +1,145 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from app.config.settings import settings
+from app.config.logging import logger
+
+
+class ProviderRegistry:
+    """
+    Lazily constructed upstream provider clients.
+
+    Provider SDKs are imported inside their factories, so importing the app
+    (uvicorn workers, CLIs, tests) only pays for an SDK the first time a
+    request actually needs it.
+
+    PROVIDER_MODE=record wraps clients so calls are recorded to cassettes;
+    PROVIDER_MODE=replay answers from cassettes without building the real
+    client at all (see app.services.cassettes).
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._key_settings: Dict[str, Optional[str]] = {}
+        self._warmers: Dict[str, Callable[[Any], Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        api_key_setting: Optional[str] = None,
+        warm: Optional[Callable[[Any], Any]] = None
+    ) -> None:
+        """
+        Register a zero-argument factory that builds the client for `name`.
+        `warm(client)` makes a cheap authenticated request; only providers
+        with a live call path have one.
+        """
+        self._factories[name] = factory
+        self._key_settings[name] = api_key_setting
+        if warm is not None:
+            self._warmers[name] = warm
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def warmable(self) -> List[str]:
+        """Providers the startup warm-up should connect to"""
+        return list(self._warmers)
+
+    def warm(self, name: str) -> None:
+        """
+        Build the client and, in live mode, open its pooled connection
+        (TCP, TLS and auth) with the registered cheap request
+        """
+        client = self.get(name)
+        if settings.PROVIDER_MODE == "live":
+            self._warmers[name](client)
+
+    def available(self, name: str) -> bool:
+        """Whether `name` can be called: its API key is set, or it has a cassette to replay"""
+        from app.services.cassettes import ADAPTERS, cassette_for
+
+        if settings.PROVIDER_MODE == "replay":
+            return name in ADAPTERS and cassette_for(name).exists()
+        key_setting = self._key_settings.get(name)
+        return bool(getattr(settings, key_setting)) if key_setting else name in self._factories
+
+    def _build(self, name: str) -> Any:
+        from app.services.cassettes import ADAPTERS, cassette_for
+
+        adapter = ADAPTERS.get(name)
+        if settings.PROVIDER_MODE == "replay":
+            if adapter is None:
+                raise KeyError(f"Provider {name} cannot be replayed")
+            return adapter(cassette_for(name))
+        client = self._factories[name]()
+        if settings.PROVIDER_MODE == "record" and adapter is not None:
+            return adapter(cassette_for(name), client)
+        return client
+
+    def get(self, name: str) -> Any:
+        """Return the client for `name`, importing and building it on first use"""
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown provider: {name}")
+                logger.info(f"Initializing provider client: {name} ({settings.PROVIDER_MODE})")
+                client = self._build(name)
+                self._clients[name] = client
+        return client
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the client for `name` has already been built"""
+        return name in self._clients
+
+    def reset(self) -> None:
+        """Drop all built clients; they are rebuilt lazily on next use"""
+        with self._lock:
+            self._clients.clear()
+
+
+def _make_groq():
+    from groq import Groq
+    return Groq(api_key=settings.GROQ_API_KEY)
+
+
+def _make_gemini():
+    import google.generativeai as genai
+    genai.configure(api_key=settings.GOOGLE_API_KEY)
+    return genai
+
+
+def _warm_groq(client) -> None:
+    # /ready waits for this, so a short timeout and no retries.
+    # The copy shares the client's connection pool, which is what gets warmed
+    client.with_options(timeout=settings.PROVIDER_WARMUP_TIMEOUT_SECONDS, max_retries=0).models.list()
+
+
+def _make_perplexity():
+    import requests
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {settings.PERPLEXITY_API_KEY}",
+        "Content-Type": "application/json"
+    })
+    return session
+
+
+def _warm_perplexity(session) -> None:
+    # There is no cheap authenticated endpoint; any answer leaves the
+    # connection open in the session's pool
+    session.head("https://api.perplexity.ai/chat/completions", timeout=settings.PROVIDER_WARMUP_TIMEOUT_SECONDS).close()
+
+
+providers = ProviderRegistry()
+providers.register("groq", _make_groq, "GROQ_API_KEY", warm=_warm_groq)
+# Its call path is disabled, so the SDK is not loaded by the warm-up
+providers.register("gemini", _make_gemini, "GOOGLE_API_KEY")
+providers.register("perplexity", _make_perplexity, "PERPLEXITY_API_KEY", warm=_warm_perplexity)
@@ -0,0 +1,293 @@
+"""
+Retention and columnar archive for ai_requests.
+
+Rows older than REQUEST_RETENTION_DAYS are moved, in chunks, out of the hot
+table into immutable segments partitioned by day:
+
+    {ARCHIVE_DIR}/ai_requests/day=2026-01-31/0000001201-0000001850/
+        _meta.json          row count, id and created_at range, columns
+        prompt.json.gz      one gzip-compressed JSON array per column
+        reasoning.json.gz
+        ...
+
+Keeping each column in its own file lets readers open only the columns a
+query needs, and prompts compress far better next to each other than
+interleaved with numbers. Requests that have feedback stay in the hot table:
+feedback rows reference them and classifier training joins on them.
+
+    python -m app.services.request_archive --older-than-days 90
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+from sqlalchemy import exists, select
+
+from app.config.settings import settings
+from app.config.logging import logger
+from app.models.ai_request import AIRequest
+from app.models.feedback import Feedback
+from app.repositories.text_blob_repo import TextBlobRepository
+
+# Bump when the segment layout changes
+FORMAT_VERSION = 1
+
+TABLE = "ai_requests"
+# Segments hold the resolved text; text_blobs digests only exist in the hot table
+BLOB_COLUMNS = ("prompt_hash", "reasoning_hash")
+COLUMNS = [column.name for column in AIRequest.__table__.columns if column.name not in BLOB_COLUMNS]
+
+
+def archive_root(root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.ARCHIVE_DIR, TABLE)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; they are UTC like server_default now()
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _encode(column: str, values: list) -> list:
+    if column == "created_at":
+        return [v.isoformat() if v is not None else None for v in values]
+    return values
+
+
+def _decode(column: str, values: list) -> list:
+    if column == "created_at":
+        return [datetime.fromisoformat(v) if v is not None else None for v in values]
+    return values
+
+
+def _archived_ids(partition: str, first_id: int, last_id: int) -> Set[int]:
+    """Ids already stored in the partition's segments overlapping [first_id, last_id]"""
+    if not os.path.isdir(partition):
+        return set()
+    ids: Set[int] = set()
+    for name in os.listdir(partition):
+        if name.startswith("."):
+            continue
+        segment = os.path.join(partition, name)
+        with open(os.path.join(segment, "_meta.json")) as f:
+            meta = json.load(f)
+        if meta["min_id"] <= last_id and meta["max_id"] >= first_id:
+            ids.update(read_column(segment, "id"))
+    return ids
+
+
+def write_segment(rows: Sequence[dict], root: Optional[str] = None) -> Optional[str]:
+    """
+    Write rows of one day as a segment and return its directory.
+
+    The segment is built in a temporary directory and renamed into place, so
+    readers never see a partial one. Rows already stored in an existing
+    segment of the day are left out, so writing the same rows again, alone
+    or within a different range, is a no-op (None when nothing is left).
+    """
+    day = rows[0]["created_at"].date().isoformat()
+    partition = os.path.join(archive_root(root), f"day={day}")
+    archived = _archived_ids(partition, rows[0]["id"], rows[-1]["id"])
+    rows = [row for row in rows if row["id"] not in archived]
+    if not rows:
+        return None
+
+    first_id, last_id = rows[0]["id"], rows[-1]["id"]
+    target = os.path.join(partition, f"{first_id:010d}-{last_id:010d}")
+
+    os.makedirs(partition, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=partition, prefix=".tmp-")
+    try:
+        for column in COLUMNS:
+            values = _encode(column, [row[column] for row in rows])
+            with gzip.open(os.path.join(tmp_dir, f"{column}.json.gz"), "wt", encoding="utf-8") as f:
+                json.dump(values, f, separators=(",", ":"))
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "table": TABLE,
+            "day": day,
+            "rows": len(rows),
+            "min_id": first_id,
+            "max_id": last_id,
+            "min_created_at": min(row["created_at"] for row in rows).isoformat(),
+            "max_created_at": max(row["created_at"] for row in rows).isoformat(),
+            "columns": COLUMNS
+        }
+        with open(os.path.join(tmp_dir, "_meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return target
+
+
+def read_column(segment: str, column: str) -> list:
+    with gzip.open(os.path.join(segment, f"{column}.json.gz"), "rt", encoding="utf-8") as f:
+        return _decode(column, json.load(f))
+
+
+def list_segments(
+    root: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    newest_first: bool = False
+) -> List[str]:
+    """Segment directories, pruned by day partition"""
+    base = archive_root(root)
+    if not os.path.isdir(base):
+        return []
+
+    segments = []
+    for partition in sorted(os.listdir(base), reverse=newest_first):
+        if not partition.startswith("day="):
+            continue
+        day = date.fromisoformat(partition[4:])
+        if (since and day < since) or (until and day > until):
+            continue
+        names = sorted(
+            (name for name in os.listdir(os.path.join(base, partition)) if not name.startswith(".")),
+            reverse=newest_first
+        )
+        segments.extend(os.path.join(base, partition, name) for name in names)
+    return segments
+
+
+def scan(
+    columns: Optional[Sequence[str]] = None,
+    client_id: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    root: Optional[str] = None,
+    newest_first: bool = False
+) -> Iterator[dict]:
+    """
+    Archived rows as dicts holding only `columns` (default: all).
+
+    Day partitions outside [since, until] are never opened. With
+    `client_id`, only that column is read first, and the requested ones
+    only from segments that contain a match.
+    """
+    columns = list(columns or COLUMNS)
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown archive columns: {sorted(unknown)}")
+
+    for segment in list_segments(root, since, until, newest_first):
+        selected = None
+        if client_id is not None:
+            selected = [i for i, value in enumerate(read_column(segment, "client_id")) if value == client_id]
+            if not selected:
+                continue
+
+        data = {column: read_column(segment, column) for column in columns}
+        n_rows = len(data[columns[0]]) if columns else 0
+        indices = selected if selected is not None else range(n_rows)
+        if newest_first:
+            indices = reversed(indices)
+        for i in indices:
+            yield {column: data[column][i] for column in columns}
+
+
+def _has_feedback():
+    return exists().where(Feedback.ai_request_id == AIRequest.id)
+
+
+def _expired_chunk(db, cutoff: datetime, chunk_size: int) -> List[dict]:
+    result = db.execute(
+        select(
+            *(getattr(AIRequest, column).label(column) for column in COLUMNS),
+            *(getattr(AIRequest, column) for column in BLOB_COLUMNS)
+        )
+        .where(AIRequest.created_at < cutoff, ~_has_feedback())
+        .order_by(AIRequest.id)
+        .limit(chunk_size)
+    )
+    rows = [dict(row._mapping) for row in result]
+    for row in rows:
+        row["created_at"] = as_utc(row["created_at"])
+    return rows
+
+
+def archive_requests(
+    db,
+    older_than_days: int = settings.REQUEST_RETENTION_DAYS,
+    chunk_size: int = settings.ARCHIVE_CHUNK_SIZE,
+    root: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> dict:
+    """
+    Move expired rows into day segments, one chunk per transaction.
+
+    The chunk is deleted first, re-checking for feedback that arrived after
+    it was selected; only the rows actually deleted are written, and the
+    transaction commits once their segments are on disk. If the job dies
+    before the commit, the next run selects the rows again and writes only
+    those no segment holds yet. Text blobs no longer referenced by any hot
+    row are deleted with the chunk.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)
+    report = {"rows": 0, "segments": 0, "blobs": 0, "cutoff": cutoff.isoformat()}
+
+    while True:
+        rows = _expired_chunk(db, cutoff, chunk_size)
+        if not rows:
+            break
+
+        ids = [row["id"] for row in rows]
+        try:
+            db.execute(AIRequest.__table__.delete().where(AIRequest.id.in_(ids), ~_has_feedback()))
+            kept = set(db.scalars(select(AIRequest.id).where(AIRequest.id.in_(ids))))
+            moved = [row for row in rows if row["id"] not in kept]
+
+            by_day: Dict[date, List[dict]] = {}
+            for row in moved:
+                by_day.setdefault(row["created_at"].date(), []).append(row)
+            segments = sum(write_segment(day_rows, root) is not None for day_rows in by_day.values())
+
+            blobs = TextBlobRepository.delete_unreferenced(
+                db, (row[column] for row in moved for column in BLOB_COLUMNS)
+            )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        report["rows"] += len(moved)
+        report["segments"] += segments
+        report["blobs"] += blobs
+        logger.info(f"Archived {len(moved)} ai_requests up to id {ids[-1]}")
+
+        if len(rows) < chunk_size:
+            break
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old ai_requests rows into the columnar archive")
+    parser.add_argument("--older-than-days", type=int, default=settings.REQUEST_RETENTION_DAYS)
+    parser.add_argument("--chunk-size", type=int, default=settings.ARCHIVE_CHUNK_SIZE)
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    from app.models.base import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = archive_requests(
+            db,
+            older_than_days=args.older_than_days,
+            chunk_size=args.chunk_size,
+            root=args.archive_dir
+        )
+    finally:
+        db.close()
+
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,114 @@
+"""
+Auth overhead per request, before and after the principal cache, and event
+loop stalls caused by bcrypt.
+
+1. get_current_user with the cache cleared before every call (the old
+   per-request JWT decode + users query) vs. with the cache warm.
+2. Worst event-loop lag while K password verifications run, calling
+   verify_password inline (blocking) vs. verify_password_async (thread pool).
+
+    python benchmarks/bench_auth.py --iterations 5000 --verifications 8
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_current_user
+from app.core.auth_cache import principal_cache
+from app.core.security import create_access_token, get_password_hash, verify_password, verify_password_async
+from app.models.base import Base
+from app.models.user import User
+
+
+def bench_get_current_user(iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'auth.db'}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        user = User(email="bench@example.com", username="bench", hashed_password="x", is_active=True)
+        db.add(user)
+        db.commit()
+
+        credentials = HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=create_access_token({"sub": str(user.id)})
+        )
+
+        def timed(clear_cache: bool) -> list:
+            samples = []
+            for _ in range(iterations):
+                if clear_cache:
+                    principal_cache.clear()
+                start = time.perf_counter()
+                get_current_user(credentials, db)
+                samples.append((time.perf_counter() - start) * 1e6)
+            return samples
+
+        uncached = timed(clear_cache=True)
+        cached = timed(clear_cache=False)
+        db.close()
+        engine.dispose()
+
+    print("get_current_user per call (us)")
+    for label, samples in (("uncached", uncached), ("cached", cached)):
+        samples.sort()
+        print(f"  {label:>9}: median {statistics.median(samples):8.1f}  p99 {samples[int(len(samples) * 0.99)]:8.1f}")
+
+
+async def _max_loop_lag(work) -> float:
+    """Run `work` while a 1ms ticker records the worst scheduling delay"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    await work()
+    done.set()
+    await tick
+    return max(lags) * 1000 if lags else 0.0
+
+
+async def bench_password_verification(verifications: int) -> None:
+    hashed = get_password_hash("correct horse battery staple")
+
+    async def blocking():
+        for _ in range(verifications):
+            verify_password("correct horse battery staple", hashed)
+            await asyncio.sleep(0)
+
+    async def offloaded():
+        await asyncio.gather(*[
+            verify_password_async("correct horse battery staple", hashed) for _ in range(verifications)
+        ])
+
+    print(f"Worst event loop lag during {verifications} bcrypt verifications (ms)")
+    print(f"  {'inline':>9}: {await _max_loop_lag(blocking):8.1f}")
+    print(f"  {'threaded':>9}: {await _max_loop_lag(offloaded):8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--verifications", type=int, default=8)
+    args = parser.parse_args()
+
+    bench_get_current_user(args.iterations)
+    asyncio.run(bench_password_verification(args.verifications))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Memory per chat session and concurrent WebSocket sessions per worker.
+
+1. Python heap held by one idle session, for a short conversation and for a
+   session filled to CHAT_SESSION_MAX_TOKENS (the bound on idle memory).
+2. Starts one uvicorn worker without provider keys (replies come straight
+   from the server, so only transport and session overhead is measured),
+   opens increasing numbers of concurrent /ai/chat/ws connections, runs one
+   turn on each and keeps them open. Reports worker RSS and turn latency at
+   each level.
+
+    python benchmarks/bench_chat_sessions.py --levels 100,500,1000,2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import websockets
+
+from app.config.settings import settings
+from app.services.chat_sessions import ChatSession, InMemorySessionStore
+
+
+def bench_session_memory(sessions: int) -> None:
+    turn = "Could you explain how this part of the code works and what I should change? " * 2
+    for label, turns in (("6 turns", 6), ("at token cap", 10 ** 6)):
+        store = InMemorySessionStore(max_sessions=sessions, ttl_seconds=3600)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(sessions):
+            session = ChatSession(f"bench-{i}")
+            for t in range(min(turns, settings.CHAT_SESSION_MAX_TOKENS // 30 + 10)):
+                # Distinct strings, like real messages
+                session.append("user" if t % 2 == 0 else "assistant", f"{t} {i} {turn}")
+            store.save(session)
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f"session memory ({label:>12}): {used / sessions / 1024:8.1f} KiB/session")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+async def _turn(ws) -> float:
+    start = time.perf_counter()
+    await ws.send('{"type": "message", "content": "hello, can you help me with a python question?"}')
+    while True:
+        if '"done"' in await ws.recv():
+            return (time.perf_counter() - start) * 1000
+
+
+async def bench_connections(url: str, pid: int, levels) -> None:
+    open_sockets = []
+    for level in levels:
+        new = []
+        while len(open_sockets) + len(new) < level:
+            ws = await websockets.connect(url, max_queue=None)
+            await ws.recv()  # session id
+            new.append(ws)
+        latencies = await asyncio.gather(*(_turn(ws) for ws in new))
+        open_sockets += new
+        await asyncio.sleep(0.5)
+        print(
+            f"{level:>6} sessions: worker RSS {_rss_mb(pid):7.1f} MB  "
+            f"turn p50 {statistics.median(latencies):7.1f}ms  max {max(latencies):7.1f}ms"
+        )
+    await asyncio.gather(*(ws.close() for ws in open_sockets))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="100,500,1000,2000", help="Comma-separated concurrent session counts")
+    parser.add_argument("--sessions", type=int, default=1000, help="Sessions for the heap measurement")
+    args = parser.parse_args()
+
+    bench_session_memory(args.sessions)
+
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            "GROQ_API_KEY": "",
+            "DEBUG": "False",
+            "ENABLE_METRICS": "False"
+        })
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=env
+        )
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            print(f"idle worker RSS {_rss_mb(server.pid):7.1f} MB")
+            levels = [int(level) for level in args.levels.split(",")]
+            asyncio.run(bench_connections(f"ws://127.0.0.1:{port}/api/v1/ai/chat/ws", server.pid, levels))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Per-call latency of the local context-shift detector.
+
+Simulates conversations of increasing length where the client sends the
+full history on every turn (the frontend's current behaviour) and reports
+per-call latency. With a conversation_id only new messages are processed,
+so latency stays flat as the history grows.
+
+    python benchmarks/bench_context_monitor.py --turns 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.catalog import get_catalog
+from app.services.context_monitor import ContextShiftDetector
+
+FILLER = "could you please look at this again and tell me what you think about the approach".split()
+
+
+def _message(rng: random.Random, keywords: list) -> str:
+    words = rng.sample(FILLER, 8) + rng.sample(keywords, 2)
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--conversations", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keywords = list(get_catalog().keyword_categories)
+    detector = ContextShiftDetector()
+
+    for mode in ("incremental", "stateless"):
+        samples = []
+        for conversation in range(args.conversations):
+            history = []
+            conversation_id = f"bench-{conversation}" if mode == "incremental" else None
+            for _ in range(args.turns):
+                history.append({"role": "user", "content": _message(rng, keywords)})
+                history.append({"role": "ai", "content": "Sure, here you go."})
+                start = time.perf_counter()
+                detector.observe("GPT-4o", messages=history, conversation_id=conversation_id)
+                samples.append((time.perf_counter() - start) * 1e6)
+
+        samples.sort()
+        print(
+            f"{mode:>12}: median {statistics.median(samples):8.1f}us  "
+            f"p99 {samples[int(len(samples) * 0.99)]:8.1f}us  max {samples[-1]:8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
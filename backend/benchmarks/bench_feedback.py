@@ -0,0 +1,82 @@
+"""
+Feedback ingestion throughput: per-item POST /feedback/feedback vs
+POST /feedback/feedback/batch, synchronous and with ?background=true.
+
+Runs in-process against a throwaway SQLite database, or the database given
+by --database-url. Reports items/s and SQL statements per item.
+
+    python benchmarks/bench_feedback.py --items 5000 --batch-size 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000, help="Feedback items per path")
+    parser.add_argument("--batch-size", type=int, default=100, help="Items per batch request")
+    parser.add_argument("--database-url", help="Database to use instead of a throwaway SQLite file")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp.name}/bench.db"
+    os.environ["ENABLE_METRICS"] = "False"
+    os.environ["DEBUG"] = "False"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.main import app
+    from app.models import ai_request, feedback, user  # noqa: F401 - register tables
+    from app.models.ai_request import AIRequest
+    from app.models.base import Base, SessionLocal, engine
+    from app.services.feedback_ingest import feedback_ingestor
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        rows = [AIRequest(prompt=f"prompt {i}", recommended_model="m", provider="p") for i in range(1000)]
+        db.add_all(rows)
+        db.commit()
+        request_ids = [row.id for row in rows]
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+    items = [
+        {"ai_request_id": request_ids[i % len(request_ids)], "rating": i % 5 + 1, "was_helpful": i % 2 == 0}
+        for i in range(args.items)
+    ]
+    batches = [items[i:i + args.batch_size] for i in range(0, len(items), args.batch_size)]
+
+    def per_item(client):
+        for item in items:
+            client.post("/api/v1/feedback/feedback", json=item).raise_for_status()
+
+    def batched(client):
+        for batch in batches:
+            client.post("/api/v1/feedback/feedback/batch", json={"items": batch}).raise_for_status()
+
+    def background(client):
+        for batch in batches:
+            client.post("/api/v1/feedback/feedback/batch?background=true", json={"items": batch}).raise_for_status()
+        feedback_ingestor.flush()
+
+    with TestClient(app) as client:
+        for name, run in (("per-item", per_item), ("batch", batched), ("background", background)):
+            statements[0] = 0
+            start = time.perf_counter()
+            run(client)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>10}: {args.items / elapsed:9.0f} items/s  "
+                f"{statements[0] / args.items:5.2f} SQL statements/item"
+            )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
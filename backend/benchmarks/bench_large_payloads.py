@@ -0,0 +1,121 @@
+"""
+Worker memory under adversarial payloads: peak RSS of a uvicorn server
+handling a multi-megabyte prompt and chat history, with the request size
+limits at their defaults and effectively disabled.
+
+Starts one real server process per configuration (bodies arrive in chunks
+from a socket, as in production) on a throwaway SQLite database. Before
+each payload the server's peak-RSS counter (VmHWM) is reset. Linux only.
+
+    python benchmarks/bench_large_payloads.py --megabytes 8
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+UNLIMITED = {
+    "MAX_REQUEST_BODY_BYTES": "0",
+    "MAX_PROMPT_CHARS": str(2 ** 31),
+    "MAX_CHAT_HISTORY_TURNS": str(2 ** 31),
+    "PROMPT_LOG_MAX_CHARS": str(2 ** 31)
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status_kib(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _payloads(megabytes: float) -> dict:
+    size = int(megabytes * 2 ** 20)
+    turn = {"id": 1712345678.123, "role": "ai", "type": "ai", "timestamp": "10:42",
+            "content": "Sure, here is how you would do that. " * 4}
+    turns = size // len(json.dumps(turn))
+    history = json.dumps({"message": "and now?", "model_name": "GPT-4o", "history": [turn] * turns}).encode()
+    prompt = json.dumps({"prompt": "write a python script " * (size // 22)}).encode()
+    return {
+        "prompt": ("/api/v1/ai/analyze-prompt", prompt, False),
+        "history": ("/api/v1/ai/chat", history, False),
+        "history, chunked": ("/api/v1/ai/chat", history, True)
+    }
+
+
+def _run(name: str, overrides: dict, payloads: dict, database_url: str) -> None:
+    import httpx
+
+    port = _free_port()
+    env = {**os.environ, **overrides, "DATABASE_URL": database_url, "ENABLE_METRICS": "False", "DEBUG": "False"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base, timeout=120) as client:
+            for _ in range(100):
+                try:
+                    client.get("/api/v1/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            # Warm up code paths (classifier, catalog, DB pool) before measuring
+            client.post("/api/v1/ai/analyze-prompt", json={"prompt": "write a python script"})
+            client.post("/api/v1/ai/chat", json={"message": "hi", "model_name": "GPT-4o"})
+
+            print(f"{name}:")
+            for label, (path, body, chunked) in payloads.items():
+                with open(f"/proc/{server.pid}/clear_refs", "w") as f:
+                    f.write("5")  # Reset VmHWM to the current RSS
+                baseline = _status_kib(server.pid, "VmRSS")
+                content = (body[i:i + 65536] for i in range(0, len(body), 65536)) if chunked else body
+                start = time.perf_counter()
+                response = client.post(path, content=content, headers={"Content-Type": "application/json"})
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                peak = _status_kib(server.pid, "VmHWM")
+                print(
+                    f"  {label:>16}: {len(body) / 2 ** 20:5.1f} MiB -> {response.status_code}  "
+                    f"peak RSS +{(peak - baseline) / 1024:7.1f} MiB  {elapsed_ms:8.1f}ms"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=8, help="Size of each adversarial body")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    database_url = f"sqlite:///{tmp.name}/bench.db"
+    from app.core.migrations import run_migrations
+    run_migrations(database_url)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    payloads = _payloads(args.megabytes)
+    _run("limits off", UNLIMITED, payloads, database_url)
+    _run("default limits", {}, payloads, database_url)
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Content-addressed prompt storage: database size, insert throughput and
+usage query latency with prompts and reasonings inline in ai_requests vs
+stored once in text_blobs.
+
+Seeds two throwaway SQLite databases with the same --rows requests. Prompt
+popularity is Zipf-distributed over --distinct-prompts templates (clients
+re-send the same prompts), and reasonings come from a small per-model set,
+like the classifier and router produce.
+
+    python benchmarks/bench_prompt_dedup.py --rows 200000 --distinct-prompts 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = (
+    "please write explain the a python video image essay code function data model design compare "
+    "summarize translate refactor review article email report test bug performance query api"
+).split()
+MODELS = ["Claude Sonnet 4.5", "GPT-4o", "Gemini 2.5 Pro", "Llama 3.3 70B", "DALL-E 3"]
+
+
+def _dataset(rows: int, distinct: int, clients: int, rng: random.Random):
+    prompts = [" ".join(rng.choices(WORDS, k=rng.randint(20, 200))) for _ in range(distinct)]
+    reasonings = {
+        model: [f"{model} is the best fit: " + " ".join(rng.choices(WORDS, k=40)) for _ in range(8)]
+        for model in MODELS
+    }
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    for prompt in rng.choices(prompts, weights=weights, k=rows):
+        model = rng.choice(MODELS)
+        yield {
+            "prompt": prompt,
+            "recommended_model": model,
+            "provider": "Anthropic",
+            "reasoning": rng.choice(reasonings[model]),
+            "client_id": f"client-{rng.randrange(clients)}",
+            "response_time_ms": rng.uniform(5, 900),
+            "estimated_cost": rng.uniform(0, 0.01),
+            "request_metadata": {"source": "classifier"}
+        }
+
+
+def _size_mib(engine, path: str) -> float:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return os.path.getsize(path) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Seeded requests")
+    parser.add_argument("--distinct-prompts", type=int, default=20000, help="Prompt templates")
+    parser.add_argument("--clients", type=int, default=50, help="Distinct client ids")
+    parser.add_argument("--inserts", type=int, default=2000, help="Requests logged for the throughput run")
+    parser.add_argument("--queries", type=int, default=300, help="Usage queries per layout")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/unused.db"
+    os.environ["ENABLE_METRICS"] = "False"
+    os.environ["DEBUG"] = "False"
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import feedback, user  # noqa: F401 - register tables
+    from app.models.ai_request import AIRequest
+    from app.models.base import Base
+    from app.repositories.ai_logs_repo import AILogsRepository
+    from app.repositories.text_blob_repo import TextBlobRepository
+
+    def inline_create(db, **values):
+        # The logging path before text_blobs
+        row = AIRequest(**values)
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+
+    layouts = {}
+    for name in ("inline", "deduped"):
+        path = os.path.join(tmp.name, f"{name}.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        layouts[name] = (path, engine, sessionmaker(bind=engine))
+
+    rows = list(_dataset(args.rows, args.distinct_prompts, args.clients, random.Random(0)))
+    table = AIRequest.__table__
+    for name, (path, engine, Session) in layouts.items():
+        with Session() as db:
+            for start in range(0, len(rows), 5000):
+                chunk = [dict(row) for row in rows[start:start + 5000]]
+                if name == "deduped":
+                    texts = [text for row in chunk for text in (row.pop("prompt"), row.pop("reasoning"))]
+                    hashes = TextBlobRepository.intern(db, texts)
+                    for i, row in enumerate(chunk):
+                        row["prompt_hash"], row["reasoning_hash"] = hashes[2 * i], hashes[2 * i + 1]
+                db.execute(table.insert(), chunk)
+            db.commit()
+
+    print(f"{args.rows} requests, {args.distinct_prompts} prompt templates (Zipf)")
+    fresh = list(_dataset(args.inserts, args.distinct_prompts, args.clients, random.Random(1)))
+    for name, (path, engine, Session) in layouts.items():
+        size = _size_mib(engine, path)
+
+        create = AILogsRepository.create if name == "deduped" else inline_create
+        with Session() as db:
+            start = time.perf_counter()
+            for values in fresh:
+                create(db, **values)
+            throughput = len(fresh) / (time.perf_counter() - start)
+
+        latencies = []
+        with Session() as db:
+            for i in range(args.queries):
+                start = time.perf_counter()
+                page = AILogsRepository.list(db, client_id=f"client-{i % args.clients}", limit=100)
+                [(row.prompt, row.reasoning) for row in page]
+                latencies.append((time.perf_counter() - start) * 1000)
+                db.expunge_all()
+
+        print(
+            f"{name:>8}: {size:8.1f} MiB  {throughput:7.0f} inserts/s  "
+            f"usage page p50 {statistics.median(latencies):6.2f}ms  max {max(latencies):6.2f}ms"
+        )
+        engine.dispose()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Deterministic offline latency runs from recorded provider traffic.
+
+Step 1 records cassettes. Use --record to call the live providers (API keys
+required), or --synthetic-latency-ms to record through a stand-in Groq
+client that answers after a fixed delay, with no keys or network needed:
+
+    python benchmarks/bench_replay.py --record --cassettes ./cassettes
+    python benchmarks/bench_replay.py --synthetic-latency-ms 400 --cassettes /tmp/cassettes
+
+Step 2 replays the cassettes through /ai/analyze-prompt and /ai/chat at each
+REPLAY_LATENCY_SCALE. Scale 0 measures only our own request handling,
+without the provider; scale 1 reproduces the recorded end-to-end latency.
+
+    python benchmarks/bench_replay.py --cassettes ./cassettes --scales 0,1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PROMPTS = [
+    "write a python function that summarizes a long article",
+    "generate a photorealistic image of a lighthouse at dusk",
+    "compare postgres and mysql for an analytics workload and recommend one",
+    "translate this paragraph into french and keep the tone informal",
+    "make a 30 second product video for a coffee brand",
+    "debug this stack trace from a react app that fails on login",
+    "draft an email asking my landlord to fix the heating",
+    "design a database schema for a multi-tenant invoicing system",
+]
+
+ANALYSIS_REPLY = json.dumps({
+    "main": {"name": "Claude Sonnet 4.5", "provider": "Anthropic", "reasoning": "Strong general model",
+             "input_price": 3.0, "output_price": 15.0, "speed": "Fast", "categories": ["text"]},
+    "alternative": {"name": "GPT-4o", "provider": "OpenAI", "reasoning": "Good alternative",
+                    "input_price": 2.5, "output_price": 10.0, "speed": "Fast", "categories": ["text"]}
+})
+
+
+class SyntheticGroq:
+    """Answers after a fixed delay, with a valid analysis JSON for analysis prompts"""
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        content = ANALYSIS_REPLY if kwargs["messages"][-1]["content"].startswith("Task: ") else "Sure, here is how."
+        return _Completion(content)
+
+
+class _Completion:
+    def __init__(self, content: str):
+        self._data = {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 50, "completion_tokens": len(content) // 4, "total_tokens": 50 + len(content) // 4}
+        }
+        from app.services.cassettes import to_namespace
+        self.__dict__.update(vars(to_namespace(self._data)))
+
+    def model_dump(self, mode="python"):
+        return self._data
+
+
+def _run(client, prompts, repeat: int) -> dict:
+    latencies = {"analyze-prompt": [], "chat": []}
+    for _ in range(repeat):
+        for prompt in prompts:
+            for endpoint, body in (
+                ("analyze-prompt", {"prompt": prompt}),
+                ("chat", {"message": prompt, "model_name": "Oasis"}),
+            ):
+                start = time.perf_counter()
+                response = client.post(f"/api/v1/ai/{endpoint}", json=body)
+                response.raise_for_status()
+                latencies[endpoint].append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: dict) -> None:
+    for endpoint, values in latencies.items():
+        values = sorted(values)
+        p95 = values[int(len(values) * 0.95) - 1] if len(values) >= 20 else values[-1]
+        print(f"{label:>12} {endpoint:>15}: p50 {statistics.median(values):8.2f}ms  p95 {p95:8.2f}ms  n={len(values)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassettes", default="./cassettes", help="Cassette directory")
+    parser.add_argument("--prompts", help="File with one prompt per line (default: built-in set)")
+    parser.add_argument("--record", action="store_true", help="Record from the live providers first")
+    parser.add_argument("--synthetic-latency-ms", type=float, help="Record from a stand-in Groq with this latency first")
+    parser.add_argument("--scales", default="0,1", help="Comma-separated REPLAY_LATENCY_SCALE values to replay at")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the prompts per scale")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/bench.db"
+    os.environ["ENABLE_METRICS"] = "False"
+    os.environ["DEBUG"] = "False"
+
+    from fastapi.testclient import TestClient
+    from app.config.settings import settings
+    from app.main import app
+    from app.models import ai_request, feedback, user  # noqa: F401 - register tables
+    from app.models.base import Base, engine
+    from app.services.providers import providers
+
+    Base.metadata.create_all(bind=engine)
+    prompts = Path(args.prompts).read_text().splitlines() if args.prompts else PROMPTS
+    prompts = [p for p in prompts if p.strip()]
+    settings.PROVIDER_CASSETTE_DIR = args.cassettes
+    # Every prompt goes upstream, not to the local classifier
+    settings.LOCAL_CLASSIFIER_ENABLED = False
+
+    with TestClient(app) as client:
+        if args.record or args.synthetic_latency_ms is not None:
+            settings.PROVIDER_MODE = "record"
+            if args.synthetic_latency_ms is not None:
+                settings.GROQ_API_KEY = settings.GROQ_API_KEY or "synthetic"
+                settings.PERPLEXITY_API_KEY = ""
+                providers.register("groq", lambda: SyntheticGroq(args.synthetic_latency_ms), "GROQ_API_KEY")
+            providers.reset()
+            _report("recorded", _run(client, prompts, 1))
+
+        settings.PROVIDER_MODE = "replay"
+        for scale in (float(s) for s in args.scales.split(",")):
+            settings.REPLAY_LATENCY_SCALE = scale
+            providers.reset()
+            _run(client, prompts, 1)  # warm-up
+            _report(f"scale {scale:g}", _run(client, prompts, args.repeat))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Hot-table size and usage-query latency before and after archiving.
+
+Fills a throwaway SQLite database with a year of ai_requests, runs the
+usage queries, moves everything older than the retention window to the
+columnar archive, and runs them again. Also reports archive size and the
+cost of an archive scan with and without column pruning.
+
+    python benchmarks/bench_retention.py --rows 200000 --retention-days 90
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import user, feedback  # noqa: F401 - register tables
+from app.models.ai_request import AIRequest
+from app.models.base import Base
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.services.request_archive import archive_requests, scan
+
+MODELS = ["Claude Sonnet 4.5", "GPT-4o", "Gemini 2.5 Pro", "Veo 3.1", "llama-3.1-8b-instant"]
+WORDS = "please write explain the a python video image essay code function data model design compare".split()
+
+
+def _fill(db, rows: int, now: datetime, clients: int) -> None:
+    rng = random.Random(0)
+    # Logged in time order, like production
+    timestamps = sorted((now - timedelta(seconds=rng.uniform(0, 365 * 86400)) for _ in range(rows)))
+    batch = []
+    for created_at in timestamps:
+        batch.append({
+            "prompt": " ".join(rng.choices(WORDS, k=rng.randint(8, 60))),
+            "recommended_model": rng.choice(MODELS),
+            "provider": "Groq",
+            "reasoning": " ".join(rng.choices(WORDS, k=40)),
+            "client_id": f"client-{rng.randrange(clients)}",
+            "response_time_ms": rng.uniform(5, 900),
+            "estimated_cost": rng.uniform(0, 0.01),
+            "request_metadata": {"source": rng.choice(["classifier", "groq", "perplexity"])},
+            "created_at": created_at
+        })
+        if len(batch) == 10000:
+            db.execute(AIRequest.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.execute(AIRequest.__table__.insert(), batch)
+    db.commit()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _report(label: str, db, db_path: str, repeat: int) -> None:
+    db.execute(text("VACUUM"))
+    size_mb = os.path.getsize(db_path) / 1e6
+    queries = {
+        "latest page": lambda: AILogsRepository.list(db, limit=100),
+        "client page": lambda: AILogsRepository.list(db, limit=100, client_id="client-7"),
+        "cost by model": lambda: db.query(
+            AIRequest.recommended_model, func.count(), func.sum(AIRequest.estimated_cost)
+        ).group_by(AIRequest.recommended_model).all(),
+    }
+    rows = db.query(func.count(AIRequest.id)).scalar()
+    print(f"{label}: {rows} rows, {size_mb:.1f} MB")
+    for name, query in queries.items():
+        print(f"  {name:>14}: {_time(query, repeat):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--retention-days", type=int, default=90)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "retention.db")
+        archive_dir = os.path.join(tmp, "archive")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        _fill(db, args.rows, now, args.clients)
+        _report("before", db, db_path, args.repeat)
+
+        start = time.perf_counter()
+        report = archive_requests(db, older_than_days=args.retention_days, root=archive_dir, now=now)
+        elapsed = time.perf_counter() - start
+        print(f"archived {report['rows']} rows into {report['segments']} segments in {elapsed:.1f}s")
+
+        _report("after", db, db_path, args.repeat)
+
+        archive_mb = sum(f.stat().st_size for f in Path(archive_dir).rglob("*") if f.is_file()) / 1e6
+        print(f"archive: {archive_mb:.1f} MB")
+        for label, columns in (("all columns", None), ("cost columns", ["recommended_model", "estimated_cost"])):
+            ms = _time(lambda: sum(1 for _ in scan(columns=columns, root=archive_dir)), 3)
+            print(f"  scan {label:>12}: {ms:8.1f}ms")
+        ms = _time(lambda: sum(1 for _ in scan(columns=["prompt"], client_id="client-7", root=archive_dir)), 3)
+        print(f"  scan {'one client':>12}: {ms:8.1f}ms")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Upstream calls, log rows and latency per typed prompt: /ai/analyze-prompt on
+every debounced edit vs /ai/analyze-draft.
+
+Each prompt is "typed" as a revision every --chars-per-revision characters
+and then submitted. Groq is a stand-in with --upstream-ms latency. The
+local classifier is never confident (--min-confidence), so every upstream-
+eligible request really goes upstream; this is the worst case for both.
+
+    python benchmarks/bench_typing.py --prompts 50 --chars-per-revision 4 --upstream-ms 300
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ANALYSIS = (
+    '{"main": {"name": "Claude Sonnet 4.5", "provider": "Anthropic", "reasoning": "r", "input_price": 3.0,'
+    ' "output_price": 15.0, "speed": "Fast", "categories": ["text"]},'
+    ' "alternative": {"name": "GPT-4o", "provider": "OpenAI", "reasoning": "r", "input_price": 2.5,'
+    ' "output_price": 10.0, "speed": "Fast", "categories": ["text"]}}'
+)
+PROMPTS = [
+    "write a python function that summarizes a long article",
+    "generate a photorealistic image of a lighthouse at dusk",
+    "compare postgres and mysql for an analytics workload and recommend one",
+    "make a 30 second product video for a coffee brand",
+    "design a database schema for a multi-tenant invoicing system",
+]
+
+
+class SyntheticGroq:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANALYSIS))])
+
+
+def _revisions(prompt: str, step: int):
+    return [prompt[:end] for end in range(step, len(prompt), step)] + [prompt]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=50, help="Prompts to type")
+    parser.add_argument("--chars-per-revision", type=int, default=4, help="Characters typed between debounced calls")
+    parser.add_argument("--upstream-ms", type=float, default=300, help="Stand-in Groq latency")
+    parser.add_argument("--min-confidence", type=float, default=1.01, help="LOCAL_CLASSIFIER_MIN_CONFIDENCE")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/bench.db"
+    os.environ["ENABLE_METRICS"] = "False"
+    os.environ["DEBUG"] = "False"
+
+    from fastapi.testclient import TestClient
+    from app.config.settings import settings
+    from app.main import app
+    from app.models import ai_request, feedback, user  # noqa: F401 - register tables
+    from app.models.ai_request import AIRequest
+    from app.models.base import Base, SessionLocal, engine
+    from app.services.providers import providers
+
+    Base.metadata.create_all(bind=engine)
+    settings.GROQ_API_KEY = "synthetic"
+    settings.PERPLEXITY_API_KEY = ""
+    settings.LOCAL_CLASSIFIER_MIN_CONFIDENCE = args.min_confidence
+    groq = SyntheticGroq(args.upstream_ms)
+    providers._clients["groq"] = groq
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+
+    def rows() -> int:
+        with SessionLocal() as db:
+            return db.query(AIRequest).count()
+
+    with TestClient(app) as client:
+        for name in ("analyze-prompt", "analyze-draft"):
+            calls_before, rows_before = groq.calls, rows()
+            partial_ms, final_ms, revisions = [], [], 0
+            for i, prompt in enumerate(prompts):
+                texts = _revisions(prompt, args.chars_per_revision)
+                revisions += len(texts)
+                for revision, text in enumerate(texts, 1):
+                    final = revision == len(texts)
+                    if name == "analyze-prompt":
+                        body = {"prompt": text}
+                    else:
+                        body = {"session_id": f"s{i}", "revision": revision, "prompt": text, "final": final}
+                    start = time.perf_counter()
+                    client.post(f"/api/v1/ai/{name}", json=body).raise_for_status()
+                    (final_ms if final else partial_ms).append((time.perf_counter() - start) * 1000)
+
+            calls, logged = groq.calls - calls_before, rows() - rows_before
+            print(
+                f"{name:>15}: {revisions / len(prompts):5.1f} revisions/prompt  "
+                f"upstream calls/prompt {calls / len(prompts):5.1f}  log rows/prompt {logged / len(prompts):5.1f}  "
+                f"partial p50 {statistics.median(partial_ms):7.2f}ms  final p50 {statistics.median(final_ms):7.2f}ms"
+            )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
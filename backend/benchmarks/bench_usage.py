@@ -0,0 +1,93 @@
+"""
+Dashboard polling of /ai/usage: full responses vs 304 revalidation vs the
+server-side response cache, and bytes on the wire with and without gzip.
+
+Fills a throwaway SQLite database with --rows requests spread over
+--clients clients and polls one client's first page.
+
+    python benchmarks/bench_usage.py --rows 100000 --polls 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = "please write explain the a python video image essay code function data model design compare".split()
+
+
+def _timed(client, polls: int, **kwargs):
+    latencies = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        response = client.get("/api/v1/ai/usage", **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Logged requests")
+    parser.add_argument("--clients", type=int, default=50, help="Distinct client ids")
+    parser.add_argument("--polls", type=int, default=500, help="Requests per scenario")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/bench.db"
+    os.environ["ENABLE_METRICS"] = "False"
+    os.environ["DEBUG"] = "False"
+
+    from fastapi.testclient import TestClient
+    from app.api.v1 import ai
+    from app.core.cache import TTLCache
+    from app.main import app
+    from app.models import feedback, user  # noqa: F401 - register tables
+    from app.models.ai_request import AIRequest
+    from app.models.base import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        db.execute(AIRequest.__table__.insert(), [
+            {
+                "prompt": " ".join(rng.choices(WORDS, k=rng.randint(8, 60))),
+                "recommended_model": "Claude Sonnet 4.5",
+                "provider": "Anthropic",
+                "reasoning": " ".join(rng.choices(WORDS, k=40)),
+                "client_id": f"client-{rng.randrange(args.clients)}",
+                "response_time_ms": rng.uniform(5, 900),
+                "estimated_cost": rng.uniform(0, 0.01),
+                "request_metadata": {"source": "classifier"}
+            }
+            for _ in range(args.rows)
+        ])
+        db.commit()
+
+    params = {"client_id": "client-0"}
+    identity = {"Accept-Encoding": "identity"}
+    with TestClient(app) as client:
+        cache = ai._usage_cache
+        ai._usage_cache = TTLCache(1, 0)
+        full, response = _timed(client, args.polls, params=params, headers=identity)
+        plain_bytes = len(response.content)
+        etag = response.headers["etag"]
+        revalidated, _ = _timed(client, args.polls, params=params, headers={**identity, "If-None-Match": etag})
+
+        ai._usage_cache = cache
+        cached, _ = _timed(client, args.polls, params=params, headers=identity)
+        response = client.get("/api/v1/ai/usage", params=params, headers={"Accept-Encoding": "gzip"})
+        gzip_bytes = int(response.headers.get("content-length", 0))
+
+    for name, latencies in (("full", full), ("304", revalidated), ("cache hit", cached)):
+        print(f"{name:>10}: p50 {statistics.median(latencies):7.2f}ms  max {max(latencies):7.2f}ms")
+    print(f"page size: {plain_bytes / 1024:.1f} KiB identity, {gzip_bytes / 1024:.1f} KiB gzip")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput scaling of the production server from 1 to N worker processes.
+
+For each worker count, starts `run_backend.py --workers n` (gunicorn master
+with uvicorn workers) against a throwaway database, drives it with
+closed-loop HTTP clients running in separate processes, and reports
+requests/second and scaling efficiency relative to one worker.
+
+Provider API keys are blanked so requests exercise only our own code path
+(local recommender + request log write), not upstream latency.
+
+    python benchmarks/bench_workers.py --max-workers 8 --duration 10
+    python benchmarks/bench_workers.py --database-url postgresql://... --path /api/v1/health
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _client_loop(args) -> int:
+    base_url, path, duration = args
+    completed = 0
+    deadline = time.perf_counter() + duration
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while time.perf_counter() < deadline:
+            if path.endswith("analyze-prompt"):
+                response = client.post(path, json={"prompt": "write a python script to parse logs"})
+            else:
+                response = client.get(path)
+            if response.status_code < 400:
+                completed += 1
+    return completed
+
+
+def _wait_until_up(base_url: str, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/v1/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not come up")
+
+
+def run(workers: int, args, database_url: str) -> float:
+    port = args.port
+    env = dict(os.environ)
+    env.update({
+        "ENVIRONMENT": "production",
+        "DEBUG": "False",
+        "PORT": str(port),
+        "DATABASE_URL": database_url,
+        "GROQ_API_KEY": "",
+        "PERPLEXITY_API_KEY": "",
+        "GOOGLE_API_KEY": "",
+    })
+    server = subprocess.Popen(
+        [sys.executable, "run_backend.py", "--workers", str(workers)],
+        cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(base_url)
+        # Let every worker finish booting before measuring
+        time.sleep(1)
+        with multiprocessing.Pool(args.clients) as pool:
+            counts = pool.map(_client_loop, [(base_url, args.path, args.duration)] * args.clients)
+        return sum(counts) / args.duration
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--clients", type=int, default=max(4, 2 * multiprocessing.cpu_count()))
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--path", default="/api/v1/ai/analyze-prompt")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    worker_counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < args.max_workers], args.max_workers})
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'efficiency':>10}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            database_url = args.database_url or f"sqlite:///{Path(tmp) / f'bench_{workers}.db'}"
+            throughput = run(workers, args, database_url)
+            baseline = baseline or throughput
+            speedup = throughput / baseline
+            print(f"{workers:>8} {throughput:>10.1f} {speedup:>7.2f}x {speedup / workers:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Gunicorn configuration for the production server.
+
+The app is preloaded in the master so immutable state (the compiled
+recommendation catalog, persona prompts) is built once and shared with
+workers copy-on-write. Anything holding sockets - the DB pool and provider
+clients - is reset after fork so every worker opens its own.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+import gc
+import os
+from pathlib import Path
+from uvicorn.workers import UvicornWorker
+from app.config.settings import settings
+from app.core.body_limit import ws_max_size
+from app.core.cpu import default_workers
+
+
+class OasisUvicornWorker(UvicornWorker):
+    """UvicornWorker refusing WebSocket frames over MAX_REQUEST_BODY_BYTES before buffering them"""
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "ws_max_size": ws_max_size()}
+
+
+chdir = str(Path(__file__).resolve().parent)
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+# Without WEB_CONCURRENCY: 2 * the container's CPU quota + 1, capped
+workers = settings.WEB_CONCURRENCY or default_workers(settings.WEB_CONCURRENCY_MAX)
+worker_class = OasisUvicornWorker
+preload_app = True
+timeout = settings.WORKER_TIMEOUT_SECONDS
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    """Runs once in the master, after the app is preloaded and before forking"""
+    from app.config.logging import logger
+    from app.core.migrations import run_migrations
+    from app.services.catalog import get_catalog
+    from app.services.prompt_classifier import get_prompt_classifier
+
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+
+    catalog = get_catalog()
+    logger.info(f"Preloaded recommendation catalog ({len(catalog.categories)} categories)")
+    get_prompt_classifier()
+
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in workers don't touch (and un-share) the preloaded pages
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's samples from multiprocess Prometheus metrics"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork"""
+    from app.core.admission import admission
+    from app.models.base import engine
+    from app.services.providers import providers
+
+    # Never reuse connections inherited from the master
+    engine.dispose(close=False)
+    providers.reset()
+    # Concurrency limits are per worker; start with empty queues
+    admission.reset()
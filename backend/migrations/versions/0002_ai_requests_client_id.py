@@ -0,0 +1,29 @@
+"""Add ai_requests.client_id
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("ai_requests") as batch_op:
+        batch_op.add_column(sa.Column("client_id", sa.String(), nullable=True))
+        batch_op.create_index("ix_ai_requests_client_id", ["client_id"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("ai_requests") as batch_op:
+        batch_op.drop_index("ix_ai_requests_client_id")
+        batch_op.drop_column("client_id")
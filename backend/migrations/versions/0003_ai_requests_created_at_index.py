@@ -0,0 +1,26 @@
+"""Index ai_requests.created_at
+
+Usage listings sort by it and the retention job selects expired rows by it.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ai_requests_created_at", "ai_requests", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_requests_created_at", table_name="ai_requests")
@@ -0,0 +1,27 @@
+"""Index ai_requests (client_id, id)
+
+The usage endpoints derive their ETag from max(id) per client; with this
+index that is a single index lookup.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ai_requests_client_id_id", "ai_requests", ["client_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_requests_client_id_id", table_name="ai_requests")
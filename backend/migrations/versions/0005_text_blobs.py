@@ -0,0 +1,74 @@
+"""Store prompts and reasonings once in text_blobs
+
+ai_requests references them by SHA-256 digest (prompt_hash,
+reasoning_hash). The inline columns stay, nullable, for the downgrade and
+for rows inserted without going through AILogsRepository.
+
+Existing rows are not rewritten here: that would hold this revision's
+lock on ai_requests for the whole table. run_migrations() backfills them
+after the schema change is committed, one transaction per chunk, and on
+every later run until none are left (see
+app.core.migrations.backfill_text_blobs). Until then they are read from
+the inline columns.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+text_blobs = sa.table("text_blobs", sa.column("id", sa.LargeBinary), sa.column("content", sa.Text))
+ai_requests = sa.table(
+    "ai_requests",
+    sa.column("prompt", sa.Text),
+    sa.column("reasoning", sa.Text),
+    sa.column("prompt_hash", sa.LargeBinary),
+    sa.column("reasoning_hash", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "text_blobs",
+        sa.Column("id", sa.LargeBinary(32), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("ai_requests") as batch_op:
+        batch_op.alter_column("prompt", existing_type=sa.Text(), nullable=True)
+        batch_op.add_column(sa.Column("prompt_hash", sa.LargeBinary(32), nullable=True))
+        batch_op.add_column(sa.Column("reasoning_hash", sa.LargeBinary(32), nullable=True))
+        batch_op.create_foreign_key("fk_ai_requests_prompt_hash", "text_blobs", ["prompt_hash"], ["id"])
+        batch_op.create_foreign_key("fk_ai_requests_reasoning_hash", "text_blobs", ["reasoning_hash"], ["id"])
+
+
+def downgrade() -> None:
+    for column, hash_column in (("prompt", "prompt_hash"), ("reasoning", "reasoning_hash")):
+        content = (
+            sa.select(text_blobs.c.content)
+            .where(text_blobs.c.id == ai_requests.c[hash_column])
+            .scalar_subquery()
+        )
+        op.execute(
+            ai_requests.update()
+            .where(ai_requests.c[hash_column].is_not(None))
+            .values({column: content})
+        )
+
+    with op.batch_alter_table("ai_requests") as batch_op:
+        batch_op.drop_constraint("fk_ai_requests_reasoning_hash", type_="foreignkey")
+        batch_op.drop_constraint("fk_ai_requests_prompt_hash", type_="foreignkey")
+        batch_op.drop_column("reasoning_hash")
+        batch_op.drop_column("prompt_hash")
+        batch_op.alter_column("prompt", existing_type=sa.Text(), nullable=False)
+    op.drop_table("text_blobs")
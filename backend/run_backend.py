@@ -1,8 +1,57 @@
-import uvicorn
+import argparse
 import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def serve_development(port: int):
+    """Single uvicorn process with auto-reload"""
+    import uvicorn
+    from app.config.settings import settings
+    from app.core.body_limit import ws_max_size
+    from app.core.migrations import run_migrations
+
+    # Migrate once here, before uvicorn starts, so workers boot without DDL
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+
+    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True, ws_max_size=ws_max_size())
+
+
+def serve_production(port: int, workers: int = None):
+    """Gunicorn master with N uvicorn workers (see gunicorn.conf.py)"""
+    from gunicorn.app.wsgiapp import run
+
+    sys.argv = [
+        "gunicorn",
+        "--config", str(BACKEND_DIR / "gunicorn.conf.py"),
+        "--bind", f"0.0.0.0:{port}",
+    ]
+    if workers:
+        sys.argv += ["--workers", str(workers)]
+    sys.argv.append("app.main:app")
+    run()
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Oasis backend launcher")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "migrate"])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes in production (default: WEB_CONCURRENCY, else "
+                             "2 x the container's CPU quota + 1, at most WEB_CONCURRENCY_MAX)")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        from app.core.migrations import run_migrations
+        run_migrations()
+        sys.exit(0)
+
     port = int(os.getenv("PORT", 8000))
     # Disable reload in production, force 0.0.0.0 for public access
     is_dev = os.getenv("ENVIRONMENT", "development") == "development"
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=is_dev)
+    if is_dev:
+        serve_development(port)
+    else:
+        serve_production(port, args.workers)
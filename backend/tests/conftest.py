@@ -0,0 +1,96 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.base import Base, get_db, get_session_factory
+from app.models import user, ai_request, feedback  # Import to register models
+
+# Groq's answer to every analysis prompt in FakeGroq
+ANALYSIS = (
+    '{"main": {"name": "Claude Sonnet 4.5", "provider": "Anthropic", "reasoning": "r", "input_price": 3.0,'
+    ' "output_price": 15.0, "speed": "Fast", "categories": ["text"]},'
+    ' "alternative": {"name": "GPT-4o", "provider": "OpenAI", "reasoning": "r", "input_price": 2.5,'
+    ' "output_price": 10.0, "speed": "Fast", "categories": ["text"]}}'
+)
+
+
+class FakeGroq:
+    """Groq client answering ANALYSIS; with `release` set, each call waits for it"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+        self.started = threading.Event()
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANALYSIS))])
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Session factory bound to a throwaway SQLite database with the current schema"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """FakeGroq as the only configured provider; the local classifier never answers"""
+    from app.config.settings import settings
+    from app.services.providers import providers
+
+    groq = FakeGroq()
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "PERPLEXITY_API_KEY", "")
+    # Never confident, so analyses go upstream
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_MIN_CONFIDENCE", 1.01)
+    monkeypatch.setitem(providers._clients, "groq", groq)
+    return groq
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    """TestClient for the app with get_db pointed at the throwaway database"""
+    from app.api.v1.ai import _usage_cache
+    from app.core.readiness import readiness
+    from app.main import app
+
+    # The startup warm-up checks the throwaway database too
+    monkeypatch.setattr(readiness, "engine", session_factory.kw["bind"])
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    # Cached /usage pages belong to another test's database
+    _usage_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,196 @@
+import threading
+import time
+
+import pytest
+
+from app.config.settings import settings
+from app.core.admission import AdmissionRejected, Priority, ProviderGate, admission, deadline_in
+from app.services.providers import providers
+
+
+def _wait_for_queue(gate, depth):
+    for _ in range(200):
+        if gate.queue_depth == depth:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"queue depth {gate.queue_depth}, expected {depth}")
+
+
+def test_full_queue_fails_fast_with_retry_after():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=0)
+    gate.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        gate.acquire()
+
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+    gate.release()
+    gate.acquire()
+
+
+def test_request_that_cannot_meet_deadline_is_shed():
+    gate = ProviderGate("test", max_concurrency=2, max_queue=4, initial_service_ms=500)
+    gate.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        gate.acquire(deadline=deadline_in(100))
+
+    assert rejected.value.reason == "deadline"
+    assert gate.in_flight == 1
+
+
+def test_gate_recovers_after_slow_calls():
+    gate = ProviderGate("test", max_concurrency=4, max_queue=4, initial_service_ms=9500)
+
+    # Nothing in flight: admitted as a probe despite the inflated estimate
+    with gate.admit(deadline=deadline_in(8000)):
+        with pytest.raises(AdmissionRejected):
+            gate.acquire(deadline=deadline_in(8000))
+    for _ in range(20):
+        with gate.admit(deadline=deadline_in(8000)):
+            pass
+
+    assert gate.service_ms < 100
+    with gate.admit(deadline=deadline_in(8000)):
+        with gate.admit(deadline=deadline_in(8000)):
+            assert gate.in_flight == 2
+
+
+def test_failed_calls_do_not_count_as_service_time():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=4, initial_service_ms=100)
+
+    with pytest.raises(TimeoutError):
+        with gate.admit():
+            time.sleep(0.05)
+            raise TimeoutError()
+
+    assert gate.service_ms == 100
+    assert gate.in_flight == 0
+
+
+def test_waiter_is_shed_when_deadline_passes():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=4, initial_service_ms=10)
+    gate.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        gate.acquire(deadline=deadline_in(60))
+
+    assert rejected.value.reason == "deadline"
+    assert gate.queue_depth == 0
+
+
+def test_queued_waiter_gives_up_slot_when_cancelled():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=4)
+    gate.acquire()
+    cancel = threading.Event()
+    outcome = []
+
+    def wait():
+        try:
+            gate.acquire(cancel=cancel)
+        except AdmissionRejected as e:
+            outcome.append(e.reason)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    _wait_for_queue(gate, 1)
+    cancel.set()
+    waiter.join(1)
+
+    assert outcome == ["cancelled"]
+    assert gate.queue_depth == 0
+    assert gate.in_flight == 1
+
+
+def test_interactive_requests_are_admitted_before_batch():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=4)
+    gate.acquire()
+    order = []
+
+    def worker(priority, name):
+        with gate.admit(priority):
+            order.append(name)
+
+    batch = threading.Thread(target=worker, args=(Priority.BATCH, "batch"))
+    batch.start()
+    _wait_for_queue(gate, 1)
+    interactive = threading.Thread(target=worker, args=(Priority.INTERACTIVE, "interactive"))
+    interactive.start()
+    _wait_for_queue(gate, 2)
+
+    gate.release()
+    batch.join(1)
+    interactive.join(1)
+
+    assert order == ["interactive", "batch"]
+
+
+def test_higher_priority_preempts_queued_batch_request():
+    gate = ProviderGate("test", max_concurrency=1, max_queue=1)
+    gate.acquire()
+    outcome = {}
+
+    def batch():
+        try:
+            gate.acquire(Priority.BATCH)
+        except AdmissionRejected as e:
+            outcome["batch"] = e.reason
+
+    thread = threading.Thread(target=batch)
+    thread.start()
+    _wait_for_queue(gate, 1)
+
+    waiter = threading.Thread(target=lambda: gate.acquire(Priority.INTERACTIVE))
+    waiter.start()
+    thread.join(1)
+
+    assert outcome == {"batch": "preempted"}
+    gate.release()
+    waiter.join(1)
+    assert gate.in_flight == 1
+
+
+def test_chat_returns_503_when_groq_is_saturated(client, monkeypatch):
+    gate = ProviderGate("groq", max_concurrency=1, max_queue=0)
+    gate.acquire()
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setitem(providers._clients, "groq", object())
+    monkeypatch.setitem(admission._gates, "groq", gate)
+
+    response = client.post("/api/v1/ai/chat", json={"message": "hello", "model_name": "Claude Sonnet 4.5"})
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_overflow_beyond_default_threadpool_is_shed_fast(client, fake_groq, monkeypatch):
+    # Default limits: 8 in flight + 32 queued fill anyio's default 40 threads
+    gate = ProviderGate("groq", settings.UPSTREAM_MAX_CONCURRENCY, settings.UPSTREAM_MAX_QUEUE)
+    monkeypatch.setitem(admission._gates, "groq", gate)
+    fake_groq.release = threading.Event()
+    capacity = gate.max_concurrency + gate.max_queue
+    statuses = []
+
+    def chat():
+        response = client.post("/api/v1/ai/chat", json={"message": "hello", "model_name": "Claude Sonnet 4.5"})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=chat) for _ in range(capacity + 10)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(400):
+            if len(statuses) == 10:
+                break
+            time.sleep(0.005)
+        # Shed while the admitted calls are still blocked upstream
+        assert statuses == [503] * 10
+        assert gate.in_flight == gate.max_concurrency
+        assert gate.queue_depth == gate.max_queue
+    finally:
+        fake_groq.release.set()
+        for thread in threads:
+            thread.join(10)
+
+    assert statuses.count(200) == capacity
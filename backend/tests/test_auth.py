@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.api.deps import get_current_user
+from app.core.auth_cache import principal_cache
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture
+def user(db):
+    principal_cache.clear()
+    user = User(email="ada@example.com", username="ada", hashed_password="x", is_active=True)
+    db.add(user)
+    db.commit()
+    yield user
+    principal_cache.clear()
+
+
+def _credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    token = create_access_token({"sub": str(user_id)})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_verified_token_is_served_from_cache(db, user):
+    credentials = _credentials(user.id)
+
+    first = get_current_user(credentials, db)
+    # A cache hit must not touch the database at all
+    second = get_current_user(credentials, db=None)
+
+    assert first == second
+    assert second.username == "ada"
+
+
+def test_deactivating_user_invalidates_cached_tokens(db, user):
+    credentials = _credentials(user.id)
+    get_current_user(credentials, db)
+
+    user.is_active = False
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(credentials, db)
+    assert exc_info.value.status_code == 401
+
+
+def test_principal_fetched_between_flush_and_commit_is_not_kept(db, user, session_factory):
+    credentials = _credentials(user.id)
+    get_current_user(credentials, db)
+
+    user.is_active = False
+    db.flush()
+    # A concurrent request still sees the committed, active row
+    other = session_factory()
+    assert get_current_user(credentials, other).is_active
+    other.close()
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(credentials, db)
+    assert exc_info.value.status_code == 401
+
+
+def test_invalid_token_is_rejected(db):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-jwt")
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(credentials, db)
+    assert exc_info.value.status_code == 401
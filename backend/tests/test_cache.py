@@ -0,0 +1,33 @@
+import time
+from app.core.cache import TTLCache
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_invalidate_where_removes_matching_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.invalidate_where(lambda key, value: value == 2) == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
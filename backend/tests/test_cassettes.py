@@ -0,0 +1,123 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import settings
+from app.services.cassettes import Cassette, CassetteGroq, CassetteMiss, CassetteSession, request_key, to_namespace
+from app.services.providers import providers
+
+
+class FakeCompletion:
+    def __init__(self, text):
+        self.text = text
+        self.__dict__.update(vars(to_namespace(self.model_dump())))
+
+    def model_dump(self, mode="python"):
+        return {
+            "choices": [{"message": {"role": "assistant", "content": self.text}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}
+        }
+
+
+class FakeGroq:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if kwargs.get("stream"):
+            return iter([SimpleNamespace(model_dump=lambda mode="python", t=t: {"text": t}) for t in ("a", "b")])
+        return FakeCompletion(f"reply {self.calls}")
+
+
+def test_request_key_ignores_whitespace_and_transport_args():
+    a = {"model": "m", "messages": [{"role": "user", "content": "hello   world\n"}], "timeout": 5}
+    b = {"messages": [{"content": "hello world", "role": "user"}], "model": "m"}
+    assert request_key(a) == request_key(b)
+    assert request_key(a) != request_key({**b, "model": "other"})
+
+
+def test_record_then_replay_without_client(tmp_path):
+    cassette_path = str(tmp_path / "groq.jsonl")
+    recorder = CassetteGroq(Cassette(cassette_path), FakeGroq())
+    recorder.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+    recorder.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+
+    replay = CassetteGroq(Cassette(cassette_path))
+    first = replay.chat.completions.create(model="m", messages=[{"role": "user", "content": " hi "}])
+    second = replay.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+    third = replay.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+
+    # Identical requests cycle through their recordings
+    assert first.choices[0].message.content == "reply 1"
+    assert second.choices[0].message.content == "reply 2"
+    assert third.choices[0].message.content == "reply 1"
+    assert first.usage.completion_tokens == 7
+
+    with pytest.raises(CassetteMiss):
+        replay.chat.completions.create(model="m", messages=[{"role": "user", "content": "unseen"}])
+
+
+def test_replay_latency_scale(tmp_path, monkeypatch):
+    cassette_path = str(tmp_path / "groq.jsonl")
+    recorder = CassetteGroq(Cassette(cassette_path), FakeGroq(delay=0.1))
+    recorder.chat.completions.create(model="m", messages=[])
+    replay = CassetteGroq(Cassette(cassette_path))
+
+    def timed_call():
+        start = time.perf_counter()
+        replay.chat.completions.create(model="m", messages=[])
+        return time.perf_counter() - start
+
+    monkeypatch.setattr(settings, "REPLAY_LATENCY_SCALE", 1.0)
+    assert timed_call() >= 0.09
+    monkeypatch.setattr(settings, "REPLAY_LATENCY_SCALE", 0.0)
+    assert timed_call() < 0.05
+
+
+def test_streams_replay_chunks(tmp_path):
+    cassette_path = str(tmp_path / "groq.jsonl")
+    recorder = CassetteGroq(Cassette(cassette_path), FakeGroq())
+    assert len(list(recorder.chat.completions.create(model="m", messages=[], stream=True))) == 2
+
+    stream = CassetteGroq(Cassette(cassette_path)).chat.completions.create(model="m", messages=[], stream=True)
+    assert [chunk.text for chunk in stream] == ["a", "b"]
+
+
+def test_session_replays_status_and_body(tmp_path):
+    cassette_path = str(tmp_path / "perplexity.jsonl")
+    real = SimpleNamespace(post=lambda url, json=None, **kwargs: SimpleNamespace(
+        status_code=429, json=lambda: {"error": "rate limited"}
+    ))
+    CassetteSession(Cassette(cassette_path), real).post("https://api.example/chat", json={"q": 1}, timeout=10)
+
+    response = CassetteSession(Cassette(cassette_path)).post("https://api.example/chat", json={"q": 1})
+    assert response.status_code == 429
+    assert response.json() == {"error": "rate limited"}
+    with pytest.raises(Exception):
+        response.raise_for_status()
+
+
+def test_chat_endpoint_replays_recording_without_key(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_CASSETTE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "REPLAY_LATENCY_SCALE", 0.0)
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "PROVIDER_MODE", "record")
+    monkeypatch.setattr(providers, "_factories", {**providers._factories, "groq": FakeGroq})
+    providers.reset()
+    try:
+        recorded = client.post("/api/v1/ai/chat", json={"message": "hello there", "model_name": "Oasis"}).json()
+
+        monkeypatch.setattr(settings, "GROQ_API_KEY", "")
+        monkeypatch.setattr(settings, "PROVIDER_MODE", "replay")
+        providers.reset()
+        replayed = client.post("/api/v1/ai/chat", json={"message": "hello there", "model_name": "Oasis"}).json()
+    finally:
+        providers.reset()
+
+    assert recorded["response"] == "reply 1"
+    assert replayed["response"] == "reply 1"
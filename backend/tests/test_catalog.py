@@ -0,0 +1,34 @@
+from app.services.catalog import get_catalog, RecommendationCatalog
+from app.services.ai_service import AIService
+
+
+def test_catalog_is_loaded_once():
+    assert get_catalog() is get_catalog()
+
+
+def test_best_match_uses_keyword_boundaries():
+    catalog = get_catalog()
+
+    assert catalog.best_match("Make a cinematic VIDEO of a sunset").id == "video"
+    assert catalog.best_match("videogames") is None
+
+
+def test_best_match_prefers_most_keyword_hits_over_file_order():
+    catalog = get_catalog()
+
+    # "video" comes first in the data file but coding has more hits
+    assert catalog.best_match("video about python code to debug my javascript").id == "coding"
+
+
+def test_missing_catalog_file_falls_back_to_default(tmp_path):
+    catalog = RecommendationCatalog.load(str(tmp_path / "missing.json"))
+
+    assert catalog.categories == []
+    assert catalog.best_match("make a video") is None
+
+
+def test_local_recommendation_without_match_uses_default():
+    result = AIService.get_ai_recommendation("zzzz qqqq")
+
+    assert result["recommendation"].name == "GPT-4o"
+    assert result["alternative"].name == "Claude 3.5 Sonnet"
@@ -0,0 +1,160 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.config.settings import settings
+from app.core.admission import AdmissionController, ProviderGate
+from app.models.ai_request import AIRequest
+from app.services.ai_service import AIService
+from app.services.chat_sessions import ChatSession, InMemorySessionStore, SessionManager
+from app.services.providers import providers
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text is not None else []
+    return SimpleNamespace(choices=choices, x_groq=SimpleNamespace(usage=usage) if usage else None)
+
+
+class FakeStream:
+    def __init__(self, tokens, release=None):
+        self.tokens = tokens
+        self.release = release
+        self.closed = False
+
+    def __iter__(self):
+        for i, token in enumerate(self.tokens):
+            if self.release is not None and i == 1:
+                # Hold the stream after the first token until the test lets go
+                self.release.wait(5)
+            yield _chunk(token)
+        yield _chunk(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=len(self.tokens), total_tokens=20))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeGroq:
+    def __init__(self, tokens, release=None):
+        self.tokens = tokens
+        self.release = release
+        self.calls = []
+        self.streams = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        stream = FakeStream(self.tokens, self.release)
+        self.streams.append(stream)
+        return stream
+
+
+def _setup(monkeypatch, groq):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setitem(providers._clients, "groq", groq)
+    monkeypatch.setattr("app.api.v1.chat_ws.chat_sessions", SessionManager(InMemorySessionStore(100, 60)))
+
+
+def _receive_until_done(ws):
+    events = []
+    while True:
+        event = ws.receive_json()
+        events.append(event)
+        if event["type"] == "done":
+            return events
+
+
+def test_session_context_is_bounded_by_tokens():
+    session = ChatSession("s", max_tokens=50)
+    for i in range(20):
+        session.append("user", f"message number {i} " * 3)
+
+    assert session.tokens <= 50
+    assert session.context()[-1]["content"].startswith("message number 19")
+    assert len(session.turns) < 20
+
+
+def test_oversized_turn_keeps_its_end():
+    session = ChatSession("s", max_tokens=100)
+    session.append("user", "hello")
+    session.append("assistant", "x" * 500 + "y" * 1000)
+
+    assert [turn["role"] for turn in session.context()] == ["assistant"]
+    assert session.context()[0]["content"] == "y" * 396
+    assert session.tokens == 100
+
+
+def test_ws_streams_tokens_and_keeps_context(client, db, monkeypatch):
+    groq = FakeGroq(["Hel", "lo", "!"])
+    _setup(monkeypatch, groq)
+
+    with client.websocket_connect("/api/v1/ai/chat/ws?client_id=c1") as ws:
+        session_id = ws.receive_json()["session_id"]
+        ws.send_json({"type": "message", "content": "hi there", "model_name": "Oasis"})
+        events = _receive_until_done(ws)
+
+        assert "".join(e["content"] for e in events if e["type"] == "token") == "Hello!"
+        done = events[-1]
+        assert done["cancelled"] is False
+        assert done["usage"]["completion_tokens"] == 3
+
+        ws.send_json({"type": "message", "content": "and again"})
+        _receive_until_done(ws)
+
+    second_call = groq.calls[1]["messages"]
+    assert [m["role"] for m in second_call] == ["system", "user", "assistant", "user"]
+    assert second_call[2]["content"] == "Hello!"
+    assert groq.calls[0]["stream"] is True
+    assert db.get(AIRequest, done["request_id"]).client_id == "c1"
+
+    # Reconnecting with the session id resumes the context
+    with client.websocket_connect(f"/api/v1/ai/chat/ws?client_id=c1&session_id={session_id}") as ws:
+        assert ws.receive_json()["turns"] == 4
+
+
+def test_ws_malformed_frames_get_an_error_and_keep_the_socket(client, monkeypatch):
+    _setup(monkeypatch, FakeGroq(["ok"]))
+
+    with client.websocket_connect("/api/v1/ai/chat/ws") as ws:
+        ws.receive_json()
+        for frame in ("not json", "[1, 2]"):
+            ws.send_text(frame)
+            error = ws.receive_json()
+            assert error["type"] == "error" and error["status"] == 422
+
+        ws.send_json({"type": "message", "content": "still there?"})
+        assert _receive_until_done(ws)[-1]["type"] == "done"
+
+
+def test_ws_cancel_stops_generation(client, monkeypatch):
+    release = threading.Event()
+    groq = FakeGroq(["one ", "two ", "three"], release=release)
+    _setup(monkeypatch, groq)
+
+    with client.websocket_connect("/api/v1/ai/chat/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "message", "content": "count"})
+        assert ws.receive_json() == {"type": "token", "content": "one "}
+        ws.send_json({"type": "cancel"})
+        time.sleep(0.2)
+        release.set()
+        events = _receive_until_done(ws)
+
+    assert events[-1]["cancelled"] is True
+    assert [e["content"] for e in events if e["type"] == "token"] == []
+    assert groq.streams[0].closed is True
+
+
+def test_slow_readers_do_not_count_as_groq_service_time(monkeypatch):
+    _setup(monkeypatch, FakeGroq(["one ", "two ", "three"]))
+    controller = AdmissionController()
+    gate = controller._gates["groq"] = ProviderGate("groq", max_concurrency=1, max_queue=1, initial_service_ms=0)
+    monkeypatch.setattr("app.services.ai_service.admission", controller)
+
+    for event in AIService.stream_chat("count", "Oasis"):
+        # A client reading the reply slowly
+        time.sleep(0.1)
+
+    assert event["type"] == "done"
+    assert gate.in_flight == 0
+    # 0.2 x 300ms+ if the whole stream had counted
+    assert gate.service_ms < 20
@@ -0,0 +1,103 @@
+from app.services.context_monitor import ContextShiftDetector
+
+
+def _detector():
+    return ContextShiftDetector(decay=0.6, threshold=0.5, max_conversations=100, ttl_seconds=60)
+
+
+def test_single_mention_does_not_trigger_switch():
+    detector = _detector()
+
+    result = detector.observe("Claude Sonnet 4.5", message="can you make a video of this?", conversation_id="c1")
+
+    assert result == {"should_switch": False}
+
+
+def test_sustained_shift_suggests_category_model():
+    detector = _detector()
+    detector.observe("Claude Sonnet 4.5", message="help me debug this python code", conversation_id="c1")
+    detector.observe("Claude Sonnet 4.5", message="now make a cinematic video clip", conversation_id="c1")
+
+    result = detector.observe("Claude Sonnet 4.5", message="the video needs 4k footage", conversation_id="c1")
+
+    assert result["should_switch"] is True
+    assert result["category"] == "video"
+    assert result["suggested_model"] == "Veo 3.1"
+
+
+def test_no_switch_when_already_on_category_model():
+    detector = _detector()
+    for text in ("debug my python code", "refactor this javascript code", "fix the programming bug"):
+        result = detector.observe("Claude Sonnet 4.5", message=text, conversation_id="c1")
+
+    assert result == {"should_switch": False}
+
+
+def test_full_history_is_processed_incrementally():
+    detector = _detector()
+    history = [
+        {"role": "user", "content": "make a video"},
+        {"role": "ai", "content": "Sure, here is a video plan"},
+    ]
+    detector.observe("GPT-4o", messages=history, conversation_id="c1")
+    history.append({"role": "user", "content": "add cinematic footage to the video"})
+
+    result = detector.observe("GPT-4o", messages=history, conversation_id="c1")
+
+    assert result["should_switch"] is True
+    state = detector._conversations.get("c1")
+    assert state.seen == 3
+
+
+def test_trimmed_history_is_processed_incrementally():
+    detector = _detector()
+    history = [{"role": "user", "content": "make a video"}, {"role": "ai", "content": "Sure"}]
+    detector.observe("GPT-4o", messages=history, conversation_id="c1")
+    history.append({"role": "user", "content": "add cinematic footage to the video"})
+
+    # Only the newest two entries are sent along; the first was dropped
+    result = detector.observe("GPT-4o", messages=history[1:], conversation_id="c1", messages_offset=1)
+
+    assert result["should_switch"] is True
+    assert detector._conversations.get("c1").seen == 3
+
+
+def test_suggestion_is_not_repeated():
+    detector = _detector()
+    for text in ("make a video", "cinematic video footage"):
+        detector.observe("GPT-4o", message=text, conversation_id="c1")
+
+    result = detector.observe("GPT-4o", message="more video please", conversation_id="c1")
+
+    assert result == {"should_switch": False}
+
+
+def test_monitor_context_endpoint(client):
+    payload = {
+        "messages": [
+            {"role": "user", "content": "write python code"},
+            {"role": "user", "content": "debug this javascript code"},
+        ],
+        "current_model": "Veo 3.1",
+    }
+
+    response = client.post("/api/v1/ai/monitor-context", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["suggested_model"] == "Claude Sonnet 4.5"
+
+
+def test_conversation_state_is_scoped_to_the_client(client):
+    video = {"message": "make a cinematic video clip", "current_model": "GPT-4o", "conversation_id": "chat-1"}
+
+    assert client.post("/api/v1/ai/monitor-context", json=video).status_code == 422
+    results = [
+        client.post("/api/v1/ai/monitor-context", json={**video, "client_id": "a"}).json()["should_switch"]
+        for _ in range(3)
+    ]
+    assert any(results)
+
+    # The same conversation id from another client starts from scratch
+    other = client.post("/api/v1/ai/monitor-context", json={**video, "client_id": "b"})
+    assert other.status_code == 200
+    assert other.json()["should_switch"] is False
@@ -0,0 +1,27 @@
+from app.core.cpu import available_cpus, cgroup_cpu_quota, default_workers
+
+
+def test_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    assert cgroup_cpu_quota(str(tmp_path)) == 1.5
+    assert available_cpus(str(tmp_path)) == 2
+    assert default_workers(cap=8, root=str(tmp_path)) == 5
+    assert default_workers(cap=3, root=str(tmp_path)) == 3
+
+
+def test_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+    assert cgroup_cpu_quota(str(tmp_path)) == 0.5
+    assert default_workers(cap=8, root=str(tmp_path)) == 3
+
+
+def test_unlimited_cgroup_falls_back_to_affinity(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+
+    assert cgroup_cpu_quota(str(tmp_path)) is None
+    assert cgroup_cpu_quota(str(tmp_path / "missing")) is None
+    assert available_cpus(str(tmp_path)) >= 1
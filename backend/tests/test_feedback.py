@@ -0,0 +1,68 @@
+from sqlalchemy import event
+
+from app.models.ai_request import AIRequest
+from app.models.feedback import Feedback
+from app.repositories.feedback_repo import FeedbackRepository
+from app.services.feedback_ingest import FeedbackIngestor
+
+
+def _requests(db, count):
+    rows = [AIRequest(prompt=f"p{i}", recommended_model="m", provider="p") for i in range(count)]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def test_create_many_uses_one_lookup_and_one_insert(db):
+    request_ids = _requests(db, 3)
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        missing = FeedbackRepository.create_many(db, [
+            {"ai_request_id": request_ids[0], "rating": 5},
+            {"ai_request_id": 999999, "rating": 1},
+            {"ai_request_id": request_ids[2], "was_helpful": False},
+        ])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert missing == [1]
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 1
+    assert sum(s.lstrip().upper().startswith("INSERT") for s in statements) == 1
+    assert sorted(f.ai_request_id for f in db.query(Feedback)) == [request_ids[0], request_ids[2]]
+
+
+def test_batch_endpoint_reports_rejected_items(client, db):
+    request_ids = _requests(db, 2)
+
+    response = client.post("/api/v1/feedback/feedback/batch", json={"items": [
+        {"ai_request_id": request_ids[0], "rating": 4},
+        {"ai_request_id": 424242, "rating": 2},
+        {"ai_request_id": request_ids[1], "was_helpful": True},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert body["rejected"] == [{"index": 1, "ai_request_id": 424242, "detail": "AI request not found"}]
+    assert db.query(Feedback).count() == 2
+
+
+def test_background_ingestion_writes_in_bulk(client, db, session_factory, monkeypatch):
+    request_ids = _requests(db, 5)
+    ingestor = FeedbackIngestor(session_factory, max_queue=8, batch_size=100)
+    monkeypatch.setattr("app.api.v1.feedback.feedback_ingestor", ingestor)
+
+    items = [{"ai_request_id": request_id, "rating": 3} for request_id in request_ids] + [{"ai_request_id": 777}]
+    response = client.post("/api/v1/feedback/feedback/batch?background=true", json={"items": items})
+    assert response.status_code == 202
+    assert response.json()["queued"] == 6
+
+    # More than the queue can ever hold
+    full = client.post("/api/v1/feedback/feedback/batch?background=true", json={"items": items + items[:3]})
+    ingestor.stop()
+
+    assert full.status_code == 503
+    assert db.query(Feedback).count() == 5
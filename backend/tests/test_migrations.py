@@ -0,0 +1,73 @@
+from sqlalchemy import create_engine, inspect, text
+from app.core.migrations import run_migrations
+from app.models.base import Base
+
+
+def _schema(url: str) -> dict:
+    engine = create_engine(url)
+    try:
+        inspector = inspect(engine)
+        return {
+            table: {column["name"] for column in inspector.get_columns(table)}
+            for table in inspector.get_table_names()
+        }
+    finally:
+        engine.dispose()
+
+
+def _version(url: str) -> str:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_fresh_database_matches_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    run_migrations(url)
+
+    schema = _schema(url)
+    for table in Base.metadata.sorted_tables:
+        assert {column.name for column in table.columns} == schema[table.name]
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    url = f"sqlite:///{tmp_path / 'twice.db'}"
+
+    run_migrations(url)
+    head = _version(url)
+    run_migrations(url)
+
+    assert _version(url) == head
+
+
+def test_legacy_create_all_database_is_adopted(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        # Schema as created by the old import-time create_all, before client_id
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, "
+            "username VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL, "
+            "is_active BOOLEAN, is_superuser BOOLEAN, created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE ai_requests (id INTEGER PRIMARY KEY, user_id INTEGER, prompt TEXT NOT NULL, "
+            "recommended_model VARCHAR NOT NULL, provider VARCHAR NOT NULL, reasoning TEXT, "
+            "response_time_ms FLOAT, estimated_cost FLOAT, request_metadata JSON, created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO ai_requests (prompt, recommended_model, provider) VALUES ('hi', 'GPT-4o', 'OpenAI')"
+        ))
+    engine.dispose()
+
+    run_migrations(url)
+
+    assert "client_id" in _schema(url)["ai_requests"]
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM ai_requests")).scalar_one() == 1
+    engine.dispose()
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+from app.config.settings import settings
+from app.models.ai_request import AIRequest
+from app.services.model_router import ModelRouter, model_router
+from app.services.providers import providers
+
+CODE_QUESTION = (
+    "Why is this python function slow? Explain step by step and optimize it:\n"
+    "```\ndef total(xs):\n    return sum([x for x in xs])\n```"
+)
+
+
+def _router(**kwargs):
+    kwargs.setdefault("latency_sla_ms", 8000)
+    kwargs.setdefault("complexity_threshold", 0.35)
+    kwargs.setdefault("max_error_rate", 0.5)
+    return ModelRouter(**kwargs)
+
+
+def test_simple_message_goes_to_small_model_with_small_budget():
+    decision = _router().route("hi, what is 2+2?")
+
+    assert decision["model"] == "llama-3.1-8b-instant"
+    assert decision["reason"] == "preferred"
+    assert decision["max_tokens"] == 256
+
+
+def test_complex_message_goes_to_large_model():
+    decision = _router().route(CODE_QUESTION)
+
+    assert decision["model"] == "llama-3.3-70b-versatile"
+    assert decision["tier"] == "large"
+    assert decision["max_tokens"] == 2048
+
+
+def test_slow_large_model_falls_back_within_sla():
+    router = _router()
+    for _ in range(20):
+        router.record("llama-3.3-70b-versatile", latency_ms=20000, completion_tokens=1000)
+
+    decision = router.route(CODE_QUESTION)
+
+    assert decision["model"] == "llama-3.1-8b-instant"
+    assert decision["reason"] == "fallback_within_sla"
+
+
+def test_failing_model_is_skipped():
+    router = _router()
+    for _ in range(5):
+        router.record("llama-3.1-8b-instant", latency_ms=100, error=True)
+
+    decision = router.route("hello")
+
+    assert decision["model"] == "llama-3.3-70b-versatile"
+    assert router.snapshot()["llama-3.1-8b-instant"]["error_rate"] > 0.5
+
+
+def test_skipped_model_is_probed_and_recovers():
+    router = _router(probe_interval_s=60)
+    small = router._stats["llama-3.1-8b-instant"]
+    for _ in range(4):
+        router.record("llama-3.1-8b-instant", latency_ms=100, error=True)
+    assert router.route("hello")["model"] == "llama-3.3-70b-versatile"
+
+    small.last_used -= 60
+    probe = router.route("hello")
+    assert (probe["model"], probe["reason"]) == ("llama-3.1-8b-instant", "probe")
+    # One probe per interval
+    assert router.route("hello")["model"] == "llama-3.3-70b-versatile"
+
+    for _ in range(3):
+        router.record("llama-3.1-8b-instant", latency_ms=100, completion_tokens=10)
+    decision = router.route("hello")
+    assert (decision["model"], decision["reason"]) == ("llama-3.1-8b-instant", "preferred")
+
+
+def test_chat_logs_routing_and_usage(client, db, monkeypatch):
+    class FakeCompletions:
+        def __init__(self):
+            self.calls = []
+
+        def create(self, **kwargs):
+            self.calls.append(kwargs)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="4"))],
+                usage=SimpleNamespace(prompt_tokens=30, completion_tokens=2, total_tokens=32)
+            )
+
+    completions = FakeCompletions()
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setitem(providers._clients, "groq", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(model_router, "_stats", _router()._stats)
+
+    response = client.post(
+        "/api/v1/ai/chat",
+        json={"message": "what is 2+2?", "model_name": "Claude Sonnet 4.5", "client_id": "c1"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"] == "4"
+    assert completions.calls[0]["model"] == "llama-3.1-8b-instant"
+    assert completions.calls[0]["max_tokens"] == 256
+
+    logged = db.get(AIRequest, body["request_id"])
+    assert logged.recommended_model == "llama-3.1-8b-instant"
+    assert logged.client_id == "c1"
+    assert logged.request_metadata["routing"]["max_tokens"] == 256
+    assert logged.request_metadata["usage"]["completion_tokens"] == 2
+    assert model_router.snapshot()["llama-3.1-8b-instant"]["samples"] == 1
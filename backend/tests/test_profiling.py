@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from app.config.settings import settings
+from app.core.auth_cache import principal_cache
+from app.core.profiling import SamplingProfiler, profile_call, timed
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture
+def auth_header(db):
+    principal_cache.clear()
+
+    def make(is_superuser: bool) -> dict:
+        name = "root" if is_superuser else "ada"
+        user = User(
+            email=f"{name}@example.com", username=name, hashed_password="x",
+            is_active=True, is_superuser=is_superuser
+        )
+        db.add(user)
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    yield make
+    principal_cache.clear()
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_returns_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        stacks = SamplingProfiler(interval=0.001).run(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    busy = [line for line in stacks.splitlines() if line.startswith("busy;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert "_busy_loop" in stack
+    assert int(count) > 0
+
+
+def test_timed_is_a_no_op_when_disabled(monkeypatch):
+    def fn():
+        return 42
+
+    monkeypatch.setattr(settings, "PROFILING_TIMERS_ENABLED", False)
+    assert timed("fn")(fn) is fn
+
+    monkeypatch.setattr(settings, "PROFILING_TIMERS_ENABLED", True)
+    wrapped = timed("fn")(fn)
+    assert wrapped is not fn
+    assert wrapped() == 42
+
+
+def test_profile_call_reports_hot_functions():
+    def slow():
+        time.sleep(0.01)
+        return "done"
+
+    result, breakdown = profile_call(slow)
+
+    assert result == "done"
+    assert breakdown["total_ms"] >= 10
+    assert any("slow" in row["function"] for row in breakdown["functions"])
+
+
+def test_profile_endpoint_requires_superuser(client, auth_header, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+
+    response = client.get("/api/v1/admin/profile?seconds=0.1", headers=auth_header(False))
+    assert response.status_code == 403
+
+    response = client.get("/api/v1/admin/profile?seconds=0.1&interval_ms=1", headers=auth_header(True))
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert response.text.strip()
+
+
+def test_profile_query_param_is_gated(client, auth_header, monkeypatch):
+    payload = {"prompt": "write a python function"}
+
+    assert client.post("/api/v1/ai/analyze-prompt?profile=1", json=payload).status_code == 403
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    assert client.post("/api/v1/ai/analyze-prompt?profile=1", json=payload).status_code == 401
+
+    response = client.post("/api/v1/ai/analyze-prompt?profile=1", json=payload, headers=auth_header(True))
+    assert response.status_code == 200
+    assert response.json()["profile"]["functions"]
+
+    assert client.post("/api/v1/ai/analyze-prompt", json=payload).json()["profile"] is None
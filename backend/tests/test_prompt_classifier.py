@@ -0,0 +1,86 @@
+import numpy as np
+from app.models.ai_request import AIRequest
+from app.models.feedback import Feedback
+from app.services.classifier_training import example_weight, train
+from app.services.prompt_classifier import PromptClassifier, catalog_seed_examples
+
+
+def _seed_classifier():
+    texts, labels = catalog_seed_examples()
+    return PromptClassifier.fit(texts, labels, metadata={"version": "test"})
+
+
+def test_confident_on_catalog_topics_and_not_on_small_talk():
+    classifier = _seed_classifier()
+
+    (category, confidence), (_, small_talk) = classifier.predict([
+        "generate a cinematic video of a dragon",
+        "hello there how are you",
+    ])
+
+    assert category == "video"
+    assert confidence >= 0.9
+    assert small_talk < 0.9
+
+
+def test_batch_inference_matches_single_inference():
+    classifier = _seed_classifier()
+    prompts = ["write python code", "", "compose a song", "translate to french"]
+
+    batch = classifier.predict_proba(prompts)
+    single = np.vstack([classifier.predict_proba([p]) for p in prompts])
+
+    assert np.allclose(batch, single, atol=1e-6)
+
+
+def test_artifact_round_trip(tmp_path):
+    classifier = _seed_classifier()
+    path = str(tmp_path / "classifier.npz")
+
+    classifier.save(path)
+    loaded = PromptClassifier.load(path)
+
+    assert loaded.version == "test"
+    assert loaded.classes == classifier.classes
+    assert np.allclose(loaded.predict_proba(["debug my react app"]), classifier.predict_proba(["debug my react app"]))
+
+
+def test_feedback_weighting():
+    assert example_weight("perplexity", None, 0, 0) == 1.0
+    assert example_weight("perplexity", 5, 0, 0) == 2.0
+    assert example_weight("perplexity", 1, 0, 0) == 0.0
+    # Local answers are only trusted once users confirmed them
+    assert example_weight("classifier", None, 0, 0) == 0.0
+    assert example_weight("classifier", None, 2, 0) == 2.0
+
+
+def test_train_from_history_writes_artifact(db, tmp_path):
+    for i in range(20):
+        request = AIRequest(
+            prompt=f"draft a contract clause about liability {i}",
+            recommended_model="Harvey AI",
+            provider="Harvey",
+            request_metadata={"source": "perplexity"}
+        )
+        db.add(request)
+        db.flush()
+        db.add(Feedback(ai_request_id=request.id, rating=5, was_helpful=True))
+    db.commit()
+
+    out = str(tmp_path / "classifier.npz")
+    report = train(db=db, out=out, holdout=0.25)
+
+    assert report["history_examples"] == 20
+    assert report["holdout"]["accuracy"] == 1.0
+    assert PromptClassifier.load(out).predict(["draft a contract clause about liability"])[0][0] == "legal"
+
+
+def test_analyze_prompt_answers_locally_and_logs_source(client, db):
+    response = client.post("/api/v1/ai/analyze-prompt", json={"prompt": "generate a cinematic video of a dragon"})
+
+    assert response.status_code == 200
+    assert response.json()["recommendation"]["name"] == "Veo 3.1"
+    logged = db.get(AIRequest, response.json()["request_id"])
+    assert logged.request_metadata["source"] == "classifier"
+    assert logged.request_metadata["category"] == "video"
+    assert 'oasis_analysis_requests_total{source="classifier"}' in client.get("/metrics").text
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from app.models.ai_request import AIRequest
+from app.services.prompt_drafts import DraftTracker
+
+
+@pytest.fixture
+def groq(fake_groq, monkeypatch):
+    # Finals go upstream to the fake, partials use the keyword index
+    monkeypatch.setattr("app.api.v1.ai.draft_tracker", DraftTracker(100, 60))
+    return fake_groq
+
+
+def _draft(client, revision, prompt, final=False):
+    return client.post("/api/v1/ai/analyze-draft", json={
+        "session_id": "box-1", "client_id": "c1", "revision": revision, "prompt": prompt, "final": final
+    }).json()
+
+
+def test_tracker_rejects_outdated_revisions_and_cancels_previous():
+    tracker = DraftTracker(10, 60)
+    first = tracker.begin("s", 1)
+    second = tracker.begin("s", 2)
+
+    assert first.cancel.is_set()
+    assert not second.cancel.is_set()
+    assert tracker.begin("s", 1) is None
+    assert tracker.is_current("s", second)
+    assert second.revisions == 2
+
+
+def test_partial_revisions_stay_local_and_only_final_is_logged(client, db, groq):
+    prompt = "write a python function that parses csv files"
+
+    for revision in range(1, len(prompt) // 5 + 1):
+        body = _draft(client, revision, prompt[:revision * 5])
+        assert body["source"] == "keywords"
+        assert "request_id" not in body
+    assert groq.calls == 0
+    assert db.query(AIRequest).count() == 0
+
+    final = _draft(client, 100, prompt, final=True)
+
+    assert groq.calls == 1
+    assert final["source"] == "groq"
+    row = db.query(AIRequest).one()
+    assert row.id == final["request_id"]
+    assert row.request_metadata["draft_revisions"] == len(prompt) // 5 + 1
+
+
+def test_newer_revision_supersedes_in_flight_final(client, db, groq):
+    release = groq.release = threading.Event()
+    responses = {}
+
+    submit = threading.Thread(target=lambda: responses.update(first=_draft(client, 1, "write an essay", final=True)))
+    submit.start()
+    assert groq.started.wait(2)
+
+    # The user keeps editing after submitting
+    assert _draft(client, 2, "write an essay about rivers")["source"] == "keywords"
+    release.set()
+    submit.join(5)
+
+    assert responses["first"]["superseded"] is True
+    assert db.query(AIRequest).count() == 0
+    assert _draft(client, 1, "write an essay", final=True)["superseded"] is True
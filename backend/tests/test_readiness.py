@@ -0,0 +1,80 @@
+from sqlalchemy import create_engine
+
+from app.core.readiness import ReadinessMonitor, readiness
+
+
+def test_warm_up_prefills_pool_and_reports_ready(session_factory):
+    engine = session_factory.kw["bind"]
+    monitor = ReadinessMonitor(engine=engine)
+    assert monitor.status()["status"] == "warming_up"
+
+    assert monitor.warm_up() is True
+
+    status = monitor.status()
+    assert status["status"] == "ready"
+    assert status["warmup_ms"] is not None
+    assert status["checks"]["database"]["ok"] is True
+    assert status["checks"]["local_paths"]["ok"] is True
+    assert engine.pool.checkedin() >= 1
+
+
+def test_unreachable_database_is_not_ready(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}")
+    monitor = ReadinessMonitor(engine=engine)
+
+    assert monitor.warm_up() is False
+
+    status = monitor.status()
+    assert status["status"] == "unavailable"
+    assert status["checks"]["database"]["ok"] is False
+
+
+def test_ready_endpoint_gates_on_warm_up(client, monkeypatch):
+    assert readiness.wait(timeout=10)
+
+    response = client.get("/api/v1/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert set(response.json()["checks"]) == {"database", "providers", "local_paths"}
+
+    monkeypatch.setattr(readiness, "ready", False)
+    response = client.get("/api/v1/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+
+def test_warm_up_connects_only_to_live_providers(session_factory, monkeypatch):
+    from app.config.settings import settings
+    from app.services import providers as providers_module
+
+    calls = []
+    registry = providers_module.ProviderRegistry()
+    registry.register("live", lambda: "client", warm=lambda client: calls.append(("warm", client)))
+    registry.register("disabled", lambda: calls.append("built disabled"))
+    monkeypatch.setattr(providers_module, "providers", registry)
+    monkeypatch.setattr(settings, "PROVIDER_MODE", "live")
+
+    monitor = ReadinessMonitor(engine=session_factory.kw["bind"])
+    assert monitor.warm_up() is True
+
+    assert calls == [("warm", "client")]
+    assert not registry.is_loaded("disabled")
+    assert monitor.status()["checks"]["providers"]["detail"] == "live"
+
+
+def test_groq_warm_up_uses_a_short_timeout_without_retries(monkeypatch):
+    from types import SimpleNamespace
+    from app.config.settings import settings
+    from app.services.providers import _warm_groq
+
+    options = {}
+
+    class Client:
+        def with_options(self, **kwargs):
+            options.update(kwargs)
+            return SimpleNamespace(models=SimpleNamespace(list=lambda: []))
+
+    monkeypatch.setattr(settings, "PROVIDER_WARMUP_TIMEOUT_SECONDS", 2)
+    _warm_groq(Client())
+
+    assert options == {"timeout": 2, "max_retries": 0}
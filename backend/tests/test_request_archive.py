@@ -0,0 +1,113 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from app.models.ai_request import AIRequest
+from app.models.feedback import Feedback
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.services import request_archive
+from app.services.request_archive import archive_requests, list_segments, read_column, scan
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _seed(db, days_ago, client_id="c1", prompt="write a python script"):
+    request = AIRequest(
+        prompt=prompt,
+        recommended_model="Claude Sonnet 4.5",
+        provider="Anthropic",
+        reasoning="Best for code",
+        client_id=client_id,
+        response_time_ms=12.5,
+        request_metadata={"source": "classifier"},
+        created_at=NOW - timedelta(days=days_ago)
+    )
+    db.add(request)
+    db.commit()
+    return request
+
+
+def test_old_rows_move_to_day_segments(db, tmp_path):
+    for days_ago in (120, 120, 100, 5):
+        _seed(db, days_ago)
+
+    report = archive_requests(db, older_than_days=90, chunk_size=2, root=str(tmp_path), now=NOW)
+
+    assert report["rows"] == 3
+    assert db.query(AIRequest).count() == 1
+    segments = list_segments(str(tmp_path))
+    assert [os.path.basename(os.path.dirname(s)) for s in segments] == ["day=2026-02-01", "day=2026-02-21"]
+    assert read_column(segments[0], "prompt") == ["write a python script"] * 2
+
+
+def test_rows_with_feedback_stay_in_hot_table(db, tmp_path):
+    request = _seed(db, 200)
+    db.add(Feedback(ai_request_id=request.id, rating=5, was_helpful=True))
+    db.commit()
+
+    report = archive_requests(db, older_than_days=90, root=str(tmp_path), now=NOW)
+
+    assert report["rows"] == 0
+    assert db.query(AIRequest).count() == 1
+
+
+def test_feedback_arriving_during_archive_keeps_the_row(db, tmp_path, monkeypatch):
+    first = _seed(db, 120)
+    _seed(db, 120)
+    expired_chunk = request_archive._expired_chunk
+
+    def chunk_then_feedback(*args):
+        rows = expired_chunk(*args)
+        db.add(Feedback(ai_request_id=first.id, rating=5, was_helpful=True))
+        db.flush()
+        return rows
+
+    monkeypatch.setattr(request_archive, "_expired_chunk", chunk_then_feedback)
+    report = archive_requests(db, older_than_days=90, root=str(tmp_path), now=NOW)
+
+    assert report["rows"] == 1
+    assert [row.id for row in db.query(AIRequest)] == [first.id]
+    assert first.id not in [row["id"] for row in scan(columns=["id"], root=str(tmp_path))]
+
+
+def test_rerun_after_crash_does_not_archive_rows_twice(db, tmp_path):
+    for _ in range(3):
+        _seed(db, 120)
+    # The first run wrote a segment for two rows, then died before committing
+    request_archive.write_segment(request_archive._expired_chunk(db, NOW, 2), str(tmp_path))
+
+    report = archive_requests(db, older_than_days=90, root=str(tmp_path), now=NOW)
+
+    assert report["rows"] == 3
+    assert report["segments"] == 1
+    ids = [row["id"] for row in scan(columns=["id"], root=str(tmp_path))]
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 3
+
+
+def test_scan_prunes_columns_partitions_and_clients(db, tmp_path):
+    _seed(db, 120, client_id="a", prompt="first")
+    _seed(db, 100, client_id="b", prompt="second")
+    _seed(db, 100, client_id="a", prompt="third")
+    archive_requests(db, older_than_days=90, root=str(tmp_path), now=NOW)
+
+    rows = list(scan(columns=["prompt"], client_id="a", root=str(tmp_path)))
+    assert rows == [{"prompt": "first"}, {"prompt": "third"}]
+
+    recent = list(scan(columns=["prompt", "created_at"], since=date(2026, 2, 15), root=str(tmp_path)))
+    assert [row["prompt"] for row in recent] == ["second", "third"]
+    assert recent[0]["created_at"].tzinfo is not None
+
+
+def test_usage_listing_merges_archive(db, tmp_path, monkeypatch):
+    from app.config.settings import settings
+
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    _seed(db, 120, prompt="archived")
+    _seed(db, 1, prompt="recent")
+    archive_requests(db, older_than_days=90, root=str(tmp_path), now=NOW)
+
+    hot = AILogsRepository.list(db)
+    merged = AILogsRepository.list(db, include_archive=True)
+
+    assert [row.prompt for row in hot] == ["recent"]
+    assert [row["prompt"] for row in merged] == ["recent", "archived"]
+    assert AILogsRepository.list(db, skip=1, limit=1, include_archive=True)[0]["prompt"] == "archived"
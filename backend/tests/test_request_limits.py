@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.config.settings import settings
+from app.models.ai_request import AIRequest
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.schemas.ai import ChatRequest
+
+
+def test_declared_oversized_body_is_refused_unread(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_REQUEST_BODY_BYTES", 1000)
+
+    response = client.post("/api/v1/ai/analyze-prompt", json={"prompt": "x" * 2000})
+
+    assert response.status_code == 413
+
+
+def test_streamed_oversized_body_is_refused(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_REQUEST_BODY_BYTES", 1000)
+    body = json.dumps({"prompt": "x" * 2000}).encode()
+
+    # No Content-Length: the body is counted as it arrives
+    chunks = (body[i:i + 100] for i in range(0, len(body), 100))
+    response = client.post(
+        "/api/v1/ai/analyze-prompt", content=chunks, headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 413
+
+
+def test_oversized_websocket_frame_closes_the_connection(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_REQUEST_BODY_BYTES", 1000)
+
+    with client.websocket_connect("/api/v1/ai/chat/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "message", "content": "x" * 2000})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert closed.value.code == 1009
+
+
+def test_prompt_limit(client):
+    assert client.post(
+        "/api/v1/ai/analyze-prompt", json={"prompt": "x" * (settings.MAX_PROMPT_CHARS + 1)}
+    ).status_code == 422
+
+
+def test_long_histories_keep_the_newest_turns(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CHAT_HISTORY_TURNS", 3)
+    history = [{"role": "user", "content": f"turn {i}"} for i in range(5)]
+
+    request = ChatRequest(message="hi", model_name="GPT-4o", history=history)
+    assert [entry.content for entry in request.history] == ["turn 2", "turn 3", "turn 4"]
+
+    assert client.post(
+        "/api/v1/ai/chat", json={"message": "hi", "model_name": "GPT-4o", "history": history}
+    ).status_code == 200
+    assert client.post(
+        "/api/v1/ai/monitor-context", json={"messages": history, "current_model": "GPT-4o"}
+    ).status_code == 200
+
+
+def test_history_entries_are_compact():
+    request = ChatRequest(message="hi", model_name="GPT-4o", history=[
+        {"id": 1.5, "role": "ai", "content": "Use Claude", "type": "ai", "recommendation": {"name": "Claude"}}
+    ])
+
+    assert [entry.model_dump() for entry in request.history] == [{"role": "assistant", "content": "Use Claude"}]
+
+
+def test_long_prompts_are_truncated_for_storage(db, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_LOG_MAX_CHARS", 10)
+
+    row = AILogsRepository.create(
+        db, prompt="x" * 25, recommended_model="GPT-4o", provider="OpenAI", reasoning="r",
+        request_metadata={"source": "keywords"}
+    )
+
+    stored = db.get(AIRequest, row.id)
+    assert stored.prompt == "x" * 10
+    assert stored.request_metadata == {"source": "keywords", "prompt_chars": 25}
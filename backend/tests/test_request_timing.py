@@ -0,0 +1,43 @@
+from app.config.settings import settings
+from app.core.request_timing import phase, request_timer
+from app.models.ai_request import AIRequest
+
+
+def _phases(header: str) -> list:
+    return [entry.split(";")[0] for entry in header.split(", ")]
+
+
+def test_phases_are_recorded_only_inside_a_request_timer():
+    with phase("ignored"):
+        pass
+
+    with request_timer() as timer:
+        with phase("provider"):
+            pass
+        with phase("parse"):
+            pass
+        with phase("provider"):
+            pass
+
+    assert [name for name, _ in timer.phases] == ["provider", "parse", "provider"]
+    assert set(timer.summary()) == {"provider", "parse"}
+    assert _phases(timer.server_timing()) == ["provider", "parse", "provider", "total"]
+
+
+def test_analyze_prompt_reports_phases(client, db, fake_groq):
+    response = client.post("/api/v1/ai/analyze-prompt", json={"prompt": "write a python script"})
+
+    assert response.status_code == 200
+    assert response.json()["recommendation"]["name"] == "Claude Sonnet 4.5"
+    assert _phases(response.headers["server-timing"]) == ["classifier", "groq", "parse", "db", "serialize", "total"]
+    timings = db.get(AIRequest, response.json()["request_id"]).request_metadata["timings_ms"]
+    assert set(timings) == {"classifier", "groq", "parse"}
+
+
+def test_server_timing_header_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+
+    response = client.post("/api/v1/ai/analyze-prompt", json={"prompt": "write a python script"})
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Cumulative cold import time of app.main, in milliseconds.
+# Override with STARTUP_IMPORT_BUDGET_MS on slower CI runners.
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+LAZY_PROVIDER_MODULES = ("groq", "google.generativeai")
+
+
+def _import_profile(module: str, tmp_path) -> dict:
+    """Import `module` in a fresh interpreter under -X importtime.
+
+    Returns {module_name: cumulative_us} for every module imported.
+    """
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'startup.db'}"
+    env["DEBUG"] = "False"
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def test_app_main_does_not_import_provider_sdks(tmp_path):
+    profile = _import_profile("app.main", tmp_path)
+
+    loaded = [name for name in LAZY_PROVIDER_MODULES if name in profile]
+    assert loaded == [], f"Provider SDKs imported at startup: {loaded}"
+
+
+def test_app_main_cold_import_within_budget(tmp_path):
+    profile = _import_profile("app.main", tmp_path)
+
+    elapsed_ms = profile["app.main"] / 1000
+    slowest = sorted(profile.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert elapsed_ms <= STARTUP_IMPORT_BUDGET_MS, (
+        f"Cold import of app.main took {elapsed_ms:.0f}ms "
+        f"(budget {STARTUP_IMPORT_BUDGET_MS:.0f}ms). Slowest: {slowest}"
+    )
+
+
+def test_app_main_import_runs_no_ddl(tmp_path):
+    _import_profile("app.main", tmp_path)
+
+    assert not (tmp_path / "startup.db").exists()
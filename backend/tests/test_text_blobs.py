@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, event, text
+from app.core.migrations import backfill_text_blobs, get_alembic_config, run_migrations
+from app.models.ai_request import AIRequest
+from app.models.text_blob import TextBlob
+from app.repositories.ai_logs_repo import AILogsRepository
+from app.services.request_archive import archive_requests
+
+
+def _log(db, prompt, reasoning="Best for code", client_id="c1"):
+    return AILogsRepository.create(
+        db,
+        prompt=prompt,
+        recommended_model="Claude Sonnet 4.5",
+        provider="Anthropic",
+        reasoning=reasoning,
+        client_id=client_id
+    )
+
+
+def test_repeated_text_is_stored_once(db):
+    for _ in range(3):
+        _log(db, "write a python script")
+    _log(db, "summarize this article", reasoning=None)
+
+    # Two prompts and one reasoning
+    assert db.query(TextBlob).count() == 3
+    assert db.query(AIRequest).filter(AIRequest.prompt_inline.is_not(None)).count() == 0
+
+
+def test_text_is_transparent_to_callers(db):
+    _log(db, "write a python script", client_id="a")
+    _log(db, "summarize this article", reasoning=None, client_id="b")
+    # Rows inserted without the repository keep their text inline
+    db.add(AIRequest(prompt="legacy prompt", recommended_model="GPT-4o", provider="OpenAI", client_id="a"))
+    db.commit()
+    db.expunge_all()
+
+    rows = AILogsRepository.list(db, client_id="a")
+    assert sorted(row.prompt for row in rows) == ["legacy prompt", "write a python script"]
+    assert AILogsRepository.list(db, client_id="b")[0].reasoning is None
+    assert db.query(AIRequest.id).filter(AIRequest.prompt == "summarize this article").count() == 1
+
+
+def test_archive_removes_unreferenced_blobs(db, tmp_path):
+    now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    old = _log(db, "old prompt", reasoning="shared reasoning")
+    _log(db, "new prompt", reasoning="shared reasoning")
+    old.created_at = now - timedelta(days=200)
+    db.commit()
+
+    report = archive_requests(db, older_than_days=90, root=str(tmp_path), now=now)
+
+    assert report["rows"] == 1
+    assert report["blobs"] == 1
+    assert {blob.content for blob in db.query(TextBlob)} == {"new prompt", "shared reasoning"}
+
+
+def test_migration_backfills_inline_rows(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    command.upgrade(get_alembic_config(url), "0004")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for i in range(7):
+            conn.execute(
+                text("INSERT INTO ai_requests (prompt, reasoning, recommended_model, provider) VALUES (:p, :r, 'm', 'p')"),
+                {"p": f"prompt {i % 3}", "r": "because" if i % 2 else None}
+            )
+
+    run_migrations(url)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM text_blobs")).scalar_one() == 4
+        assert conn.execute(text("SELECT COUNT(*) FROM ai_requests WHERE prompt IS NOT NULL")).scalar_one() == 0
+        prompts = conn.execute(text(
+            "SELECT b.content FROM ai_requests r JOIN text_blobs b ON b.id = r.prompt_hash ORDER BY r.id"
+        )).scalars().all()
+    engine.dispose()
+    assert prompts == [f"prompt {i % 3}" for i in range(7)]
+
+
+def test_backfill_commits_each_chunk(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chunks.db'}"
+    run_migrations(url)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for i in range(7):
+            conn.execute(
+                text("INSERT INTO ai_requests (prompt, recommended_model, provider) VALUES (:p, 'm', 'p')"),
+                {"p": f"prompt {i}"}
+            )
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(
+        conn.execute(text("SELECT COUNT(*) FROM ai_requests WHERE prompt_hash IS NULL")).scalar_one()
+    ))
+
+    assert backfill_text_blobs(engine, chunk_size=3) == 7
+
+    engine.dispose()
+    # Rows left inline as each transaction committed; the last one found none
+    assert commits == [4, 1, 0, 0]
+
+
+def test_interrupted_backfill_resumes_on_next_run(tmp_path, monkeypatch):
+    from app.repositories.text_blob_repo import TextBlobRepository
+
+    url = f"sqlite:///{tmp_path / 'resume.db'}"
+    run_migrations(url)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for i in range(10):
+            conn.execute(
+                text("INSERT INTO ai_requests (prompt, recommended_model, provider) VALUES (:p, 'm', 'p')"),
+                {"p": f"prompt {i}"}
+            )
+    intern = TextBlobRepository.intern
+    calls = []
+
+    def crash_on_second_chunk(db, texts):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return intern(db, texts)
+
+    monkeypatch.setattr(TextBlobRepository, "intern", staticmethod(crash_on_second_chunk))
+    with pytest.raises(RuntimeError):
+        backfill_text_blobs(engine, chunk_size=3)
+    monkeypatch.setattr(TextBlobRepository, "intern", staticmethod(intern))
+
+    def inline():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM ai_requests WHERE prompt_hash IS NULL")).scalar_one()
+
+    assert inline() == 7
+    run_migrations(url)
+    assert inline() == 0
+    engine.dispose()
+
+
+def test_cleanup_keeps_blobs_referenced_concurrently(db, monkeypatch):
+    from sqlalchemy import true
+    from app.repositories import text_blob_repo
+    from app.repositories.text_blob_repo import TextBlobRepository, digest
+
+    db.execute(text("PRAGMA foreign_keys=ON"))
+    _log(db, "still logged", reasoning=None)
+    TextBlobRepository.intern(db, ["orphan"])
+    db.commit()
+    # As if the referencing row were not visible to the cleanup yet
+    monkeypatch.setattr(text_blob_repo, "_unreferenced", lambda key: true())
+
+    deleted = TextBlobRepository.delete_unreferenced(db, [digest("still logged"), digest("orphan")])
+    db.commit()
+
+    assert deleted == 1
+    assert [blob.content for blob in db.query(TextBlob)] == ["still logged"]
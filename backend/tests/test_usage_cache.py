@@ -0,0 +1,86 @@
+from app.core.cache import TTLCache
+from app.models.ai_request import AIRequest
+from app.repositories.ai_logs_repo import AILogsRepository
+
+
+def _log(db, count, client_id="dash", prompt="p"):
+    db.add_all([
+        AIRequest(prompt=f"{prompt} {i}", recommended_model="m", provider="p", client_id=client_id)
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _count_list_calls(monkeypatch):
+    calls = []
+    original = AILogsRepository.list
+    monkeypatch.setattr(AILogsRepository, "list", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+    return calls
+
+
+def test_unchanged_usage_returns_304_without_loading_rows(client, db, monkeypatch):
+    monkeypatch.setattr("app.api.v1.ai._usage_cache", TTLCache(10, 0))
+    _log(db, 3)
+    calls = _count_list_calls(monkeypatch)
+
+    first = client.get("/api/v1/ai/usage", params={"client_id": "dash"})
+    assert first.status_code == 200
+    assert len(first.json()) == 3
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    again = client.get("/api/v1/ai/usage", params={"client_id": "dash"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert len(calls) == 1
+
+    # Another client's traffic does not invalidate this client's page
+    _log(db, 1, client_id="other")
+    assert client.get(
+        "/api/v1/ai/usage", params={"client_id": "dash"}, headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    _log(db, 1)
+    changed = client.get("/api/v1/ai/usage", params={"client_id": "dash"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 4
+
+
+def test_burst_polling_is_served_from_memory(client, db, monkeypatch):
+    _log(db, 2)
+    calls = _count_list_calls(monkeypatch)
+    marks = []
+    original = AILogsRepository.high_water_mark
+    monkeypatch.setattr(AILogsRepository, "high_water_mark", lambda *a, **kw: marks.append(1) or original(*a, **kw))
+
+    bodies = [client.get("/api/v1/ai/usage").json() for _ in range(5)]
+
+    assert all(body == bodies[0] for body in bodies)
+    assert len(calls) == 1 and len(marks) == 1
+
+
+def test_large_usage_pages_are_gzipped_when_accepted(client, db):
+    _log(db, 50, prompt="a fairly long prompt that makes the page big enough to compress " * 3)
+
+    compressed = client.get("/api/v1/ai/usage", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    # CORS may add Origin to Vary
+    assert "accept-encoding" in {token.strip().lower() for token in compressed.headers["vary"].split(",")}
+    assert len(compressed.json()) == 50
+
+    plain = client.get("/api/v1/ai/usage", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == compressed.json()
+
+
+def test_high_water_mark_is_scoped_to_the_client(db):
+    _log(db, 3, client_id="a")
+    _log(db, 2, client_id="b")
+    rows = db.query(AIRequest).order_by(AIRequest.id).all()
+
+    max_id, min_id, last_modified = AILogsRepository.high_water_mark(db, "a")
+
+    assert (max_id, min_id) == (rows[2].id, rows[0].id)
+    assert last_modified == rows[2].created_at
+    assert AILogsRepository.high_water_mark(db)[:2] == (rows[-1].id, rows[0].id)
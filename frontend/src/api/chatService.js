@@ -30,8 +30,8 @@ export const ChatService = {
         return data;
     },
 
-    monitorContext: async (messages, current_model) => {
-        const { data } = await apiClient.post('/ai/monitor-context', { messages, current_model });
+    monitorContext: async (messages, current_model, conversation_id = null) => {
+        const { data } = await apiClient.post('/ai/monitor-context', { messages, current_model, conversation_id });
         return data;
     },
 
@@ -65,7 +65,7 @@ export default function Home() {
         const { response } = await ChatService.chat(text, activeModel.name, messages);
         const finalMessages = [...updatedMessages, addMessage(response, 'ai')];
         saveChat(finalMessages);
-        const obs = await ChatService.monitorContext(finalMessages, activeModel.name);
+        const obs = await ChatService.monitorContext(finalMessages, activeModel.name, currentChatId);
         if (obs?.should_switch) setSuggestion(obs);
       } else {
         setSelectionStatus("analyzing");